@@ -42,10 +42,18 @@ class LoggerConsoleFormatter(logging.Formatter):
         logging.CRITICAL: Style.RED + Style.BOLD + format + Style.ENDC
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # create the formatters for each level only once,
+        # instead of creating a new formatter for each logged message
+        self.formatters = {levelno: logging.Formatter(log_fmt) for levelno, log_fmt in self.FORMATS.items()}
+
+        # for any levels that aren't in FORMATS
+        self.default_formatter = logging.Formatter(None)
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+        return self.formatters.get(record.levelno, self.default_formatter).format(record)
 
 
 # use this custom logger class to trace back where a logger.error was called from
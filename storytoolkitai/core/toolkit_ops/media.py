@@ -1,4 +1,7 @@
 import os
+import json
+import functools
+import itertools
 import cv2
 from moviepy.editor import VideoFileClip, AudioFileClip
 import subprocess
@@ -120,6 +123,61 @@ class MediaItem:
 
         return video_present
 
+    @staticmethod
+    def probe_streams(file_path, file_stat=None):
+        """
+        Checks which audio and video streams the file has using a single ffprobe call.
+        The results are cached by file path, modification time and size, so probing unchanged files again is free.
+        If we already have the os.stat result of the file (for eg. from os.scandir), we can pass it as file_stat.
+
+        Returns a dict like {'has_audio': bool, 'has_video': bool, 'codec_a': str|None, 'codec_v': str|None}
+        """
+
+        if file_stat is None:
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                return {'has_audio': False, 'has_video': False, 'codec_a': None, 'codec_v': None}
+
+        # return a copy so that the cached result can't be changed by the caller
+        return dict(MediaItem._probe_streams_cached(file_path, file_stat.st_mtime_ns, file_stat.st_size))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _probe_streams_cached(file_path, mtime_ns, size):
+        """
+        The cached part of probe_streams - the mtime_ns and size are only used as part of the cache key
+        """
+
+        cmd = ['ffprobe', '-v', 'error', '-show_streams', '-of', 'json', file_path]
+
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            streams = json.loads(result.stdout).get('streams', []) if result.returncode == 0 else []
+
+        # if ffprobe is not available, fall back to checking the streams with moviepy
+        except FileNotFoundError:
+            logger.debug('ffprobe not found. Falling back to moviepy for probing {}.'.format(file_path))
+            return {'has_audio': MediaItem.has_audio(file_path), 'has_video': MediaItem.has_video(file_path),
+                    'codec_a': None, 'codec_v': None}
+
+        except Exception:
+            logger.debug('Unable to probe {}.'.format(file_path), exc_info=True)
+            streams = []
+
+        audio_streams = [stream for stream in streams if stream.get('codec_type') == 'audio']
+
+        # ignore the video streams that are just cover art (for eg. in mp3 files)
+        video_streams = [stream for stream in streams if stream.get('codec_type') == 'video'
+                         and not stream.get('disposition', {}).get('attached_pic', 0)]
+
+        return {
+            'has_audio': len(audio_streams) > 0,
+            'has_video': len(video_streams) > 0,
+            'codec_a': audio_streams[0].get('codec_name') if audio_streams else None,
+            'codec_v': video_streams[0].get('codec_name') if video_streams else None,
+        }
+
     def get_media_type(self):
         """
         Returns the media type of the file depending on the file path.
@@ -199,6 +257,141 @@ class VideoItem(MediaItem, ClipIndex):
 
 class MediaUtils:
 
+    @staticmethod
+    def load_audio_array(file_path, sr=16_000):
+        """
+        This decodes the audio file only once using soundfile and resamples it to sr using soxr (if needed),
+        and returns a mono float32 audio array and the sample rate.
+        For the formats that soundfile can't read (for e.g. mp4, m4a), this falls back to librosa.
+        """
+
+        import numpy as np
+        import librosa
+
+        try:
+            import soundfile
+            file_info = soundfile.info(file_path)
+
+        # soundfile raises different errors depending on the version and the format,
+        # so let librosa try all the decoders it knows
+        except Exception:
+            logger.debug('Soundfile cannot read {}, falling back to librosa.'.format(os.path.basename(file_path)))
+
+            audio_array, sr = librosa.load(file_path, sr=sr)
+            return audio_array, sr
+
+        # if the file is a WAV that already has the exact format we need (mono float32 at the right sample rate),
+        # map it in memory instead of reading it, so that only the parts we actually use are loaded from disk
+        if file_info.format == 'WAV' and file_info.subtype == 'FLOAT' \
+                and file_info.channels == 1 and file_info.samplerate == sr:
+
+            audio_array = MediaUtils._memmap_wav_audio_array(file_path, file_info)
+
+            if audio_array is not None:
+                return audio_array, sr
+
+        # if we need to resample, do it while reading the file in blocks,
+        # so that we never hold the whole audio in memory at its original sample rate and number of channels
+        if file_info.samplerate != sr:
+
+            try:
+                import soxr
+                return MediaUtils._load_resampled_audio_array(file_path, file_info, sr, soxr), sr
+
+            except ImportError:
+                pass
+
+        audio_array, file_sr = soundfile.read(file_path, dtype='float32', always_2d=False)
+
+        # downmix to mono
+        if audio_array.ndim == 2:
+            audio_array = audio_array.mean(axis=1, dtype=np.float32)
+
+        if file_sr != sr:
+            audio_array = librosa.resample(audio_array, orig_sr=file_sr, target_sr=sr)
+
+        return np.asarray(audio_array, dtype=np.float32), sr
+
+    @staticmethod
+    def _load_resampled_audio_array(file_path, file_info, sr, soxr, block_duration=60):
+        """
+        This reads the audio file in blocks of block_duration seconds, downmixes them to mono
+        and resamples them with a soxr stream into a pre-allocated float32 array.
+        """
+
+        import numpy as np
+        import soundfile
+
+        # the expected number of samples after resampling (soxr might give us a few more or less)
+        audio_array = np.empty(int(np.ceil(file_info.frames * sr / file_info.samplerate)) + sr, dtype=np.float32)
+        audio_array_length = 0
+
+        resample_stream = soxr.ResampleStream(file_info.samplerate, sr, 1, dtype='float32', quality='HQ')
+
+        blocks = soundfile.blocks(file_path, blocksize=int(block_duration * file_info.samplerate),
+                                  dtype='float32', always_2d=True)
+
+        # the last chunk flushes whatever is left in the resampler
+        for block, last in itertools.chain(((block, False) for block in blocks), [(None, True)]):
+
+            block = block.mean(axis=1, dtype=np.float32) if block is not None else np.empty(0, dtype=np.float32)
+            resampled_block = resample_stream.resample_chunk(block, last=last)
+
+            # grow the array if soxr gave us more samples than we expected
+            if audio_array_length + len(resampled_block) > len(audio_array):
+                audio_array = np.resize(audio_array, audio_array_length + len(resampled_block))
+
+            audio_array[audio_array_length:audio_array_length + len(resampled_block)] = resampled_block
+            audio_array_length += len(resampled_block)
+
+        return audio_array[:audio_array_length]
+
+    @staticmethod
+    def _memmap_wav_audio_array(file_path, file_info):
+        """
+        This memory maps the data chunk of a mono float32 WAV file and returns it as a float32 array
+        (or None if the data chunk can't be found).
+        The map is copy-on-write, so changing the array never changes the file.
+        """
+
+        import numpy as np
+        import struct
+
+        try:
+            with open(file_path, 'rb') as wav_file:
+
+                riff_header = wav_file.read(12)
+                if len(riff_header) < 12 or riff_header[:4] != b'RIFF' or riff_header[8:12] != b'WAVE':
+                    return None
+
+                # walk through the chunks until we find the data chunk
+                while True:
+                    chunk_header = wav_file.read(8)
+                    if len(chunk_header) < 8:
+                        return None
+
+                    chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+
+                    if chunk_id == b'data':
+                        data_offset = wav_file.tell()
+                        break
+
+                    # (the chunks are padded to an even size)
+                    wav_file.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+            # use the number of frames from soundfile,
+            # since the data chunk size might be wrong for files that were not closed properly
+            frame_count = min(file_info.frames, (os.path.getsize(file_path) - data_offset) // 4)
+
+            if frame_count <= 0:
+                return None
+
+            return np.memmap(file_path, dtype='<f4', mode='c', offset=data_offset, shape=(frame_count,))
+
+        except (OSError, ValueError, struct.error):
+            logger.debug('Cannot memory map {}.'.format(os.path.basename(file_path)), exc_info=True)
+            return None
+
     @staticmethod
     def get_audio_sample_rate(file):
         """
@@ -1,6 +1,8 @@
 import threading
 import time
 
+from storytoolkitai.core.logger import logger
+
 
 class Monitor:
     """
@@ -8,8 +10,21 @@ class Monitor:
 
     We can also initiate it without a condition and a done callback,
     and the monitor will wait until they exist and they're callable, or until it reaches the timeout.
+
+    All the active monitors are checked by a single shared scheduler thread,
+    so we don't have to keep a sleeping thread alive for each monitor.
     """
 
+    # the monitors that are currently waiting for their condition or done function
+    _monitors = []
+    _monitors_lock = threading.Lock()
+
+    # the shared thread that checks all the monitors (it only runs while there are monitors to check)
+    _scheduler_thread = None
+
+    # how often the scheduler thread wakes up to check the monitors (in seconds)
+    SCHEDULER_INTERVAL = 1
+
     def __init__(self, done: callable = None, condition: callable = None, timer: int = None):
 
         self._done = done
@@ -26,15 +41,75 @@ class Monitor:
         # keep track of when the monitor was initialized
         self._monitor_initialized_at = time.time()
 
-        self.monitor_thread = threading.Thread(target=self.start_monitoring)
-        self.monitor_thread.start()
+        # the scheduler checks the condition once this time is reached (right away for the first check)
+        self._next_check_at = self._monitor_initialized_at
+
+        # this is set once the condition was met, so we don't call the condition again while waiting for done
+        self._condition_met = False
+
+        self.start_monitoring()
 
     def start_monitoring(self):
         """
-        Monitor for condition to be met and fire done function when it is.
+        Add the monitor to the shared scheduler (and start the scheduler thread if it's not running).
+        """
+
+        with Monitor._monitors_lock:
+
+            if self not in Monitor._monitors:
+                Monitor._monitors.append(self)
+
+            if Monitor._scheduler_thread is None:
+                Monitor._scheduler_thread = threading.Thread(target=Monitor._run_scheduler, daemon=True)
+                Monitor._scheduler_thread.start()
+
+    @classmethod
+    def _run_scheduler(cls):
         """
+        Check all the monitors until there are none left.
+        """
+
+        while True:
+
+            with cls._monitors_lock:
+
+                # stop the thread if there's nothing left to monitor
+                # (a new one is started by the next monitor that is added)
+                if not cls._monitors:
+                    cls._scheduler_thread = None
+                    return
 
-        # if the condition is not callable (i.e. a function), then sleep for 1 second and try again
+                monitors = tuple(cls._monitors)
+
+            now = time.time()
+
+            for monitor in monitors:
+
+                # not time to check this monitor yet
+                if now < monitor._next_check_at:
+                    continue
+
+                try:
+                    finished = monitor._check()
+
+                # if anything goes wrong with this monitor, kill it, but keep checking the others
+                except Exception as e:
+                    logger.error(e, exc_info=True)
+                    finished = True
+
+                if finished:
+                    with cls._monitors_lock:
+                        cls._monitors.remove(monitor)
+
+            time.sleep(cls.SCHEDULER_INTERVAL)
+
+    def _check(self) -> bool:
+        """
+        Check if the condition is met and fire the done function when it is.
+        Returns True when the monitor is finished.
+        """
+
+        # if the condition is not callable (i.e. a function), try again on the next check
         if not callable(self._condition):
 
             # check if we didn't reach the callable timeout
@@ -44,20 +119,24 @@ class Monitor:
                                 'Killing monitor.'
                                 .format(self, self.condition_exists_timeout))
 
-            time.sleep(1)
-            self.start_monitoring()
-            return
+            return False
 
         # wait until the condition is met
-        while not self._condition():
+        if not self._condition_met:
+
+            if not self._condition():
 
-            self.monitoring = True
+                self.monitoring = True
 
-            # sleep for 1 second or the specified timer
-            time.sleep(self.timer if self.timer and isinstance(self.timer, int) else 1)
+                # check again after 1 second or the specified timer
+                self._next_check_at = time.time() + (self.timer if self.timer and isinstance(self.timer, int) else 1)
+
+                return False
+
+            self._condition_met = True
 
         # wait until the done function is callable
-        while not callable(self._done):
+        if not callable(self._done):
 
             # check if we didn't reach the done_exists timeout
             # (the time we wait for the monitor to know its callable "done" function)
@@ -66,9 +145,13 @@ class Monitor:
                                 'Killing monitor.'
                                 .format(self, self.done_exists_timeout))
 
-            time.sleep(1)
+            return False
+
+        # fire the done function in its own thread,
+        # so that a long done function doesn't hold up the other monitors
+        threading.Thread(target=self._done).start()
 
-        self._done()
+        return True
 
     def add_done_callback(self, done: callable):
         """
@@ -1,15 +1,21 @@
 import time
 import json
+import itertools
 
 from storytoolkitai import USER_DATA_PATH
 from storytoolkitai.core.logger import *
 
 import torch
-from threading import Thread
+from threading import Thread, RLock
 
 
 QUEUE_FILE_PATH = os.path.join(USER_DATA_PATH, 'queue.json')
 
+# the tasks that can run at the same time on the same device (see ProcessingQueue.get_available_thread_slot)
+# - the transcriptions share the same whisper model, so running a few of them at once
+#   lets one decode while the others load and pre-process their audio
+CONCURRENT_TASKS = frozenset({'transcribe', 'translate'})
+
 
 class ProcessingQueue:
     """
@@ -34,6 +40,8 @@ class ProcessingQueue:
         # this keeps track of the threads that are processing the queue by device
         # the key is the device name and the value is a dict with the queue id and the thread object
         # for eg. {'cuda:0': {'queue_id': queue_id, 'thread': <Thread(Thread-1, started 1234567890123)>}, ...}
+        # (when more items run on the same device, the other ones use the device name + #n as key, for eg. cuda:0#1,
+        # see get_available_thread_slot)
         self.queue_threads = {}
 
         # this holds other variables that don't need to be part of the queue history,
@@ -41,6 +49,13 @@ class ProcessingQueue:
         # the key is the queue id and the value is a dict variable names and values
         self.queue_variables = {}
 
+        # this makes sure that generating queue ids and adding items to the queue is atomic across threads
+        self.queue_lock = RLock()
+
+        # a counter that is added to the generated queue ids,
+        # so that ids generated within the same clock tick are still unique
+        self.queue_id_counter = itertools.count()
+
         # how much to wait until checking if there are items in the queue that can be processed
         # disabled for now - if we activate this we need to make sure that the device is not used by another thread
         # by checking the queue_threads dict
@@ -51,25 +66,31 @@ class ProcessingQueue:
         This function generates a queue id for a task
         """
 
-        # keep generating a queue id until it's not similar to one that already exists in the queue history
-        while True:
+        with self.queue_lock:
 
-            # use the name if one was provided
-            # and a timestamp to make it as unique as possible
-            queue_id = "{}{}".format(((name.replace(' ', '') + '-') if name else ''), time.time())
+            # keep generating a queue id until it's not similar to one that already exists in the queue history
+            # (for eg. if the queue history was loaded from the queue file)
+            while True:
 
-            # if the queue id doesn't return an item
-            if not self.get_item(queue_id=queue_id):
+                # use the name if one was provided,
+                # a timestamp and the counter to make it unique
+                queue_id = "{}{}-{}".format(((name.replace(' ', '') + '-') if name else ''),
+                                            time.time(), next(self.queue_id_counter))
 
-                # add it to the queue history
-                self.queue_history.append({'queue_id': queue_id, 'name': '', 'status': 'pending'})
+                # if the queue id doesn't return an item
+                if not self.get_item(queue_id=queue_id):
 
-                logger.debug('Added queue id {} to queue history'.format(queue_id))
+                    # add it to the queue history
+                    self.queue_history.append({'queue_id': queue_id, 'name': '', 'status': 'pending'})
 
-                # notify the update_queue observers
-                self.toolkit_ops_obj.notify_observers('update_queue')
+                    break
 
-                return queue_id
+        logger.debug('Added queue id {} to queue history'.format(queue_id))
+
+        # notify the update_queue observers
+        self.toolkit_ops_obj.notify_observers('update_queue')
+
+        return queue_id
 
     def add_to_queue(self,
                      tasks: list or str = None,
@@ -172,25 +193,28 @@ class ProcessingQueue:
         # add the 'queued' status to the kwargs
         kwargs['status'] = 'queued'
 
-        # check if the queue id already exists in the queue history
-        item = self.get_item(queue_id=queue_id)
-        if not item:
+        with self.queue_lock:
 
-            # add the kwargs to the queue history
-            self.queue_history.append(kwargs)
+            # check if the queue id already exists in the queue history
+            item = self.get_item(queue_id=queue_id)
+            if not item:
 
-            logger.debug('Added item {} to queue history'.format(queue_id))
+                # add the kwargs to the queue history
+                self.queue_history.append(kwargs)
 
-            # notify the update_queue observers
-            self.toolkit_ops_obj.notify_observers('update_queue')
+                logger.debug('Added item {} to queue history'.format(queue_id))
 
-        else:
-            # just update the item, but make sure that the queue id is not stripped
-            kwargs['queue_id'] = queue_id
-            self.update_queue_item(**kwargs)
+            else:
+                # just update the item, but make sure that the queue id is not stripped
+                kwargs['queue_id'] = queue_id
+                self.update_queue_item(**kwargs)
+
+            # add the queue id to the queue
+            self.queue.append(queue_id)
 
-        # add the queue id to the queue
-        self.queue.append(queue_id)
+        # notify the update_queue observers
+        if not item:
+            self.toolkit_ops_obj.notify_observers('update_queue')
 
         logger.debug('Added item {} to queue'.format(queue_id))
 
@@ -201,10 +225,6 @@ class ProcessingQueue:
         # save the queue to a file
         self.save_queue_to_file()
 
-        # throttle for a bit to avoid queue id queue id collisions,
-        # if this is a batch
-        time.sleep(0.01)
-
         # return the queue id if we reached this point
         return queue_id
 
@@ -616,8 +636,8 @@ class ProcessingQueue:
         Each task had a 'task_queue' key that holds a list of functions that need to be executed
         in order to complete the task. The functions are executed in the order they are in the list.
 
-        We will store possible tasks in a dictionary, where the key is the task name and the value is a list of
-        functions that need to be executed in order to complete the task.
+        We will store possible tasks in a dictionary, where the key is the task name and the value is the
+        function that needs to be executed in order to complete the task.
 
         The dictionary will be stored in the toolkit_ops_obj and will be called 'queue_tasks'
 
@@ -641,18 +661,16 @@ class ProcessingQueue:
         # iterate through the list of tasks
         for task in tasks:
 
-            # if the task is not in the queue tasks, return False
-            if task not in self.toolkit_ops_obj.queue_tasks.keys():
+            # get the task function from the queue tasks dictionary in the toolkit ops object
+            task_function = self.toolkit_ops_obj.queue_tasks.get(task, None)
+
+            # if the task is not in the queue tasks, skip it
+            if task_function is None:
                 logger.warning('Unable to dispatch task {} - task not in queue tasks'.format(task))
                 continue
 
-            # get the task queue from the queue tasks dictionary in the toolkit ops object
-            task_queue.extend(self.toolkit_ops_obj.queue_tasks[task])
-
-            # if the task queue is empty, return False
-            if len(task_queue) == 0:
-                logger.error('Unable to dispatch task {} - task queue is empty'.format(task))
-                continue
+            # add it to the task queue
+            task_queue.append(task_function)
 
         return task_queue
 
@@ -679,7 +697,9 @@ class ProcessingQueue:
             return False
 
         # keep track of the device we're using
+        # and of the thread slot that we're using on it (see get_available_thread_slot)
         device = kwargs.get('device', None)
+        thread_slot = kwargs.pop('thread_slot', device)
 
         # get the item details from the queue history
         item = self.get_item(queue_id=queue_id)
@@ -765,7 +785,7 @@ class ProcessingQueue:
                 executed = False
 
         # remove the thread from the queue threads to free up the device
-        self.remove_thread_from_queue_threads(device=device)
+        self.remove_thread_from_queue_threads(device=thread_slot)
 
         # notify all the observers that the queue has been updated
         self.toolkit_ops_obj.notify_observers('update_queue')
@@ -828,6 +848,16 @@ class ProcessingQueue:
         Checks if there are items left in the queue and executes the first one if there are
         """
 
+        # the queue is pinged from the item threads too,
+        # so make sure that two pings don't start items in the same device slot
+        with self.queue_lock:
+            return self._ping_queue()
+
+    def _ping_queue(self):
+        """
+        The part of ping_queue that runs while holding the queue lock
+        """
+
         # if there are no items in the queue, return False
         if len(self.queue) == 0:
             logger.debug('No items left in the queue. Try to ping the queue again later.')
@@ -905,8 +935,9 @@ class ProcessingQueue:
         # get the item details from the queue history
         kwargs = self.get_item(queue_id=queue_id)
 
-        # check if the device is available
-        if not self.is_device_available(device=kwargs['device']):
+        # check if the device is available (or if it can run this item next to the ones that are already running)
+        thread_slot = self.get_available_thread_slot(device=kwargs['device'], tasks=kwargs.get('tasks', None))
+        if thread_slot is None:
             logger.debug('Device busy. Try again later.')
             return False
 
@@ -919,10 +950,10 @@ class ProcessingQueue:
                 filtered_kwargs[key] = value
 
         # create a thread to execute the tasks for this item
-        thread = Thread(target=self.execute_item_tasks, kwargs=filtered_kwargs)
+        thread = Thread(target=self.execute_item_tasks, kwargs={**filtered_kwargs, 'thread_slot': thread_slot})
 
         # add the thread to the threads dictionary so that other processes know that the device is busy
-        self.add_thread_to_queue_threads(device=kwargs['device'], queue_id=kwargs['queue_id'], thread=thread)
+        self.add_thread_to_queue_threads(device=thread_slot, queue_id=kwargs['queue_id'], thread=thread)
 
         # start the thread
         thread.start()
@@ -932,6 +963,10 @@ class ProcessingQueue:
         if queue_index is not None:
             self.queue.pop(queue_index)
 
+        # if the item can share its device with other items, try to start the next one too
+        if self.get_thread_slot_count(kwargs.get('tasks', None)) > 1:
+            self._ping_queue()
+
         return True
 
     def _get_item_queue_index(self, queue_id):
@@ -1050,6 +1085,58 @@ class ProcessingQueue:
 
         return True
 
+    def get_thread_slot_count(self, tasks) -> int:
+        """
+        This returns how many items with these tasks can run at the same time on the same device
+        (the transcription_concurrency setting for the CONCURRENT_TASKS, 1 for everything else)
+        """
+
+        if isinstance(tasks, str):
+            tasks = [tasks]
+
+        if not tasks or not all(task in CONCURRENT_TASKS for task in tasks):
+            return 1
+
+        try:
+            # (by default, only one transcription runs per device - since the OpenAI whisper models
+            # only decode one batch at a time, running more of them only helps with the pre-processing)
+            return max(1, int(self.toolkit_ops_obj.stAI.get_app_setting('transcription_concurrency',
+                                                                        default_if_none=1)))
+        except (ValueError, TypeError):
+            return 1
+
+    def get_available_thread_slot(self, device, tasks=None) -> str or None:
+        """
+        This returns the queue_threads key that an item with these tasks can use to run on the device,
+        or None if the device is busy.
+        Only the items with CONCURRENT_TASKS can run next to each other on the same device
+        (up to get_thread_slot_count), all the other items need the device for themselves.
+        """
+
+        # the keys of all the slots that are used on this device (the first one is always the device name)
+        device_slots = [device] + [slot for slot in self.queue_threads if slot.startswith('{}#'.format(device))]
+        busy_slots = [slot for slot in device_slots if not self.is_device_available(slot)]
+
+        thread_slot_count = self.get_thread_slot_count(tasks)
+
+        # if this item can't share the device, it needs all the slots to be free
+        if thread_slot_count == 1:
+            return device if not busy_slots else None
+
+        # if it can, all the running items must also be able to share it
+        for slot in busy_slots:
+            running_item = self.get_item(queue_id=self.queue_threads[slot]['queue_id']) or {}
+            if self.get_thread_slot_count(running_item.get('tasks', None)) == 1:
+                return None
+
+        # then use the first free slot
+        for slot_index in range(thread_slot_count):
+            slot = device if slot_index == 0 else '{}#{}'.format(device, slot_index)
+            if slot not in busy_slots:
+                return slot
+
+        return None
+
     def is_item_in_thread(self, queue_id):
         """
         This function checks if a queue item is in the queue_threads dict
@@ -11,6 +11,7 @@ from numpy import ndarray
 
 import pickle
 
+from storytoolkitai import USER_DATA_PATH
 from storytoolkitai.core.logger import logger
 from sentence_transformers import SentenceTransformer, util
 from sentence_transformers.SentenceTransformer import logging, batch_to_device, trange
@@ -21,6 +22,9 @@ from .textanalysis import TextAnalysis
 
 from .videoanalysis import ClipIndex, cv2
 
+# this is where we cache the fp16 (safetensors) copies of the semantic search models
+SEMANTIC_SEARCH_FP16_MODELS_PATH = os.path.join(USER_DATA_PATH, 'models', 'semantic_search_fp16')
+
 
 class ToolkitSearch:
     """
@@ -818,7 +822,7 @@ class TextSearch(SearchItem):
                 model_downloaded_before = False
 
             # load the sentence transformer model
-            self.search_model = ToolkitSentenceTransformer(self.model_name)
+            self.search_model = self._load_sentence_transformer()
 
             # set the torch device to the same device as the toolkit
             self.search_model.to(self.toolkit_ops_obj.torch_device)
@@ -840,6 +844,47 @@ class TextSearch(SearchItem):
 
         return None
 
+    def _load_sentence_transformer(self):
+        """
+        This loads the sentence transformer model,
+        or, if the semantic_model_fp16 setting is enabled and we're using CUDA, an fp16 copy of it.
+        The fp16 copy is saved as safetensors on the first load,
+        so the next loads only need to (memory map and) read half of the weights.
+        """
+
+        use_fp16 = self.stAI.get_app_setting(setting_name='semantic_model_fp16', default_if_none=False) \
+            and torch.device(self.toolkit_ops_obj.torch_device).type == 'cuda'
+
+        if not use_fp16:
+            return ToolkitSentenceTransformer(self.model_name)
+
+        fp16_model_path = os.path.join(SEMANTIC_SEARCH_FP16_MODELS_PATH, self.model_name.replace('/', '--'))
+
+        # use the cached fp16 copy if we have one
+        if os.path.isfile(os.path.join(fp16_model_path, 'model.safetensors')):
+            try:
+                return ToolkitSentenceTransformer(fp16_model_path).half()
+
+            except Exception:
+                logger.warning('Could not load cached fp16 model from {}. Loading the original model instead.'
+                               .format(fp16_model_path), exc_info=True)
+
+        search_model = ToolkitSentenceTransformer(self.model_name).half()
+
+        # save the fp16 copy for the next time
+        try:
+            os.makedirs(fp16_model_path, exist_ok=True)
+            search_model.save(fp16_model_path, safe_serialization=True)
+
+            logger.debug('Saved fp16 copy of sentence transformer model {} to {}.'
+                         .format(self.model_name, fp16_model_path))
+
+        except Exception:
+            logger.warning('Could not save fp16 copy of sentence transformer model {}.'.format(self.model_name),
+                           exc_info=True)
+
+        return search_model
+
     def search(self, query: str, max_results: int = 5):
         """
         Searches the corpus for the query using the search type passed by the user
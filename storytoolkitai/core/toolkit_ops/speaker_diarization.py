@@ -21,10 +21,23 @@ def find_closest_speaker(embedding, speaker_embeddings, threshold=0.3):
     :param: threshold: the threshold for the cosine similarity
     """
 
-    for speaker_id, speaker_embedding in speaker_embeddings.items():
-        similarity = 1 - cosine(embedding.flatten(), speaker_embedding.flatten())
-        if similarity > threshold:
-            return speaker_id
+    if not speaker_embeddings:
+        return None
+
+    # calculate the cosine similarity to all the speakers at once
+    embedding = np.asarray(embedding, dtype=np.float64).flatten()
+    speaker_embeddings_matrix = np.stack(
+        [np.asarray(speaker_embedding, dtype=np.float64).flatten() for speaker_embedding in speaker_embeddings.values()]
+    )
+
+    similarities = (speaker_embeddings_matrix @ embedding) \
+        / (np.linalg.norm(speaker_embeddings_matrix, axis=1) * np.linalg.norm(embedding))
+
+    # return the first speaker (in the order they were added) that is similar enough
+    similar_speakers = np.flatnonzero(similarities > threshold)
+    if len(similar_speakers) > 0:
+        return list(speaker_embeddings.keys())[similar_speakers[0]]
+
     return None
 
 
@@ -82,8 +95,9 @@ def detect_speaker_changes(
     if not isinstance(speaker_id_offset, int):
         raise ValueError("speaker_id_offset must be an integer")
 
-    # use a deep copy of the segments so that we don't modify the original due to mutability
-    resulting_segments = copy.deepcopy(segments)
+    # use copies of the segments so that we don't modify the originals due to mutability
+    # (we only add the speaker_id key to each segment, so we don't need to deep copy them)
+    resulting_segments = [copy.copy(segment) for segment in segments]
 
     if not device_name:
         torch_device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -1,7 +1,22 @@
+import functools
+
 from timecode import Timecode
 from storytoolkitai.core.logger import logger
 
 
+@functools.lru_cache(maxsize=256)
+def get_cached_timecode(framerate, start_timecode=None, frames=None) -> Timecode:
+    """
+    Returns a (shared) timecode object for the given framerate and timecode or frames,
+    so that we don't parse the same timecode over and over again (for e.g. the start timecode of a timeline).
+
+    IMPORTANT: the returned object is shared between callers, so it must not be modified in place
+    (the timecode arithmetic operators like + and - return new objects, so they're fine to use)
+    """
+
+    return Timecode(framerate, start_timecode=start_timecode, frames=frames)
+
+
 def sec_to_tc(seconds: float, *, fps: float, use_frames=True, add_frame=False) -> Timecode:
     """
     Converts seconds to timecode.
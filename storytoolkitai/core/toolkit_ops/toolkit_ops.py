@@ -1,20 +1,29 @@
 import os
+import re
 import sys
+import platform
 import time
 import json
 import yaml
 import subprocess
-
-from threading import Thread
+import functools
+import hashlib
+import itertools
+import glob
+import math
+import contextlib
+import logging
+import weakref
+
+from threading import Thread, Lock, RLock, BoundedSemaphore, Timer, Event
+from collections import namedtuple, deque, defaultdict
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 
 import torch
-import storytoolkitai.integrations.mots_whisper as whisper
-from whisper import tokenizer as whisper_tokenizer
-
-from transformers import pipeline
 
-import librosa
-import soundfile
+# whisper, transformers and librosa are imported only when needed (see the methods that use them),
+# since they take a while to import and they're not needed for many of the operations in this module
 
 import tqdm
 
@@ -29,12 +38,12 @@ from .transcription import Transcription, TranscriptionSegment, TranscriptionUti
 from .story import Story, StoryLine, StoryUtils
 from .document import Document
 from .processing_queue import ProcessingQueue
-from .search import ToolkitSearch, SearchItem, TextSearch, VideoSearch, cv2
+from .search import ToolkitSearch, SearchItem, TextSearch, VideoSearch
 from .assistant import ToolkitAssistant, AssistantUtils
 from .assistant import DEFAULT_SYSTEM_MESSAGE as ASSISTANT_DEFAULT_SYSTEM_MESSAGE
 from .media import MediaUtils
 from .speaker_diarization import detect_speaker_changes
-from .timecode import sec_to_tc, tc_to_sec
+from .timecode import sec_to_tc, tc_to_sec, get_cached_timecode
 
 from timecode import Timecode
 
@@ -44,6 +53,144 @@ from .monitor import Monitor
 from .videoanalysis import ClipIndex
 from .media import MediaItem, VideoFileClip, AudioFileClip
 
+# the file extensions of the media files that we can ingest
+VALID_MEDIA_EXTENSIONS = frozenset({'.mov', '.mp4', '.mp3', '.wav', '.aif', '.aiff', '.avi', '.mkv', '.m4a', '.flac'})
+
+# the file extensions of the files that normally contain video
+VIDEO_CONTAINER_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi'})
+
+# this is where we cache the quantized whisper models, so we don't have to quantize them on each load
+WHISPER_QUANTIZED_MODELS_PATH = os.path.join(USER_DATA_PATH, 'models', 'whisper_quantized')
+
+# this is where we cache the int8 ONNX versions of the text classifier models (see _load_quantized_text_classifier)
+TEXT_CLASSIFIER_QUANTIZED_MODELS_PATH = os.path.join(USER_DATA_PATH, 'models', 'text_classifier_quantized')
+TEXT_CLASSIFIER_QUANTIZED_MODEL_FILE = 'model_quantized.onnx'
+
+# the path of a media file found while scanning a directory, together with its (already known) os.stat result
+MediaFileEntry = namedtuple('MediaFileEntry', ['path', 'stat'])
+
+# a shared thread pool for the short-lived background tasks of this module
+# (so that we don't create a new OS thread for each of them)
+TOOLKIT_OPS_EXECUTOR = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 2) * 2),
+                                          thread_name_prefix='stai')
+
+# the paths that we use to start the app again via CLI (for e.g. in render_timeline_via_cli)
+# - resolving them on import also means that a later change of the working directory won't affect them
+# - ARGVZERO is hopefully packed in the environment variables while freezing the macOS app bundle
+MAIN_SCRIPT_PATH = os.path.realpath(sys.argv[0])
+ARGVZERO = os.environ.get('ARGVZERO', None)
+
+# the silero VAD version that we use (v5 supports batched ONNX inference, see get_vad_speech_probabilities)
+SILERO_VAD_REPO = 'snakers4/silero-vad:v5.1.2'
+
+# the device names that we accept for torch (see ToolkitOps.torch_device_type_select)
+TORCH_CUDA_DEVICES = frozenset({'cuda', 'CUDA', 'gpu', 'GPU'})
+TORCH_CPU_DEVICES = frozenset({'cpu', 'CPU'})
+TORCH_ALLOWED_DEVICES = TORCH_CUDA_DEVICES | TORCH_CPU_DEVICES
+
+# the parameters that we pass to mots_whisper and their types (see ToolkitOps.whisper_options)
+WHISPER_ALLOWED_PARAMETERS = {
+    'audio_file_path': str,
+    'language': str,
+    'model': str,
+    'device': str,
+    'task': str,
+    'initial_prompt': str,
+
+    'beam_size': int,
+    'best_of': int,
+    'temperature': float,
+    'compression_ratio_threshold': float,
+    'logprob_threshold': float,
+    'no_speech_threshold': float,
+    'word_timestamps': bool,
+    'prepend_punctuations': bool,
+    'append_punctuations': bool,
+    'prompt': str,
+
+    # mots_whisper specific parameters
+    'queue_id': str
+}
+
+# the transcription options that change the transcription result, besides the whisper options
+# (we use them to tell if we can re-use a cached transcription result, see ToolkitOps.get_transcription_cache_key)
+TRANSCRIPTION_CACHE_OPTIONS = (
+    'time_intervals', 'excluded_time_intervals', 'pre_detect_speech',
+    'split_on_punctuation_marks', 'max_words_per_segment', 'max_chars_per_segment',
+    'prevent_short_gaps', 'post_remove_word_timestamps', 'keep_whisper_debug_info'
+)
+
+# the debugging info that whisper adds to each transcript segment, which we remove unless we're told to keep it
+WHISPER_DEBUG_KEYS = frozenset({'tokens', 'seek', 'temperature', 'avg_logprob', 'compression_ratio', 'no_speech_prob'})
+
+# the text of the speaker segments added by speaker detection (for e.g. "Speaker 2")
+SPEAKER_SEGMENT_TEXT_REGEX = re.compile(r'^Speaker (\d+)$')
+
+# how often (in transcribed batches of audio segments) we save the transcription while transcribing
+TRANSCRIPTION_CHECKPOINT_BATCHES = 16
+
+# the loaded silero VAD models and their utils, by their onnx flag (see ToolkitOps.get_vad_model)
+VAD_MODELS = {}
+
+# the onnxruntime sessions that we use for batched VAD inference, by device type (see ToolkitOps.get_vad_batch_session)
+VAD_BATCH_SESSIONS = {}
+
+# this guards both the loading and the use of the VAD models, since they keep their own state
+VAD_MODEL_LOCK = Lock()
+
+# how often we poll Resolve (in seconds):
+# right after something changed in Resolve we poll at the min interval,
+# then, while nothing changes, the interval doubles until it reaches the max interval
+RESOLVE_POLL_MIN_INTERVAL = 0.1
+RESOLVE_POLL_MAX_INTERVAL = 1.0
+
+# the punctuation marks on which we split transcription segments by default
+DEFAULT_PUNCTUATION_MARKS = ('.', '!', '?', '…')
+
+# the segments that can be questions (see ToolkitOps.group_questions):
+# the ones that contain a question mark, or that start with a question word or a request to tell something
+QUESTION_CANDIDATE_REGEX = re.compile(
+    r'\?|^\W*(who|whom|whose|what|where|when|why|how|which|is|are|was|were|am|do|does|did|have|has|had'
+    r'|can|could|would|should|will|shall|may|might|tell|describe|explain)\b',
+    re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=8)
+def get_punctuation_marks_regex(punctuation_marks=DEFAULT_PUNCTUATION_MARKS):
+    """
+    Returns a compiled regex that matches any run of the given punctuation marks
+    """
+
+    # the longer marks go first, so that they're not matched partially
+    return re.compile('(?:{})+'.format(
+        '|'.join(re.escape(mark) for mark in sorted(punctuation_marks, key=len, reverse=True) if mark)))
+
+
+# compile the default punctuation marks regex when the module loads
+get_punctuation_marks_regex()
+
+
+class PrecomputedVADModel:
+    """
+    This stands in for the silero VAD model when calling silero's get_speech_timestamps
+    with speech probabilities that were already calculated (in batches) for each window of the audio.
+    """
+
+    def __init__(self, speech_probs):
+        self.speech_probs = speech_probs
+        self.window_index = 0
+
+    def reset_states(self, *args, **kwargs):
+        self.window_index = 0
+
+    def __call__(self, x, sr):
+
+        # get_speech_timestamps asks for the windows in order, so we just return the next probability
+        speech_prob = self.speech_probs[self.window_index] if self.window_index < len(self.speech_probs) else 0.0
+        self.window_index += 1
+
+        return torch.tensor(speech_prob)
+
 
 class NLE:
     """
@@ -75,8 +222,27 @@ class NLE:
     resolve_poll_num = 0
 
     # this is used to suspend polling to avoid requests when the NLE might be busy
+    # (use set_suspend_polling, so that the polling thread can sleep until polling is resumed)
     suspend_polling = False
 
+    # this is cleared while polling is suspended (see ToolkitOps.poll_resolve_data)
+    polling_resumed = Event()
+    polling_resumed.set()
+
+    @staticmethod
+    def set_suspend_polling(suspend: bool):
+        """
+        Suspends or resumes the NLE polling
+        """
+
+        if suspend:
+            NLE.polling_resumed.clear()
+            NLE.suspend_polling = True
+
+        else:
+            NLE.suspend_polling = False
+            NLE.polling_resumed.set()
+
     @staticmethod
     def reset_all():
 
@@ -133,11 +299,78 @@ class ToolkitOps:
         # use this to store the whisper model later
         self.whisper_model = None
 
+        # the OpenAI whisper models that we load on the other CUDA devices, by (model name, device index)
+        # (see get_multi_gpu_whisper_models)
+        self.whisper_multi_gpu_models = {}
+
+        # all the transcriptions share the same whisper model, so only one of them can (re)load it at a time
+        self.whisper_model_lock = RLock()
+
+        # how many transcriptions are using the whisper model right now
+        # (see _initialize_whisper_transcribe and _release_whisper_model)
+        self.whisper_model_users = 0
+
+        # the timer that unloads the whisper model if it wasn't used for a while
+        self.whisper_model_unload_timer = None
+
+        # how many batches can go through the faster-whisper model at the same time
+        # (CTranslate2 can run the transcribe calls from different threads in parallel)
+        self.whisper_inference_semaphore = BoundedSemaphore(max(1, torch.cuda.device_count() * 2))
+
+        # each OpenAI whisper model installs its kv-cache hooks on its (shared) decoder for each decode,
+        # so only one batch can go through each of these models at a time (see get_whisper_inference_lock)
+        self.whisper_inference_locks = weakref.WeakKeyDictionary()
+        self.whisper_inference_locks_lock = Lock()
+
+        # the zero-shot text classifier pipelines that we already loaded, by (model name, device, batch size)
+        # so that we don't load the model again for each classify_segments call (see unload_text_classifiers)
+        self.text_classifiers = {}
+
+        # the silero VAD model is shared by all the ToolkitOps objects of this process (see get_vad_model)
+        # - the lock makes sure that the queue threads don't load the model at the same time
+        #   and that they don't use it at the same time either, since the model keeps its own state
+        self.vad_model_lock = VAD_MODEL_LOCK
+
+        # the onnxruntime sessions that we use for batched VAD inference, by device type ('cpu' or 'cuda')
+        # (False if a session is not available for that device type)
+        self.vad_batch_sessions = VAD_BATCH_SESSIONS
+
+        # this converts the audio arrays into the tensors that we pass to VAD
+        # - always on the CPU, since both the silero utils and the onnx model need CPU tensors
+        self.vad_tensor_factory = functools.partial(torch.as_tensor, dtype=torch.float32, device='cpu')
+
         # load the whisper model from the config
         # we're recommending the medium model for better accuracy vs. time it takes to process
         # if in doubt use the large model but that will need more time
         self.whisper_model_name = self.stAI.get_app_setting(setting_name='whisper_model_name', default_if_none='medium')
 
+        # which backend to use for whisper:
+        # 'openai' for the original PyTorch implementation or 'faster_whisper' for the CTranslate2 implementation
+        self.whisper_backend = self.stAI.get_app_setting(setting_name='whisper_backend', default_if_none='openai')
+
+        # the CTranslate2 compute type of the faster_whisper backend (for e.g. 'int8', 'int8_float16' or 'float16')
+        # - 'auto' uses int8 on CPU and int8 weights with float16 activations on CUDA
+        self.faster_whisper_compute_type = \
+            self.stAI.get_app_setting(setting_name='faster_whisper_compute_type', default_if_none='auto')
+
+        # how many CPU threads the faster_whisper backend should use (0 lets CTranslate2 decide, which means 4)
+        # - by default, we use about one thread per physical core
+        self.faster_whisper_cpu_threads = \
+            self.stAI.get_app_setting(setting_name='faster_whisper_cpu_threads',
+                                      default_if_none=max(4, (os.cpu_count() or 8) // 2))
+
+        # how to quantize the OpenAI whisper model when running on CPU: 'none', 'int8_dynamic' or 'int4_hqq'
+        self.whisper_quantization = \
+            self.stAI.get_app_setting(setting_name='whisper_quantization', default_if_none='none')
+
+        # which backend to use for the OpenAI whisper model when running on CPU:
+        # 'default' or 'ipex_bf16' (Intel Extension for PyTorch with bfloat16 autocast, for CPUs with AMX)
+        self.whisper_cpu_backend = \
+            self.stAI.get_app_setting(setting_name='cpu_backend', default_if_none='default')
+
+        # whether to compile the OpenAI whisper model with torch.compile when running on CUDA
+        self.use_torch_compile = self.stAI.get_app_setting(setting_name='use_torch_compile', default_if_none=False)
+
         # get the whisper device setting
         # currently, the setting may be cuda, cpu or auto
         self.torch_device = stAI.get_app_setting('torch_device', default_if_none='auto')
@@ -161,15 +394,15 @@ class ToolkitOps:
         self.processing_queue = ProcessingQueue(toolkit_ops_obj=self)
 
         # this is used by the queue dispatcher to know which functions to call depending on the task
-        # the key is the name of the task, the value is a list of functions to call for that task
+        # the key is the name of the task, the value is the function to call for that task
         # the queue dispatcher may also merge multiple tasks into one (for eg. if transcribe+ingest is called)
         self.queue_tasks = {
-            'transcribe': [self.whisper_transcribe],
-            'translate': [self.whisper_transcribe],
-            'group_questions': [self.group_questions],
-            'index_text': [self.index_text],
-            'index_video': [self.index_video],
-            'speaker_detection': [self.speaker_detection]
+            'transcribe': self.whisper_transcribe,
+            'translate': self.whisper_transcribe,
+            'group_questions': self.group_questions,
+            'index_text': self.index_text,
+            'index_video': self.index_video,
+            'speaker_detection': self.speaker_detection
         }
 
         # use this to store all the devices that can be used for processing queue tasks
@@ -181,6 +414,15 @@ class ToolkitOps:
         # if this is True, it means that there is a polling thread running
         self.polling_resolve = False
 
+        # setting this wakes up the polling thread, so it polls Resolve right away (see poll_resolve_data)
+        self.resolve_poll_wakeup = Event()
+
+        # the current polling interval, which gets shorter while things change in Resolve
+        self.resolve_poll_interval = RESOLVE_POLL_MIN_INTERVAL
+
+        # the data from the last poll that we've already used to update the NLE data
+        self.resolve_data_last_polled = None
+
         # to hold the resolve API object
         self.resolve_api = None
 
@@ -202,6 +444,17 @@ class ToolkitOps:
         if not self.disable_resolve_api:
             self.resolve_enable()
 
+        # start loading the whisper model in the background, so it's ready when the first transcription starts
+        # (but only if the model was downloaded before, so we don't download a model that might not be needed)
+        # (we also keep the model name and device that it's loading with, so we know if we can use it later)
+        self.whisper_model_future = None
+        self.whisper_model_future_key = None
+        if self.stAI.get_app_setting(setting_name='whisper_preload_model', default_if_none=True) \
+                and self.stAI.get_app_setting(setting_name='whisper_model_downloaded_{}'
+                                              .format(self.whisper_model_name), default_if_none=False):
+            self.whisper_model_future_key = (self.whisper_model_name, self.get_torch_device_type(self.torch_device))
+            self.whisper_model_future = self.submit_task(self._preload_whisper_model)
+
         # if this is not the CLI
         # resume the transcription queue if there's anything in it
         if self.stAI.cli_args and self.stAI.cli_args.mode != 'cli' and self.processing_queue.resume_queue_from_file():
@@ -238,21 +491,55 @@ class ToolkitOps:
         Use this to notify all observers if a certain action has been performed
         """
 
+        # the observers are already grouped by action, so we only look at the ones for this action
+        observers = self._observers.get(action, None)
+
         # no observers for this action
-        if action not in self._observers:
+        if not observers:
             return False
 
         # notify all observers for this action
-        for observer in self._observers[action]:
+        # (iterate over a copy, since an observer might detach itself or others during its update)
+        for observer in tuple(observers):
             observer.update()
 
+    def notify_observers_bulk(self, actions):
+        """
+        Use this to notify the observers of several actions at once
+        (each observer is only notified once, even if it observes more than one of the actions)
+        """
+
+        notified_observers = set()
+
+        for action in actions:
+            for observer in tuple(self._observers.get(action, ())):
+
+                # skip the observers that we already notified for a previous action
+                if id(observer) in notified_observers:
+                    continue
+
+                notified_observers.add(id(observer))
+                observer.update()
+
+        return len(notified_observers) > 0
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def is_cuda_available() -> bool:
+        """
+        This checks if CUDA is available only once per process,
+        since torch.cuda.is_available() queries the CUDA driver on each call
+        """
+
+        return torch.cuda.is_available()
+
     def get_torch_available_devices(self) -> list or None:
 
         # prepare a list of available devices
         available_devices = ['cpu']
 
         # and add cuda to the available devices, if it is available
-        if torch.cuda.is_available():
+        if self.is_cuda_available():
             available_devices.append('CUDA')
 
         return available_devices
@@ -266,56 +553,67 @@ class ToolkitOps:
             logger.warning('The source file path is not a directory. Aborting.')
             return False
 
-        # if the source file path is a file, return the file path
-        elif os.path.isdir(dir_path):
+        return [media_file.path for media_file in self.scan_valid_media_files_in_dir(dir_path, recursive=recursive)]
 
-            # get all the files in the directory
-            # either recursively
-            if not recursive:
-                all_files = os.listdir(dir_path)
-            else:
-                all_files = []
-                reached_limit = False
-                for root, dirs, files in os.walk(dir_path):
-                    for file in files:
-                        all_files.append(os.path.join(root, file))
+    def scan_valid_media_files_in_dir(self, dir_path, recursive=False):
+        """
+        This yields a MediaFileEntry (path, stat) for each valid media file in the directory.
+        We're using os.scandir, which gets the file types while reading the directory,
+        so we only need to stat the files that have a valid media extension
+        (and we keep that stat so that the files don't need to be stat-ed again when probing them)
+        """
 
-                        if len(all_files) > int(self.stAI.get_app_setting('ingest_file_limit', default_if_none=30)):
-                            logger.warning('Going over the ingest files limit. Stopping at {} files.'
-                                           .format(len(all_files)))
+        # the ingest limit only applies to recursive scans
+        file_limit = int(self.stAI.get_app_setting('ingest_file_limit', default_if_none=30)) if recursive else None
 
-                            reached_limit = True
-                            break
+        file_count = 0
 
-                    if reached_limit:
-                        break
+        # the directories we still need to scan (only the first one, unless this is a recursive scan)
+        dirs_to_scan = deque([dir_path])
 
-            # filter out the valid media files
-            valid_media_files \
-                = [os.path.join(dir_path, file) for file in all_files if self.is_valid_media_file(file)]
+        while dirs_to_scan:
 
-            return valid_media_files
+            current_dir = dirs_to_scan.popleft()
 
-        # if the source file path is neither a file nor a directory, return False
-        return False
+            try:
+                with os.scandir(current_dir) as dir_entries:
+
+                    for dir_entry in dir_entries:
+
+                        # go into sub-directories only if this is a recursive scan (without following symlinks)
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                dirs_to_scan.append(dir_entry.path)
+                            continue
+
+                        if not dir_entry.is_file() or not self.is_valid_media_file(dir_entry.name):
+                            continue
+
+                        try:
+                            file_stat = dir_entry.stat()
+                        except OSError:
+                            continue
+
+                        yield MediaFileEntry(path=dir_entry.path, stat=file_stat)
+
+                        file_count += 1
+
+                        if file_limit is not None and file_count >= file_limit:
+                            logger.warning('Reached the ingest files limit. Stopping at {} files.'
+                                           .format(file_count))
+                            return
+
+            # skip the directories we can't read (just like os.walk does)
+            except OSError:
+                logger.debug('Cannot read directory {}. Skipping.'.format(current_dir))
+                continue
 
     def is_valid_media_file(self, source_file_path):
         """
         This checks if the source file path is a valid media file by checking the extension
         """
 
-        if not source_file_path:
-            return False
-
-        # get the file extension
-        file_extension = os.path.splitext(source_file_path)[1].lower()
-
-        # check if the file extension is valid
-        if file_extension in ['.mov', '.mp4', '.mp3', '.wav', '.aif', '.aiff']:
-            return True
-
-        # if the file extension is not valid, return False
-        return False
+        return bool(source_file_path) and os.path.splitext(source_file_path)[1].lower() in VALID_MEDIA_EXTENSIONS
 
     def add_media_to_queue(self, source_file_paths: str or list = None, queue_id: str = None,
                            transcription_settings=None, video_indexing_settings=None,
@@ -343,6 +641,9 @@ class ToolkitOps:
         # this is the path variable we'll use to send the items to the queue
         valid_source_file_paths = []
 
+        # the os.stat results we already have from scanning directories, so we don't need to stat those files again
+        source_file_stats = {}
+
         # loop through the source file paths
         for source_file_path in source_file_paths:
 
@@ -356,7 +657,9 @@ class ToolkitOps:
             if os.path.isdir(source_file_path):
 
                 # get all the valid media files in the folder
-                valid_source_file_paths += self.get_all_valid_media_paths_in_dir(source_file_path, recursive=True)
+                for media_file in self.scan_valid_media_files_in_dir(source_file_path, recursive=True):
+                    valid_source_file_paths.append(media_file.path)
+                    source_file_stats[media_file.path] = media_file.stat
 
             # if it's a FILE, check if it's a valid media file
             if os.path.isfile(source_file_path):
@@ -377,19 +680,26 @@ class ToolkitOps:
         # this will hold all the queue ids generated in this call
         queued = []
 
+        # check if there are audio and video streams in the files
+        # - we're doing this in parallel since each probe mostly waits for an ffprobe subprocess
+        # (map returns the results in the same order as the source file paths)
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as probe_executor:
+            probes = list(probe_executor.map(
+                lambda file_path: MediaItem.probe_streams(file_path, file_stat=source_file_stats.get(file_path)),
+                valid_source_file_paths
+            ))
+
         # if there are valid source file paths, add each of them to the queue
-        for source_file_path in valid_source_file_paths:
+        for source_file_path, probe in zip(valid_source_file_paths, probes):
 
             logger.debug('Reading {} to add to the queue.'.format(source_file_path))
 
-            # check if there are audio streams in the file
-            has_audio = MediaItem.has_audio(source_file_path)
+            has_audio = probe['has_audio']
 
             logger.debug('File {} {} a valid audio stream.'
                          .format(source_file_path, 'has' if has_audio else 'does not have'))
 
-            # check if there are valid video streams in the file
-            has_video = MediaItem.has_video(source_file_path)
+            has_video = probe['has_video']
 
             logger.debug('File {} {} a valid video stream.'
                          .format(source_file_path, 'has' if has_video else 'does not have'))
@@ -424,9 +734,6 @@ class ToolkitOps:
                     queued.extend(transcription_queue_id)
                     transcription_queue_ids.extend(transcription_queue_id)
 
-                # throttle a bit to avoid collisions etc.
-                time.sleep(0.05)
-
             # create a video indexing job only if we have video indexing settings
             if has_video and video_indexing_settings is not None and isinstance(video_indexing_settings, dict):
 
@@ -450,9 +757,7 @@ class ToolkitOps:
 
             # if there is no video, but the file looks like a video file, log this
             elif not has_video \
-                and (source_file_path.endswith('.mp4')
-                     or source_file_path.endswith('.mov')
-                     or source_file_path.endswith('.avi')):
+                    and os.path.splitext(source_file_path)[1].lower() in VIDEO_CONTAINER_EXTENSIONS:
 
                 logger.debug('Skipping video indexing for file {} - no video streams found or codec unknown.'
                              .format(source_file_path))
@@ -672,46 +977,43 @@ class ToolkitOps:
         and returns the ones that are relevant to mots_whisper
         """
 
-        allowed_parameters = [
-            ('audio_file_path', str),
-            ('language', str),
-            ('model', str),
-            ('device', str),
-            ('task', str),
-            ('initial_prompt', str),
-
-            ('beam_size', int),
-            ('best_of', int),
-            ('temperature', float),
-            ('compression_ratio_threshold', float),
-            ('logprob_threshold', float),
-            ('no_speech_threshold', float),
-            ('word_timestamps', bool),
-            ('prepend_punctuations', bool),
-            ('append_punctuations', bool),
-            ('prompt', str),
-
-            # mots_whisper specific parameters
-            ('queue_id', str)
-        ]
+        # only keep the parameters that are allowed and are of the correct type
+        return {param: value for param, value in parameters.items()
+                if param in WHISPER_ALLOWED_PARAMETERS and isinstance(value, WHISPER_ALLOWED_PARAMETERS[param])}
+
+    def get_whisper_batch_size_setting(self) -> int:
+        """
+        This returns the whisper_batch_size app setting (at least 1)
+        """
+
+        try:
+            batch_size = int(self.stAI.get_app_setting('whisper_batch_size', default_if_none=1))
+        except (ValueError, TypeError):
+            batch_size = 1
 
-        filtered_parameters = {}
+        return max(1, batch_size)
 
-        # filter out the parameters that are not allowed
-        # by checking if they are in the allowed_parameters list
-        for param, param_type in allowed_parameters:
+    def get_whisper_batch_size(self) -> int:
+        """
+        This returns how many 30-second audio windows we should decode at once,
+        according to the whisper_batch_size app setting.
+        Batching across audio segments only works with the OpenAI Whisper backend
+        and with the faster-whisper versions that have a batched pipeline which accepts clip timestamps,
+        so we return 1 for anything else.
+        """
 
-            # if the parameter is in the list and is of the correct type
-            if param in parameters and isinstance(parameters[param], param_type):
+        import storytoolkitai.integrations.mots_whisper as whisper
 
-                # add it to the filtered parameters
-                filtered_parameters[param] = parameters[param]
+        if not isinstance(self.whisper_model, whisper.Whisper) \
+                and not getattr(self.whisper_model, 'can_transcribe_batch', False):
+            return 1
 
-        # return only the filtered parameters
-        return filtered_parameters
+        return self.get_whisper_batch_size_setting()
 
     def get_whisper_available_languages(self) -> list or None:
 
+        from whisper import tokenizer as whisper_tokenizer
+
         available_languages = whisper_tokenizer.LANGUAGES.values()
 
         if not available_languages or available_languages is None:
@@ -726,17 +1028,15 @@ class ToolkitOps:
         :return:
         '''
 
-        allowed_devices = ['cuda', 'CUDA', 'gpu', 'GPU', 'cpu', 'CPU']
-
         # change the torch device if it was passed as a parameter
-        if device is not None and device in allowed_devices:
+        if device is not None and device in TORCH_ALLOWED_DEVICES:
             self.torch_device = device
 
         # if the torch device is set to cuda
-        if self.torch_device in ['cuda', 'CUDA', 'gpu', 'GPU']:
+        if self.torch_device in TORCH_CUDA_DEVICES:
 
             # use CUDA only if available
-            if torch.cuda.is_available():
+            if self.is_cuda_available():
                 self.torch_device = device = torch.device('cuda')
 
             # or let the user know that cuda is not available and switch to cpu
@@ -745,74 +1045,135 @@ class ToolkitOps:
                 self.torch_device = device = torch.device('cpu')
 
         # if the torch device is set to cpu
-        elif self.torch_device in ['cpu', 'CPU']:
+        elif self.torch_device in TORCH_CPU_DEVICES:
             self.torch_device = device = torch.device('cpu')
 
         # any other setting, defaults to automatic selection
         else:
             # use CUDA if available, or CPU otherwise
-            self.torch_device = device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            self.torch_device = device = torch.device('cuda' if self.is_cuda_available() else 'cpu')
 
         logger.debug('Using {} for Torch.'.format(device))
 
         return self.torch_device
 
+    @staticmethod
+    def get_torch_device_type(device) -> str or None:
+        """
+        This returns the type of the passed torch device or device name (for e.g. 'cuda' or 'cpu'),
+        so that we can compare the devices that were passed as torch.device objects with the ones passed as strings
+        """
+
+        if device is None:
+            return None
+
+        if isinstance(device, torch.device):
+            return device.type
+
+        if device in TORCH_CUDA_DEVICES:
+            return 'cuda'
+
+        if device in TORCH_CPU_DEVICES:
+            return 'cpu'
+
+        # for e.g. 'cuda:1' or any other device name that torch knows
+        try:
+            return torch.device(device).type
+
+        except (RuntimeError, TypeError):
+            return str(device)
+
     def split_audio_by_intervals(self, audio_array, time_intervals=None, sr=16_000):
         """
         Splits the audio_array according to the time_intervals
         and returns a audio_segments list with multiple audio_arrays
         together with the time_intervals passed to the function
-        """
 
-        # reset the audio segments list
-        audio_segments = []
+        The audio arrays of the segments are views of the audio_array (not copies),
+        so don't modify them in place
+        """
 
         # if there are time segments
         if time_intervals is not None and time_intervals \
                 and type(time_intervals) == list and len(time_intervals) > 0:
 
-            # sort the audio segments by start time
-            time_intervals = sorted(time_intervals, key=lambda x: x[0])
-
             # combine overlapping segments
+            # (this also sorts the segments by start time)
             time_intervals = self.combine_intervals(time_intervals, 0)
 
-            # take each time segment
-            for time_interval in time_intervals:
-                # calculate duration based on start and end times!!
+            # calculate the sample boundaries of all the time segments at once
+            sample_boundaries = (np.asarray(time_intervals, dtype=np.float64) * sr).astype(np.int64)
 
-                # and add it to an audio segments list
-                # the format is [start_time, end_time, audio_array]
-                audio_segment = [time_interval[0],
-                                 time_interval[1],
-                                 audio_array[int(time_interval[0] * sr): int(time_interval[1] * sr)]
-                                 ]
+            # take each time segment and add it to an audio segments list
+            # the format is [start_time, end_time, audio_array]
+            audio_segments = [[time_interval[0], time_interval[1], audio_array[start_sample:end_sample]]
+                              for time_interval, (start_sample, end_sample) in zip(time_intervals, sample_boundaries)]
 
-                audio_segments.append(audio_segment)
             return audio_segments, time_intervals
 
         # if time_intervals is empty, define it as a single segment,
         # from the beginning to the end (i.e. we're transcribing the full audio)
         time_intervals = [[0, len(audio_array) / sr]]
-        audio_segments = [[0, len(audio_array / sr), audio_array]]
+        audio_segments = [[0, len(audio_array) / sr, audio_array]]
         return audio_segments, time_intervals
 
-    def get_speech_intervals(self, audio_segment, **kwargs):
+    @staticmethod
+    def split_audio_segments_into_windows(audio_segments, max_duration=30, sr=16_000):
         """
-        Returns an array of start and end times of the segments of speech in the audio_segment
+        Splits the audio segments that are longer than max_duration into smaller audio segments,
+        so that each of them fits in a single Whisper window.
+        To avoid cutting through words, each cut is made at the quietest moment
+        in the last few seconds of the window.
 
-        :param audio_segment: a numpy array with the audio segment
-        :return: a list of start and end times of the segments of speech in the audio_segment
+        :param audio_segments: a list of [start_time, end_time, audio_array]
+        :return: a list of [start_time, end_time, audio_array]
         """
 
-        sample_rate = kwargs.get('sample_rate', 16_000)
+        window_size = int(max_duration * sr)
+        search_size = int(min(5, max_duration / 2) * sr)
+        frame_size = int(0.1 * sr)
+
+        windowed_audio_segments = []
+        for audio_segment_start, audio_segment_end, audio_array in audio_segments:
+
+            offset = 0
+            while len(audio_array) - offset > window_size:
+
+                # find the 100ms frame with the lowest energy towards the end of the window
+                search_start = offset + window_size - search_size
+                search_area = audio_array[search_start:offset + window_size]
+                num_frames = len(search_area) // frame_size
+                frame_energy = np.square(search_area[:num_frames * frame_size]).reshape(num_frames, frame_size) \
+                    .mean(axis=1)
+
+                # and cut in the middle of it
+                cut = search_start + int(np.argmin(frame_energy)) * frame_size + frame_size // 2
+
+                windowed_audio_segments.append(
+                    [audio_segment_start + offset / sr, audio_segment_start + cut / sr, audio_array[offset:cut]])
+
+                offset = cut
+
+            windowed_audio_segments.append([audio_segment_start + offset / sr, audio_segment_end, audio_array[offset:]])
+
+        return windowed_audio_segments
+
+    def get_vad_model(self, onnx=True):
+        """
+        This returns the silero VAD model and its utils,
+        and loads them only the first time they're needed in this process
+        (call this while holding the vad_model_lock)
+        """
+
+        # even with force_reload=False, torch.hub.load checks the cache folder and re-imports the hubconf,
+        # so we only call it once and then share the model with all the ToolkitOps objects
+        if onnx in VAD_MODELS:
+            return VAD_MODELS[onnx]
 
-        # Removes silences from the audio file.
-        # This results in better transcription quality, without hallucinations.
         try:
-            vad_model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False,
-                                              onnx=True, trust_repo=True, verbose=False)
-            (get_speech_timestamps, _, read_audio, _, collect_chunks) = utils
+            VAD_MODELS[onnx] = torch.hub.load(
+                repo_or_dir=SILERO_VAD_REPO, model='silero_vad', force_reload=False,
+                onnx=onnx, trust_repo=True, verbose=False)
 
         except (PermissionError, FileNotFoundError):
             logger.error(
@@ -826,30 +1187,195 @@ class ToolkitOps:
             # pass the error to whatever called this function
             raise
 
-        # convert the audio_segment to a torch tensor
+        return VAD_MODELS[onnx]
+
+    def get_vad_batch_session(self, device_type='cpu'):
+        """
+        This returns an onnxruntime session of the silero VAD v5 model, which we can use for batched inference,
+        or None if it's not available (call this while holding the vad_model_lock)
+
+        :param device_type: 'cuda' to run the session on the GPU (if onnxruntime-gpu is installed), or 'cpu'
+        """
+
+        if device_type in self.vad_batch_sessions:
+            return self.vad_batch_sessions[device_type] or None
+
+        self.vad_batch_sessions[device_type] = False
+
+        try:
+            import onnxruntime
+
+        except ImportError:
+            logger.debug('onnxruntime is not available. Not using batched VAD inference.')
+            return None
+
+        # find the onnx model file in the torch hub folder of the silero repo
+        vad_repo_dir = os.path.join(torch.hub.get_dir(), SILERO_VAD_REPO.replace('/', '_').replace(':', '_'))
+        vad_model_files = glob.glob(os.path.join(vad_repo_dir, '**', 'silero_vad.onnx'), recursive=True)
+
+        if not vad_model_files:
+            logger.debug('Silero VAD onnx model not found in {}. Not using batched VAD inference.'
+                         .format(vad_repo_dir))
+            return None
+
+        # use the CUDA provider if we're supposed to run on CUDA and onnxruntime-gpu is installed
+        # (don't install onnxruntime and onnxruntime-gpu side by side, since they conflict)
+        providers = ['CPUExecutionProvider']
+        if device_type == 'cuda':
+
+            if 'CUDAExecutionProvider' in onnxruntime.get_available_providers():
+                providers = ['CUDAExecutionProvider', 'CPUExecutionProvider']
+            else:
+                logger.debug('The CUDA provider for onnxruntime is not available. Running VAD on CPU.')
+
+        # on Apple Silicon, let CoreML run the model on the GPU / Neural Engine
+        # (the model is compiled for CoreML only once, since we keep the session for the whole process)
+        elif platform.system() == 'Darwin' and platform.machine() == 'arm64' \
+                and 'CoreMLExecutionProvider' in onnxruntime.get_available_providers():
+            providers = ['CoreMLExecutionProvider', 'CPUExecutionProvider']
+
+        try:
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = os.cpu_count() or 1
+            session_options.inter_op_num_threads = 1
+
+            vad_batch_session = onnxruntime.InferenceSession(
+                vad_model_files[0], sess_options=session_options, providers=providers)
+
+        except Exception:
+            logger.debug('Could not load Silero VAD onnx model. Not using batched VAD inference.', exc_info=True)
+            return None
+
+        # only the v5 model has the single state input which allows us to run independent streams in a batch
+        if 'state' not in [session_input.name for session_input in vad_batch_session.get_inputs()]:
+            logger.debug('The Silero VAD onnx model does not support batched inference.')
+            return None
+
+        self.vad_batch_sessions[device_type] = vad_batch_session
+
+        return vad_batch_session
+
+    def get_vad_speech_probabilities(self, audio_array, sample_rate=16_000, batch_size=None):
+        """
+        This calculates the speech probabilities for each 512-sample window of the audio using the silero VAD model,
+        by splitting the audio into consecutive streams and running the same window of all the streams in one batch.
+        Each stream keeps its own model state, just like it would if we ran it on its own.
+
+        Returns a numpy array with one probability per window (the same windows as silero's get_speech_timestamps)
+        or None if batched inference is not available
+        """
+
+        # the model expects 512-sample windows at 16kHz, with the last 64 samples of the previous window as context
+        window_size = 512
+        context_size = 64
+
+        # each stream must be long enough for the model state to settle
+        min_stream_windows = 500
+
+        if sample_rate != 16_000:
+            return None
+
+        # run on CUDA if that's what the toolkit uses
+        vad_batch_session = self.get_vad_batch_session(
+            device_type='cuda' if torch.device(self.torch_device).type == 'cuda' else 'cpu')
+
+        if vad_batch_session is None:
+            return None
+
+        num_windows = math.ceil(len(audio_array) / window_size)
+
+        if num_windows == 0:
+            return None
+
+        # use about twice as many streams as CPU threads by default
+        if not batch_size:
+            batch_size = (os.cpu_count() or 1) * 2
+
+        num_streams = max(1, min(int(batch_size), num_windows // min_stream_windows))
+        stream_windows = math.ceil(num_windows / num_streams)
+
+        # pad the audio so that we can split it into streams of windows (num_streams, stream_windows, window_size)
+        padded_audio = np.zeros(num_streams * stream_windows * window_size, dtype=np.float32)
+        padded_audio[:len(audio_array)] = audio_array
+        windows = padded_audio.reshape(num_streams, stream_windows, window_size)
+
+        state = np.zeros((2, num_streams, 128), dtype=np.float32)
+        sr = np.array(sample_rate, dtype=np.int64)
+        speech_probs = np.zeros((num_streams, stream_windows), dtype=np.float32)
+
+        for window_index in range(stream_windows):
+
+            # the context is the end of the previous window of each stream (or silence for the first window)
+            context = windows[:, window_index - 1, -context_size:] if window_index > 0 \
+                else np.zeros((num_streams, context_size), dtype=np.float32)
+
+            output, state = vad_batch_session.run(
+                None,
+                {'input': np.concatenate([context, windows[:, window_index]], axis=1), 'state': state, 'sr': sr}
+            )
+
+            speech_probs[:, window_index] = output[:, 0]
+
+        # put the streams back in order and remove the probabilities of the padded windows
+        return speech_probs.reshape(-1)[:num_windows]
+
+    def get_speech_intervals(self, audio_segment, **kwargs):
+        """
+        Returns an array of start and end times of the segments of speech in the audio_segment
+
+        :param audio_segment: a numpy array with the audio segment
+        :return: a list of start and end times of the segments of speech in the audio_segment
+        """
+
+        sample_rate = kwargs.get('sample_rate', 16_000)
+
+        # convert the audio_segment to a float32 torch tensor (silero's native dtype)
+        # - this shares the memory of the audio array if it's already float32, so it doesn't copy it
         # if the audio segment is a list containing the start time, end time and the audio array,
         #  we only take the audio array
-        if isinstance(audio_segment, list) and len(audio_segment) == 3:
-            audio_segment_torch = torch.from_numpy(audio_segment[2])
-        else:
-            audio_segment_torch = torch.from_numpy(audio_segment)
+        audio_segment_torch = self.vad_tensor_factory(
+            audio_segment[2] if isinstance(audio_segment, list) and len(audio_segment) == 3 else audio_segment)
+
+        # Removes silences from the audio file.
+        # This results in better transcription quality, without hallucinations.
+        with self.vad_model_lock:
 
-        speech_timestamps = get_speech_timestamps(audio_segment_torch, vad_model,
-                                                  sampling_rate=sample_rate,
-                                                  window_size_samples=512,
-                                                  speech_pad_ms=kwargs.get('silence_threshold', 200),
-                                                  threshold=kwargs.get('silence_threshold', 0.5),
-                                                  )
+            vad_model, utils = self.get_vad_model()
+            (get_speech_timestamps, _, read_audio, _, collect_chunks) = utils
 
-        # convert speech_timestamps to seconds using the sample rate
-        # the speech_timestamps format is [{'start': start_time, 'end': end_time], ...]
-        speech_timestamps = [[speech_timestamp['start'] / sample_rate, speech_timestamp['end'] / sample_rate]
-                             for speech_timestamp in speech_timestamps]
+            # calculate the speech probabilities of all the audio windows in batches
+            # and let get_speech_timestamps use them instead of running the model on each window
+            speech_probs = self.get_vad_speech_probabilities(
+                audio_segment_torch.numpy(), sample_rate=sample_rate,
+                batch_size=kwargs.get('vad_batch_size',
+                                      self.stAI.get_app_setting('vad_batch_size', default_if_none=None))
+            )
+
+            if speech_probs is not None:
+                vad_model = PrecomputedVADModel(speech_probs)
+
+            # make sure that nothing is left in the model state from the previous call
+            vad_model.reset_states()
+
+            speech_timestamps = get_speech_timestamps(audio_segment_torch, vad_model,
+                                                      sampling_rate=sample_rate,
+                                                      window_size_samples=512,
+                                                      speech_pad_ms=kwargs.get('silence_threshold', 200),
+                                                      threshold=kwargs.get('silence_threshold', 0.5),
+                                                      )
 
         # if there are no speech_timestamps, return an empty list
         if not speech_timestamps:
             return []
 
+        # convert speech_timestamps to seconds using the sample rate, all at once
+        # the speech_timestamps format is [{'start': start_time, 'end': end_time], ...]
+        speech_timestamps = np.fromiter(
+            (sample for speech_timestamp in speech_timestamps
+             for sample in (speech_timestamp['start'], speech_timestamp['end'])),
+            dtype=np.float64, count=len(speech_timestamps) * 2
+        ).reshape(-1, 2) / sample_rate
+
         # combine all the speech_timestamps that are less than X seconds apart
         # this is to avoid having too many small segments
         speech_timestamps = self.combine_intervals(speech_timestamps,
@@ -865,43 +1391,33 @@ class ToolkitOps:
     def combine_intervals(self, intervals, combine_min_time):
         """
         Combines intervals that are less than combine_min_time apart
-        :param intervals: a list of timestamps
+        :param intervals: a list (or an (n, 2) numpy array) of timestamps
         :param combine_min_time: the minimum time (seconds) between two timestamps to be combined
-        :return:
+        :return: a list of the combined timestamps
         """
 
         # if there are no intervals, return an empty list
-        if not intervals or not isinstance(intervals, list) or len(intervals) == 0:
+        if not isinstance(intervals, (list, np.ndarray)) or len(intervals) == 0:
             return []
 
-        # sort the timestamps by start time
-        intervals = sorted(intervals, key=lambda x: x[0])
-
-        # create a new list to store the combined timestamps
-        new_intervals = []
-
-        # take the first timestamp
-        current_timestamp = intervals[0]
-
-        # for each timestamp
-        for interval in intervals[1:]:
-            # if the current timestamp is less than min_time apart from the next timestamp
-            if interval[0] - current_timestamp[1] <= combine_min_time:
-                # combine the two timestamps
-                current_timestamp[1] = interval[1]
-
-            # if the current timestamp is more than min_time apart from the next timestamp
-            else:
-                # add the current timestamp to the new_timestamps list
-                new_intervals.append(current_timestamp)
+        # put the intervals in an (n, 2) array and sort them by start time
+        intervals = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
+        intervals = intervals[np.argsort(intervals[:, 0], kind='stable')]
 
-                # and set the current timestamp to the next timestamp
-                current_timestamp = interval
+        starts = intervals[:, 0]
+        ends = intervals[:, 1]
 
-        # add the last timestamp to the new_timestamps list
-        new_intervals.append(current_timestamp)
+        # an interval starts a new group if it starts more than combine_min_time after
+        # the latest end of all the intervals before it
+        # (the latest end, and not the previous end, so that intervals contained in others don't shorten them)
+        gaps = starts[1:] - np.maximum.accumulate(ends)[:-1]
+        group_first_indexes = np.concatenate(([0], np.flatnonzero(gaps > combine_min_time) + 1))
 
-        return new_intervals
+        # each group starts with the start of its first interval and ends with the latest end in the group
+        return np.column_stack((
+            starts[group_first_indexes],
+            np.maximum.reduceat(ends, group_first_indexes)
+        )).tolist()
 
     def combine_overlapping_intervals(self, intervals, additional_intervals=None):
         '''
@@ -925,25 +1441,47 @@ class ToolkitOps:
 
         # sort the timestamps by start time
         if intervals is not None and type(intervals) is not bool:
-            intervals = sorted(intervals, key=lambda x: x[0])
+            intervals = sorted(intervals, key=itemgetter(0))
 
         # if there are additional intervals,
         # get the intersecting intervals
         if additional_intervals is not None and type(additional_intervals) is not bool:
 
             # sort the additional timestamps by start time
-            additional_intervals = sorted(additional_intervals, key=lambda x: x[0])
+            additional_intervals = np.asarray(additional_intervals, dtype=np.float64).reshape(-1, 2)
+            additional_intervals = additional_intervals[np.argsort(additional_intervals[:, 0], kind='stable')]
+
+            additional_starts = additional_intervals[:, 0]
+            additional_ends = additional_intervals[:, 1]
+
+            # the latest end up to each additional interval
+            # (this is sorted, even if the additional intervals overlap, so we can search in it)
+            additional_ends_max = np.maximum.accumulate(additional_ends)
+
+            intervals_array = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
 
-            intersecting_intervals = []
+            # for all the intervals at once, find the range of additional intervals that can intersect with them:
+            # only the additional intervals that start before the interval ends
+            # and are not completely before it
+            first_indexes = np.searchsorted(additional_ends_max, intervals_array[:, 0], side='left')
+            last_indexes = np.searchsorted(additional_starts, intervals_array[:, 1], side='right')
+            candidate_counts = np.maximum(last_indexes - first_indexes, 0)
 
-            # get the intersecting intervals
-            for interval in intervals:
+            # then pair each interval with each of its candidates, keeping the intervals in order
+            interval_indexes = np.repeat(np.arange(len(intervals_array)), candidate_counts)
+            candidate_indexes = np.arange(candidate_counts.sum()) \
+                - np.repeat(np.cumsum(candidate_counts) - candidate_counts, candidate_counts) \
+                + np.repeat(first_indexes, candidate_counts)
 
-                for additional_interval in additional_intervals:
+            # and only keep the pairs that actually overlap
+            overlapping = additional_ends[candidate_indexes] >= intervals_array[interval_indexes, 0]
+            interval_indexes = interval_indexes[overlapping]
+            candidate_indexes = candidate_indexes[overlapping]
 
-                    if additional_interval[0] <= interval[1] and additional_interval[1] >= interval[0]:
-                        intersecting_intervals.append(
-                            [max(interval[0], additional_interval[0]), min(interval[1], additional_interval[1])])
+            intersecting_intervals = np.column_stack((
+                np.maximum(additional_starts[candidate_indexes], intervals_array[interval_indexes, 0]),
+                np.minimum(additional_ends[candidate_indexes], intervals_array[interval_indexes, 1])
+            )).tolist()
 
             # redeclare the intervals as the intersecting intervals
             intervals = intersecting_intervals
@@ -965,45 +1503,50 @@ class ToolkitOps:
         """
         Splits the segment into multiple segments by the given word limit or character limit.
         The word limit will be overridden by the character limit if both are specified.
+        Returns a list of segments (which only contains the original segment if it can't be split).
         """
 
         if not segment_word_limit and not segment_character_limit:
-            return segment
+            return [segment]
 
         if not isinstance(segment, dict):
             logger.warning('The segment is either empty or not a dictionary.'
                            'Cannot split segment by word or character limit.')
-            return segment
+            return [segment]
 
         # if the segment contains no words, we can't perform the split
         # because we don't know the start and end times of the words
         if 'words' not in segment or not segment['words']:
             logger.warning('Segment does not contain words-level timings. '
                            'Cannot split segment by word or character limit.')
-            return segment
+            return [segment]
 
-        # we need to be aware that the segment might be split multiple times
-        # so we need to keep track of the current segment index
-        current_segment_index = 0
+        # instead of slicing the text over and over again, we keep track of where the remaining text starts
+        segment_text = segment['text']
+        current_text_index = 0
 
-        # we need to keep track of the current segment text - this is what we use to check over and over again
-        current_segment_text = segment['text']
+        # find all the spaces in the text only once
+        # (we use them to find where to split the text according to the word limit)
+        space_indexes = np.fromiter((match.start() for match in re.finditer(' ', segment_text)), dtype=np.int64)
 
-        # we need to keep track of the remaining words in the segment
-        current_segment_words = segment['words']
+        # the words list is a list of dictionaries,
+        # each dictionary containing the word and its start time, end time and probability
+        # considering that the word list is ordered and the words have to have the same order in the resulting segments
+        # and also that the words have the exact same length as the text in the segment
+        # we can use the cumulative character length of the words to determine where each part ends
+        words = segment['words']
+        word_offsets = np.cumsum([len(word['word']) for word in words])
 
-        # we need to keep track of the number of words in the segment
-        # this might be used to determine the number of words to keep in the first part
-        # and the number of words to keep in the second part
-        current_segment_words_count = len(current_segment_words)
+        # the index of the first word that hasn't been added to a resulting segment yet
+        current_word_index = 0
 
         # here we keep track of the segments that result after splitting
         resulting_segments = []
 
         # while the current segment text is longer than the character limit
         # or the current segment has more words than the word limit
-        while (segment_character_limit and len(current_segment_text) > segment_character_limit) \
-                or (segment_word_limit and current_segment_words_count > segment_word_limit):
+        while (segment_character_limit and len(segment_text) - current_text_index > segment_character_limit) \
+                or (segment_word_limit and len(words) - current_word_index > segment_word_limit):
 
             # CHARACTER LIMIT SPLIT
             if segment_character_limit:
@@ -1013,11 +1556,12 @@ class ToolkitOps:
                 # but make sure that you're not splitting a word
                 # so look for the last space before the segment_character_limit
                 # and split 1 character before that to include the space and preserve Whisper's formatting
-                last_space_index = current_segment_text.rfind(' ', 0, segment_character_limit)
+                last_space_index = segment_text.rfind(' ', current_text_index,
+                                                      current_text_index + segment_character_limit)
 
                 # if there is no space before the segment_character_limit, try to find the space after the segment_character_limit
                 if last_space_index == -1:
-                    last_space_index = current_segment_text.find(' ', segment_character_limit)
+                    last_space_index = segment_text.find(' ', current_text_index + segment_character_limit)
 
                 # if there is no space before or after the segment_character_limit, don't split the segment
                 if last_space_index == -1:
@@ -1027,75 +1571,26 @@ class ToolkitOps:
             else:
 
                 # we preserve the number of words according to the word limit by finding the relevant space index
-
-                # does the segment start with a space?
-                # if so, we need to skip the first occurence of the space
-                if current_segment_text[0] == ' ':
-                    skip = 1
-
-                def find_nth(haystack, needle, n, skip=True):
-
-                    if skip:
-                        start = haystack.find(needle, 1)
-                    else:
-                        start = haystack.find(needle)
-
-                    while start >= 0 and n > 1:
-                        start = haystack.find(needle, start + 1)
-                        n -= 1
-                    return start
-
-                last_space_index = find_nth(current_segment_text, ' ', segment_word_limit)
+                # (the space at the beginning of the remaining text doesn't count, since that's just Whisper's formatting)
+                nth_space = int(np.searchsorted(space_indexes, current_text_index + 1)) + segment_word_limit - 1
 
                 # if there is no space after the word limit, don't split the segment
-                if last_space_index == -1:
-                    break
-
-            # split the segment into two parts
-            segment_first_part = current_segment_text[:last_space_index]
-            segment_second_part = current_segment_text[last_space_index + 1:]
-
-            # the words list is a list of dictionaries,
-            # each dictionary containing the word and its start time, end time and probability
-            # considering that the word list is ordered and the words have to have the same order in the resulting segments
-            # and also that the words have the exact same length as the text in the segment
-            # we can use the length of the first part to determine which words to keep in the first part
-            # and which words to keep in the second part
-
-            # keep the character length of the words in the first part
-            first_part_words_character_length = 0
-            first_part_words = []
-            first_part_start = None
-            first_part_end = None
-            words_to_remove = []
-            for word in current_segment_words:
-
-                # if the character length of the words in the first part is longer than the first part
-                # then we've reached the end of the first part
-                # when calculating the length of the first part,
-                # we need to add a space at the beginning to preserve Whisper's formatting
-                if first_part_words_character_length + len(word['word']) > len(' ' + segment_first_part):
+                if nth_space >= len(space_indexes):
                     break
 
-                # if the first part start is None, then set it to the current word start time
-                if first_part_start is None:
-                    first_part_start = word['start']
-
-                first_part_words_character_length += len(word['word'])
-
-                # keep the words in the first part
-                first_part_words.append(word)
+                last_space_index = int(space_indexes[nth_space])
 
-                # keep updating the first part end time
-                first_part_end = word['end']
+            # split the segment into two parts
+            segment_first_part = segment_text[current_text_index:last_space_index]
 
-                # keep track of the words to remove
-                # - we can't remove them directly here because we're iterating over the same words list
-                words_to_remove.append(word)
+            # the first part gets all the remaining words that fit in its length
+            # when calculating the length of the first part,
+            # we need to add a space at the beginning to preserve Whisper's formatting
+            first_part_word_index = current_word_index
+            current_word_index = self._find_words_end_index(
+                word_offsets, current_word_index, len(' ' + segment_first_part))
 
-            # remove the words that we've kept in the first part
-            for word in words_to_remove:
-                current_segment_words.remove(word)
+            first_part_words = words[first_part_word_index:current_word_index]
 
             # create a new segment
             if segment_first_part != '':
@@ -1106,34 +1601,34 @@ class ToolkitOps:
 
                 new_segment = {
                     'text': segment_first_part,
-                    'start': first_part_start if first_part_start is not None else segment['start'],
-                    'end': first_part_end if first_part_end is not None else segment['end'],
+                    'start': first_part_words[0]['start'] if first_part_words else segment['start'],
+                    'end': first_part_words[-1]['end'] if first_part_words else segment['end'],
                     'words': first_part_words,
                 }
 
                 # add the new segment to the resulting segments
                 resulting_segments.append(new_segment)
 
-            # set the current segment text to the second part
-            current_segment_text = segment_second_part
-
-            # increment the current segment index
-            current_segment_index += 1
+            # the remaining text is the second part
+            current_text_index = last_space_index + 1
 
-        # is there anything left in the current segment text?
-        if current_segment_text:
+        # is there anything left in the segment text?
+        remaining_text = segment_text[current_text_index:]
+        if remaining_text:
             # create a new segment
 
             # add a space at the beginning to preserve Whisper's formatting
             # the space was most likely removed when splitting the segment
-            if current_segment_text[0] != ' ':
-                current_segment_text = ' ' + current_segment_text
+            if remaining_text[0] != ' ':
+                remaining_text = ' ' + remaining_text
+
+            remaining_words = words[current_word_index:]
 
             new_segment = {
-                'text': current_segment_text,
-                'start': current_segment_words[0]['start'] if current_segment_words else segment['start'],
-                'end': current_segment_words[-1]['end'] if current_segment_words else segment['end'],
-                'words': current_segment_words,
+                'text': remaining_text,
+                'start': remaining_words[0]['start'] if remaining_words else segment['start'],
+                'end': remaining_words[-1]['end'] if remaining_words else segment['end'],
+                'words': remaining_words,
             }
 
             # add the new segment to the resulting segments
@@ -1142,137 +1637,100 @@ class ToolkitOps:
         # return the resulting segments
         return resulting_segments
 
-    def split_segment_on_punctuation_marks(self, segment, punctuation_marks=['.', '!', '?', '…']):
+    @staticmethod
+    def _find_words_end_index(word_offsets, first_word_index, text_length):
+        """
+        Returns the index after the last word (starting from first_word_index)
+        that fits in a text of the given length
+        :param word_offsets: the cumulative character length of the words
+        """
+
+        # how many characters the words before first_word_index take up
+        previous_words_length = word_offsets[first_word_index - 1] if first_word_index > 0 else 0
+
+        return max(first_word_index,
+                   int(np.searchsorted(word_offsets, previous_words_length + text_length, side='right')))
+
+    def split_segment_on_punctuation_marks(self, segment, punctuation_marks=DEFAULT_PUNCTUATION_MARKS):
         '''
         Splits a segment on punctuation marks and returns a list of segments, including their start and end times.
+        (the list only contains the original segment if it can't be split)
         '''
 
         # if the segment contains no words, we can't perform the split
         # because we don't know the start and end times of the words
         if 'words' not in segment or not segment['words']:
             logger.warning('The segment contains no word-level timings, so we can\'t split it on punctuation marks.')
-            return segment
+            return [segment]
 
         # the resulting segments
         resulting_segments = []
 
-        # the current segment text
-        current_segment_text = segment['text']
+        # first, replace all instances of ... with a single …
+        segment_text = segment['text'].replace('...', '…')
 
-        # the current segment words
-        current_segment_words = segment['words']
+        # the regex that matches a run of punctuation marks (the string is converted to a tuple of marks)
+        punctuation_marks_regex = get_punctuation_marks_regex(tuple(punctuation_marks))
 
-        # convert the punctuation marks to a list if it's a string
-        if isinstance(punctuation_marks, str):
-            punctuation_marks = list(punctuation_marks)
+        # the words list is a list of dictionaries,
+        # each dictionary containing the word and its start time, end time and probability
+        # considering that the word list is ordered
+        # and the words have are in the same order in the resulting segments,
+        # but also that the words have the exact same length as the text in the segment
+        # we can use the cumulative character length of the words to determine where each part ends
+        # (each word contains a space at the beginning when it comes from Whisper)
+        words = segment['words']
+        word_offsets = np.cumsum([len(word['word']) for word in words])
 
-        # the current segment index
-        current_segment_index = 0
+        # the index of the first word that hasn't been added to a resulting segment yet
+        current_word_index = 0
 
-        # first, replace all instances of ... with a single …
-        current_segment_text = current_segment_text.replace('...', '…')
-
-        # while there are punctuation marks in the current segment text
-        while any(punctuation_mark in current_segment_text for punctuation_mark in punctuation_marks):
-
-            # find the first punctuation mark in the current segment text
-            first_punctuation_mark_index = min(current_segment_text.find(punctuation_mark)
-                                               for punctuation_mark in punctuation_marks if
-                                               punctuation_mark in current_segment_text)
-
-            # is the next character a punctuation mark?
-            while first_punctuation_mark_index + 1 < len(current_segment_text) and \
-                    current_segment_text[first_punctuation_mark_index + 1] in punctuation_marks:
-                first_punctuation_mark_index += 1
-
-            # split the segment into two parts, but keep the punctuation mark in the first part
-            segment_first_part = current_segment_text[:first_punctuation_mark_index + 1]
-
-            # the words list is a list of dictionaries,
-            # each dictionary containing the word and its start time, end time and probability
-            # considering that the word list is ordered
-            # and the words have are in the same order in the resulting segments,
-            # but also that the words have the exact same length as the text in the segment
-            # we can use the length of the first part to determine which words to keep in the first part
-            # and which words to keep in the second part
-
-            # keep track of the character length of the words in the first part
-            first_part_words_character_length = 0
-            first_part_words = []
-
-            first_part_start = None
-            first_part_end = None
-            words_to_remove = []
-
-            # keep track of the start and end times of the first part
-            for word in current_segment_words:
-
-                # if the character length of the words in the first part is longer than the first part
-                # then we've reached the end of the first part
-                # when calculating the length of the first part,
-                # we need to add a space at the beginning to preserve Whisper's formatting
-                if first_part_words_character_length + len(word['word']) > len(' ' + segment_first_part):
-                    break
+        # where the text of the current part starts
+        current_text_index = 0
 
-                # if the first part start is None, it means that we just started working on the first part
-                # so set it to the current word start time
-                if first_part_start is None:
-                    first_part_start = word['start']
+        # split the text after each run of punctuation marks, keeping the punctuation marks in the first part
+        for punctuation_match in punctuation_marks_regex.finditer(segment_text):
 
-                # add the word length, this should also include the space at the beginning,
-                # considering that each word contains a space at the beginning when it comes from Whisper
-                first_part_words_character_length += len(word['word'])
+            segment_first_part = segment_text[current_text_index:punctuation_match.end()]
+            current_text_index = punctuation_match.end()
 
-                # keep the words in the first part
-                first_part_words.append(word)
+            # the first part gets all the remaining words that fit in its length
+            # when calculating the length of the first part,
+            # we need to add a space at the beginning to preserve Whisper's formatting
+            first_part_word_index = current_word_index
+            current_word_index = self._find_words_end_index(
+                word_offsets, current_word_index, len(' ' + segment_first_part))
 
-                # keep updating the first part end time
-                first_part_end = word['end']
+            first_part_words = words[first_part_word_index:current_word_index]
 
-                # keep track of the words to remove
-                # - we can't remove them here directly because we're iterating over the same list
-                words_to_remove.append(word)
+            # add a space at the beginning to preserve Whisper's formatting
+            if segment_first_part[0] != ' ':
+                segment_first_part = ' ' + segment_first_part
 
-            # remove the words from the current segment words
-            for word in words_to_remove:
-                current_segment_words.remove(word)
+            # add the new segment to the resulting segments
+            resulting_segments.append({
+                'text': segment_first_part,
+                'start': first_part_words[0]['start'] if first_part_words else segment['start'],
+                'end': first_part_words[-1]['end'] if first_part_words else segment['end'],
+                'words': first_part_words,
+            })
+
+        # is there anything left in the segment text?
+        remaining_text = segment_text[current_text_index:]
+        if remaining_text:
+            # create a new segment to hold the remaining text
 
-            # create a new segment
-            if segment_first_part != '':
+            # add a space at the beginning to preserve Whisper's formatting
+            if remaining_text[0] != ' ':
+                remaining_text = ' ' + remaining_text
 
-                # add a space at the beginning to preserve Whisper's formatting
-                if segment_first_part[0] != ' ':
-                    segment_first_part = ' ' + segment_first_part
-
-                new_segment = {
-                    'text': segment_first_part,
-                    'start': first_part_start if first_part_start is not None else segment['start'],
-                    'end': first_part_end if first_part_end is not None else segment['end'],
-                    'words': first_part_words,
-                }
-
-                # add the new segment to the resulting segments
-                resulting_segments.append(new_segment)
-
-            # set the current segment text to the second part
-            current_segment_text = current_segment_text[first_punctuation_mark_index + 1:]
-
-            # increment the current segment index
-            current_segment_index += 1
-
-        # is there anything left in the current segment text?
-        if current_segment_text:
-            # create a new segment to hold the remaining text
-
-            # add a space at the beginning to preserve Whisper's formatting
-            if current_segment_text[0] != ' ':
-                current_segment_text = ' ' + current_segment_text
+            remaining_words = words[current_word_index:]
 
             new_segment = {
-                'text': current_segment_text,
-                'start': current_segment_words[0]['start'] if current_segment_words else segment['start'],
-                'end': current_segment_words[-1]['end'] if current_segment_words else segment['end'],
-                'words': current_segment_words,
+                'text': remaining_text,
+                'start': remaining_words[0]['start'] if remaining_words else segment['start'],
+                'end': remaining_words[-1]['end'] if remaining_words else segment['end'],
+                'words': remaining_words,
             }
 
             # add the segment with the remaining text to the resulting segments
@@ -1290,39 +1748,9 @@ class ToolkitOps:
         :param segments: the segments to split
         '''
 
-        # if there are no 'words' in the first segment it means that Whisper hasn't returned any word timings
-        # in this case, we can't split the segments
-        if len(segments) == 0 or 'words' not in segments[0]:
-            logger.debug('No word-level timings available, so we can\'t split the segments.')
-            return segments
-
         # get the punctuation mark splitting option
         split_on_punctuation_marks = kwargs.get('split_on_punctuation_marks', False)
 
-        # split the result on punctuation marks if the option is set
-        if split_on_punctuation_marks:
-
-            logger.debug('Splitting segments on pre-defined punctuation marks...')
-
-            # get the custom punctuation marks from the config
-            custom_punctuation_marks = self.stAI.get_app_setting('transcription_custom_punctuation_marks',
-                                                                 default_if_none=['.', '!', '?', '…'])
-
-            # the resulting segments
-            new_segments = []
-
-            # take each segment
-            for segment in segments:
-                # split the segment into multiple segments
-                resulting_segment = self.split_segment_on_punctuation_marks(segment,
-                                                                            punctuation_marks=custom_punctuation_marks)
-
-                # add the resulting segments to the new segments list
-                new_segments.extend(resulting_segment)
-
-            # replace the segments in the result with the new segments
-            segments = new_segments
-
         # get the segment word limit
         segment_word_limit = kwargs.get('max_words_per_segment', None)
 
@@ -1343,6 +1771,32 @@ class ToolkitOps:
             except ValueError:
                 segment_character_limit = None
 
+        # if none of the splitting options are set, there's nothing to split
+        if not split_on_punctuation_marks and segment_word_limit is None and segment_character_limit is None:
+            return segments
+
+        # if there are no 'words' in the first segment it means that Whisper hasn't returned any word timings
+        # in this case, we can't split the segments
+        if len(segments) == 0 or 'words' not in segments[0]:
+            logger.debug('No word-level timings available, so we can\'t split the segments.')
+            return segments
+
+        # split the result on punctuation marks if the option is set
+        if split_on_punctuation_marks:
+
+            logger.debug('Splitting segments on pre-defined punctuation marks...')
+
+            # get the custom punctuation marks from the config
+            custom_punctuation_marks = self.stAI.get_app_setting('transcription_custom_punctuation_marks',
+                                                                 default_if_none=DEFAULT_PUNCTUATION_MARKS)
+
+            # split each segment into multiple segments
+            # and replace the segments in the result with all the resulting segments
+            segments = list(itertools.chain.from_iterable(
+                self.split_segment_on_punctuation_marks(segment, punctuation_marks=custom_punctuation_marks)
+                for segment in segments
+            ))
+
         # if there is a segment word limit or character limit
         # and the result is longer than the any of the limits
         # (the character limit takes precedence)
@@ -1351,19 +1805,12 @@ class ToolkitOps:
 
             logger.debug('Splitting segments on word/character limits...')
 
-            # the resulting segments
-            new_segments = []
-            # take each segment in the result
-            for segment in segments:
-                # split the segment into multiple segments
-                resulting_segment = self.split_segment_by_word_limits(segment, segment_word_limit,
-                                                                      segment_character_limit)
-
-                # add the resulting segments to the new segments list
-                new_segments.extend(resulting_segment)
-
-            # replace the segments in the result with the new segments
-            segments = new_segments
+            # split each segment in the result into multiple segments
+            # and replace the segments in the result with all the resulting segments
+            segments = list(itertools.chain.from_iterable(
+                self.split_segment_by_word_limits(segment, segment_word_limit, segment_character_limit)
+                for segment in segments
+            ))
 
         return segments
 
@@ -1396,53 +1843,38 @@ class ToolkitOps:
             logger.debug('Filling gaps shorter than {}s in the result...'.format(prevent_short_gaps))
 
         # do some housekeeping
-        # go through each segment in the result
-        previous_segment_end_time = None
-        new_result_segments = []
+        # do not allow segments that are not dictionaries
         for n, segment in enumerate(result['segments']):
-
-            # do not allow segments that are not dictionaries
             if not isinstance(segment, dict):
                 logger.debug('Segment {} is not a dictionary: {}\nRemoving from results.'.format(n, segment))
 
-                # remove the segment from the result
-                result['segments'].remove(segment)
+        # and do not allow empty segments or segments that are not strings
+        valid_segments = [segment for segment in result['segments']
+                          if isinstance(segment, dict) and isinstance(segment.get('text', None), str)
+                          and segment['text'] != '']
 
-                # continue to the next segment
-                continue
+        # remove word timestamps from the result to avoid confusion,
+        # until the word-based transcript editing is implemented
+        remove_word_timestamps = kwargs.get('post_remove_word_timestamps', False)
 
-            # do not allow empty segments or segments that are not strings
-            if 'text' not in segment or not isinstance(segment['text'], str) or segment['text'] == '':
-                # remove the segment from the result
-                result['segments'].remove(segment)
+        # go through each remaining segment in the result
+        previous_segment = None
+        new_result_segments = []
+        for segment in valid_segments:
 
-                # continue to the next segment
-                continue
+            if remove_word_timestamps:
+                segment.pop('words', None)
 
-            # remove word timestamps from the result to avoid confusion,
-            # until the word-based transcript editing is implemented
-            if 'words' in segment and kwargs.get('post_remove_word_timestamps', False):
-                del segment['words']
+            # if we're supposed to prevent short gaps between segments
+            # and the previous segment ended less than 'prevent_short_gaps' seconds ago,
+            # set the end time of the previous segment to the start time of this segment
+            if previous_segment is not None and isinstance(prevent_short_gaps, float) \
+                    and segment['start'] - previous_segment['end'] < prevent_short_gaps:
+                previous_segment['end'] = segment['start']
 
             # add the segment to the new result segments
             new_result_segments.append(segment)
-
-            # if we're supposed to prevent short gaps between segments
-            # and the previous segment ended less than 'prevent_short_gaps' seconds ago
-            # do this
-            if previous_segment_end_time is not None and isinstance(prevent_short_gaps, float):
-
-                # get the time difference between the end of the previous segment and the start of this segment
-                time_difference = segment['start'] - previous_segment_end_time
-
-                # if the time difference is less than the prevent_short_gaps value
-                if time_difference < prevent_short_gaps:
-                    # set the end time of the previous segment to the start time of this segment
-                    new_result_segments[-2]['end'] = segment['start']
-
-            # if we made it so far it means that the segment will be included in the result,
-            # so remember the end time of this segment
-            previous_segment_end_time = segment['end']
+            previous_segment = segment
 
         # replace the segments in the result with the new segments
         result['segments'] = new_result_segments
@@ -1482,12 +1914,13 @@ class ToolkitOps:
         )
 
         # get the last speaker id from the transcription
-        for segment in segments:
-
-            # only look at the speaker segments
-            if 'category' in segment and segment['category'] == 'speaker'  \
-                    and 'text' in segment and segment['text'].startswith('Speaker '):
-                speaker_id_offset = max(speaker_id_offset, int(segment['text'].split(' ')[1]))
+        # (only look at the speaker segments)
+        speaker_id_offset = max(
+            (int(speaker_match.group(1)) for segment in segments
+             if segment.get('category', None) == 'speaker'
+             and (speaker_match := SPEAKER_SEGMENT_TEXT_REGEX.match(segment.get('text', None) or ''))),
+            default=speaker_id_offset
+        )
 
         threshold = kwargs.get('transcription_speaker_detection_threshold', None)
 
@@ -1499,6 +1932,13 @@ class ToolkitOps:
 
         processed_segments = 0
         resulting_segments = []
+
+        # we only update the queue item (and check if it was canceled) every so often,
+        # since doing it after each segment takes longer than the detection itself on long transcriptions
+        last_progress = None
+        last_progress_update_time = 0
+        last_cancel_check_time = time.monotonic()
+
         for resulting_segments, speaker_embeddings in detect_speaker_changes(
             segments=segments, audio_file_path=transcription.audio_file_path, threshold=threshold,
             device_name=kwargs.get('device', None),
@@ -1512,18 +1952,28 @@ class ToolkitOps:
                 continue
 
             # calculate the progress
-            progress = min(100, int((processed_segments / len(segments)) * 100))
+            progress = min(processed_segments, len(segments)) * 100 // len(segments)
 
-            # update the progress in the queue
-            self.processing_queue.update_queue_item(
-                queue_id=queue_id, save_to_file=False, progress=progress, status='detecting changes'
-            )
+            current_time = time.monotonic()
 
-            # cancel detection if user requested it
-            if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
+            # update the progress in the queue (only if it changed, and at most 10 times per second)
+            if progress != last_progress and current_time - last_progress_update_time > 0.1:
+                self.processing_queue.update_queue_item(
+                    queue_id=queue_id, save_to_file=False, progress=progress, status='detecting changes'
+                )
 
-                # and return none
-                return None
+                last_progress = progress
+                last_progress_update_time = current_time
+
+            # cancel detection if user requested it (we check this 4 times per second)
+            if current_time - last_cancel_check_time > 0.25:
+
+                last_cancel_check_time = current_time
+
+                if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
+
+                    # and return none
+                    return None
 
         # no time intervals were passed or if the time intervals is not a list of lists
         if not kwargs.get('time_intervals', None) or not isinstance(kwargs['time_intervals'], list):
@@ -1532,31 +1982,25 @@ class ToolkitOps:
             kwargs['time_intervals'] = [[segments[0]['start'], segments[-1]['end']]]
 
         # now take all the resulting segments and turn the speaker id's into meta segments
-        last_speaker_id = None
-        speaker_segments = []
-        for segment in resulting_segments:
-
-            # if there's no speaker_id for the segment, skip
-            if 'speaker_id' not in segment:
-                continue
-
-            # if the speaker id is not the same as the last speaker id
-            if not last_speaker_id or segment['speaker_id'] != last_speaker_id:
-
-                # create a new meta segment
-                meta_segment = {
-                    'start': segment['start'],
-                    'end': segment['start'],
-                    'meta': True,
-                    'category': 'speaker',
-                    'text': 'Speaker {}'.format(segment['speaker_id'])
-                }
-
-                # add the meta segment to the speaker_segments
-                speaker_segments.append(meta_segment)
-
-            # update the last speaker id
-            last_speaker_id = segment['speaker_id']
+        # - only the segments that have a speaker_id count
+        speaker_id_segments = [segment for segment in resulting_segments if 'speaker_id' in segment]
+        speaker_ids = np.fromiter((segment['speaker_id'] for segment in speaker_id_segments),
+                                  dtype=np.int64, count=len(speaker_id_segments))
+
+        # a new speaker segment starts on the first segment and wherever the speaker id changes
+        speaker_change_indexes = np.flatnonzero(np.diff(speaker_ids, prepend=speaker_ids[:1] - 1)) \
+            if len(speaker_ids) > 0 else []
+
+        speaker_segments = [
+            {
+                'start': speaker_id_segments[index]['start'],
+                'end': speaker_id_segments[index]['start'],
+                'meta': True,
+                'category': 'speaker',
+                'text': 'Speaker {}'.format(speaker_id_segments[index]['speaker_id'])
+            }
+            for index in speaker_change_indexes
+        ]
 
         if not speaker_segments:
             logger.debug('No speakers detected for the selected time intervals: {}.'.format(kwargs['time_intervals']))
@@ -1592,6 +2036,8 @@ class ToolkitOps:
         Only returns the transcription segments
         """
 
+        import storytoolkitai.integrations.mots_whisper as whisper
+
         # get the transcription object if a transcription_file_path exists
         transcription = Transcription(transcription_file_path=other_options.get('transcription_file_path')) \
             if other_options.get('transcription_file_path', None) else None
@@ -1610,129 +2056,209 @@ class ToolkitOps:
         # the duration of each audio segment is the end time minus the start time
         total_duration = sum([audio_segment[1] - audio_segment[0] for audio_segment in audio_segments])
 
-        # transcribe each audio segment
+        # only send to whisper the options that it knows
+        decoding_options = self.whisper_options(**other_options.get('whisper_options', {}))
+
+        # do not send an empty string as the language
+        if 'language' in decoding_options and (
+                not isinstance(decoding_options['language'], str)
+                or decoding_options['language'] is None
+                or decoding_options['language'] == ''
+        ):
+            del decoding_options['language']
+
+        # remove word timestamps from final transcription until we implement word-based editing
+        other_options['post_remove_word_timestamps'] = \
+            other_options.get('post_remove_word_timestamps', True)
+
+        # skip the audio segments that aren't in the right format
+        valid_audio_segments = [audio_segment for audio_segment in audio_segments if len(audio_segment) == 3]
+
+        if len(valid_audio_segments) != len(audio_segments):
+            logger.warning('Audio segment must be a list of [start, end, audio]')
+
+        audio_segments = valid_audio_segments
+
+        # if we're decoding in batches, split the audio segments so that each of them fits in a whisper window
+        batch_size = self.get_whisper_batch_size()
+        if batch_size > 1:
+            audio_segments = self.split_audio_segments_into_windows(audio_segments)
+
+        # if we have multiple CUDA devices, we decode a batch on each of them at the same time
+        # (see get_multi_gpu_whisper_models)
+        # - we keep a reference to the models for this whole transcription,
+        #   in case another transcription loads another model in the meantime
+        whisper_models = self.get_multi_gpu_whisper_models()
+        whisper_model = whisper_models[0]
+        multi_gpu_executor = ThreadPoolExecutor(max_workers=len(whisper_models), thread_name_prefix='stai_whisper') \
+            if len(whisper_models) > 1 else None
+
+        if multi_gpu_executor is not None:
+            logger.debug('Transcribing on {} CUDA devices.'.format(len(whisper_models)))
+
+        # the options that we pass to _transcribe_audio_segment_batch for each batch
+        transcribe_options = {'batch_size': batch_size, 'task': task, 'queue_id': queue_id,
+                              'total_duration': total_duration, 'decoding_options': decoding_options}
+
+        # when the OpenAI whisper model runs on CUDA (on a single device), we copy the audio of the next batch
+        # to the GPU on a separate stream while the current batch is decoded (see _prepare_audio_segment_batch)
+        prefetch_stream = torch.cuda.Stream(device=whisper_model.device) \
+            if multi_gpu_executor is None and isinstance(whisper_model, whisper.Whisper) \
+            and whisper_model.device.type == 'cuda' else None
+
+        # start preparing the first batch
+        prepared_batch_future = self.submit_task(
+            self._prepare_audio_segment_batch, audio_segments[0:batch_size], prefetch_stream, **other_options) \
+            if multi_gpu_executor is None else None
+
+        # the batches that are being decoded on multiple devices, by their batch start
+        decode_futures = {}
+
+        # transcribe each audio segment (or each batch of audio segments)
         previous_progress = 0
+        processed_duration = 0
         next_segment_id = 0 if not transcription else transcription.generate_new_segment_id()
-        for audio_segment in audio_segments:
-
-            if len(audio_segment) != 3:
-                logger.warning('Audio segment must be a list of [start, end, audio]')
-                continue
+        for batch_start in range(0, len(audio_segments), batch_size):
 
-            # the start and end times of the audio segment which we will use to offset the results below
-            audio_segment_start = audio_segment[0]
-            audio_segment_end = audio_segment[1]
+            audio_segment_batch = audio_segments[batch_start:batch_start + batch_size]
 
-            # if we have a transcription object, first delete any existing segments from this time interval
+            # if we have a transcription object, first delete any existing segments from these time intervals
             if transcription is not None:
-                transcription.delete_segments_between(start=audio_segment_start, end=audio_segment_end)
+                for audio_segment in audio_segment_batch:
+                    transcription.delete_segments_between(start=audio_segment[0], end=audio_segment[1])
 
-            # pre process the audio segment
-            audio_segment = self.pre_process_audio_segment(audio_segment, **other_options)
+            if multi_gpu_executor is not None:
 
-            # only send to whisper the options that it knows
-            decoding_options = self.whisper_options(**other_options.get('whisper_options', {}))
+                # keep one batch in flight for each device, sending the batches to the devices in turns
+                for next_batch_start in range(batch_start,
+                                              min(len(audio_segments), batch_start + len(whisper_models) * batch_size),
+                                              batch_size):
 
-            # do not send an empty string as the language
-            if 'language' in decoding_options and (
-                    not isinstance(decoding_options['language'], str)
-                    or decoding_options['language'] is None
-                    or decoding_options['language'] == ''
-            ):
-                del decoding_options['language']
+                    if next_batch_start not in decode_futures:
+                        decode_futures[next_batch_start] = multi_gpu_executor.submit(
+                            self._prepare_and_transcribe_audio_segment_batch,
+                            whisper_models[(next_batch_start // batch_size) % len(whisper_models)],
+                            audio_segments[next_batch_start:next_batch_start + batch_size],
+                            transcribe_options, other_options, previous_progress)
 
-            # run whisper transcribe on the audio segment
-            result = self.whisper_model.transcribe(audio_segment[2],
-                                                   task=task,
-                                                   verbose=True,
-                                                   queue_id=queue_id,
-                                                   toolkit_ops_obj=self,
-                                                   total_duration=total_duration,
-                                                   audio_segment_duration=audio_segment[1] - audio_segment[0],
-                                                   previous_progress=previous_progress,
-                                                   **decoding_options
-                                                   )
-
-            # remove word timestamps from final transcription until we implement word-based editing
-            other_options['post_remove_word_timestamps'] = \
-                other_options.get('post_remove_word_timestamps', True)
-
-            # post process the result for this audio segment
-            result = self.post_process_whisper_result(audio_segment[2], result, **other_options)
-
-            # get the progress of the transcription so far,
-            # so we can pass it to the next audio segment for the progress calculation
-            previous_progress = self.transcription_progress(queue_id)
-
-            # now process the result and add the original start time offset
-            # to each transcript segment start and end times
-
-            # if there are segments in the result
-            # re-calibrate the start and end times of each segment according to the offset
-            # and add them to the transcription
-            if isinstance(result, dict) and 'segments' in result and result['segments']:
-
-                current_segment_batch = []
-
-                # take each segment and add the offset to the start and end time
-                for i, transcript_segment in enumerate(result['segments']):
-
-                    # remove tokens, seek, temperature, avg_logprob, compression_ratio and no_speech_prob
-                    # unless otherwise specified
-                    if not other_options.get('keep_whisper_debug_info', False):
-                        for key in ['tokens', 'seek', 'temperature', 'avg_logprob', 'compression_ratio',
-                                    'no_speech_prob']:
-                            if key in transcript_segment:
-                                del transcript_segment[key]
-
-                    # add the offset to the start and end time
-                    transcript_segment['start'] += audio_segment_start
-                    transcript_segment['end'] += audio_segment_start
-
-                    # avoid end time being larger than the interval end time
-                    if transcript_segment['end'] > audio_segment_end:
-                        transcript_segment['end'] = audio_segment_end
-
-                    # also avoid start time being smaller than the interval start time
-                    if transcript_segment['start'] < audio_segment_start:
-                        transcript_segment['start'] = audio_segment_start
-
-                    # if the segment contains a 'words' key,
-                    # then add the offset to the start and end time of each word
-                    if 'words' in transcript_segment:
-                        for word in transcript_segment['words']:
-                            word['start'] += audio_segment_start
-                            word['end'] += audio_segment_start
-
-                            # avoid end time being larger than the interval end time
-                            if word['end'] > audio_segment_end:
-                                word['end'] = audio_segment_end
-
-                            # also avoid start time being smaller than the interval start time
-                            if word['start'] < audio_segment_start:
-                                word['start'] = audio_segment_start
-
-                    transcript_segment['id'] = next_segment_id + id_count
-                    id_count += 1
+                # but take the results in order
+                audio_segment_batch, batch_results = decode_futures.pop(batch_start).result()
 
-                    # add the transcription of the audio segment to the results list
-                    results['segments'].append(transcript_segment)
+            else:
 
-                    # add the segment to the current batch
-                    current_segment_batch.append(transcript_segment)
+                # get the pre processed audio segments of this batch
+                audio_segment_batch, whisper_audio_batch, copy_event = prepared_batch_future.result()
+
+                # and start preparing the next batch while this one is decoded
+                if batch_start + batch_size < len(audio_segments):
+                    prepared_batch_future = self.submit_task(
+                        self._prepare_audio_segment_batch,
+                        audio_segments[batch_start + batch_size:batch_start + 2 * batch_size], prefetch_stream,
+                        **other_options)
+
+                # make sure that the audio was copied to the GPU before whisper uses it
+                if copy_event is not None:
+                    torch.cuda.current_stream().wait_event(copy_event)
+
+                    # (and let the CUDA memory allocator know that the audio is used on this stream)
+                    for whisper_audio in whisper_audio_batch:
+                        whisper_audio.record_stream(torch.cuda.current_stream())
+
+                batch_results = self._transcribe_audio_segment_batch(
+                    whisper_model, audio_segment_batch, whisper_audio_batch,
+                    previous_progress=previous_progress, **transcribe_options)
+
+            # when decoding on multiple devices, the single segment transcriptions can't keep track
+            # of the overall progress, so we update it here after each batch
+            if batch_size > 1 or multi_gpu_executor is not None:
+
+                # the batch results are None if the transcription was canceled
+                if None in batch_results:
+                    result = {'segments': [], 'status': 'canceled'}
+                    break
+
+                # update the progress according to the duration of the audio we processed so far
+                processed_duration += sum([audio_segment[1] - audio_segment[0]
+                                           for audio_segment in audio_segment_batch])
+
+                progress = min(100, int(processed_duration * 100 // total_duration)) if total_duration else 0
+
+                if progress != previous_progress:
+                    self.processing_queue.update_queue_item(queue_id=queue_id, save_to_file=False, progress=progress)
+
+            for audio_segment, result in zip(audio_segment_batch, batch_results):
+
+                # the start and end times of the audio segment which we will use to offset the results below
+                audio_segment_start = audio_segment[0]
+                audio_segment_end = audio_segment[1]
+
+                # post process the result for this audio segment
+                result = self.post_process_whisper_result(audio_segment[2], result, **other_options)
+
+                # get the progress of the transcription so far,
+                # so we can pass it to the next audio segment for the progress calculation
+                previous_progress = self.transcription_progress(queue_id)
+
+                # now process the result and add the original start time offset
+                # to each transcript segment start and end times
+
+                # if there are segments in the result
+                # re-calibrate the start and end times of each segment according to the offset
+                # and add them to the transcription
+                if isinstance(result, dict) and 'segments' in result and result['segments']:
+
+                    current_segment_batch = result['segments']
+
+                    # add the offset to the start and end time of all the segments and all their words at once
+                    # while making sure that they stay within the interval
+                    self._offset_transcript_times(current_segment_batch,
+                                                  offset=audio_segment_start, max_time=audio_segment_end)
+
+                    self._offset_transcript_times(
+                        [word for transcript_segment in current_segment_batch
+                         for word in transcript_segment.get('words', None) or []],
+                        offset=audio_segment_start, max_time=audio_segment_end)
+
+                    keep_whisper_debug_info = other_options.get('keep_whisper_debug_info', False)
+
+                    for transcript_segment in current_segment_batch:
+
+                        # remove tokens, seek, temperature, avg_logprob, compression_ratio and no_speech_prob
+                        # unless otherwise specified
+                        if not keep_whisper_debug_info:
+                            for key in WHISPER_DEBUG_KEYS:
+                                transcript_segment.pop(key, None)
+
+                        transcript_segment['id'] = next_segment_id + id_count
+                        id_count += 1
+
+                    # add the transcription of the audio segment to the results list
+                    results['segments'].extend(current_segment_batch)
 
                     # add the language to the result
                     results['whisper_language'] = result['language'] if 'language' in result else ''
 
-                # add the segment to the transcription object (if any)
-                #  because it makes the Transcription object re-set all the segments each time
-                #  we need to have a bulk add
-                if transcription is not None:
-                    transcription.add_segments(current_segment_batch)
+                    # add the segment to the transcription object (if any)
+                    #  because it makes the Transcription object re-set all the segments each time
+                    #  we need to have a bulk add
+                    if transcription is not None:
+                        transcription.add_segments(current_segment_batch)
 
-            # save the transcription for each audio segment
-            if transcription is not None:
-                transcription.save_soon()
+            # save a checkpoint of the transcription every few batches, in case something goes wrong
+            # (saving after each audio segment would write the whole transcription to disk over and over again)
+            if transcription is not None and (batch_start // batch_size) % TRANSCRIPTION_CHECKPOINT_BATCHES == 0:
+                transcription.save_soon(sec=5)
+
+        # drop the batches that are still waiting for a device (for eg. if the transcription was canceled)
+        if multi_gpu_executor is not None:
+            multi_gpu_executor.shutdown(wait=False, cancel_futures=True)
+
+        # save the transcription once all the audio segments were transcribed (or the transcription was canceled)
+        # - if the transcription was canceled, save it now, since whisper_transcribe stops here
+        # - otherwise, whisper_transcribe saves it again right away, so just schedule the save
+        #   (the immediate save cancels the scheduled one, so the file is only written once)
+        if transcription is not None:
+            transcription.save_soon(sec=0 if isinstance(result, dict) and 'status' in result else 1)
 
         # copy the status from the result to the results (if any)
         # normally we should only get a status if the transcription was canceled or it failed
@@ -1741,6 +2267,147 @@ class ToolkitOps:
 
         return results
 
+    def _transcribe_audio_segment_batch(self, whisper_model, audio_segment_batch, whisper_audio_batch,
+                                        batch_size, task, queue_id, total_duration, previous_progress,
+                                        decoding_options):
+        """
+        This runs whisper on a batch of pre processed audio segments using the passed whisper model
+        and returns a list with the result of each audio segment
+        """
+
+        import storytoolkitai.integrations.mots_whisper as whisper
+
+        # the transcriptions that run at the same time share the same model(s),
+        # so limit how many batches go through them at once
+        # - only one per OpenAI whisper model, since parallel decodes would mix up their kv-caches
+        # - a few at once for faster-whisper, which handles parallel calls by itself
+        if isinstance(whisper_model, whisper.Whisper):
+            inference_lock = self.get_whisper_inference_lock(whisper_model)
+        else:
+            inference_lock = self.whisper_inference_semaphore
+
+        with inference_lock:
+
+            # run whisper transcribe on the audio segment
+            # (in inference mode, since we never need autograd's view and version tracking here)
+            if batch_size == 1:
+                with torch.inference_mode(), self.get_whisper_autocast_context(whisper_model):
+                    return [
+                        whisper_model.transcribe(whisper_audio_batch[0],
+                                                 task=task,
+                                                 verbose=True,
+                                                 queue_id=queue_id,
+                                                 toolkit_ops_obj=self,
+                                                 total_duration=total_duration,
+                                                 audio_segment_duration=audio_segment_batch[0][1]
+                                                                        - audio_segment_batch[0][0],
+                                                 previous_progress=previous_progress,
+                                                 **decoding_options
+                                                 )
+                    ]
+
+            # or run the whole batch through the model at once
+            elif isinstance(whisper_model, whisper.Whisper):
+                with torch.inference_mode(), self.get_whisper_autocast_context(whisper_model):
+                    return whisper.transcribe_batch(whisper_model,
+                                                    whisper_audio_batch,
+                                                    batch_size=batch_size,
+                                                    task=task,
+                                                    verbose=True,
+                                                    queue_id=queue_id,
+                                                    toolkit_ops_obj=self,
+                                                    **decoding_options
+                                                    )
+
+            # (the faster-whisper backend decodes the batch with its own batched pipeline)
+            return whisper_model.transcribe_batch(
+                whisper_audio_batch,
+                batch_size=batch_size,
+                task=task,
+                verbose=True,
+                queue_id=queue_id,
+                toolkit_ops_obj=self,
+                **decoding_options
+            )
+
+    def get_whisper_inference_lock(self, whisper_model):
+        """
+        This returns the lock that allows only one decode at a time through the passed OpenAI whisper model
+        (each model instance has its own lock, so the models on different devices can still run in parallel)
+        """
+
+        with self.whisper_inference_locks_lock:
+
+            if whisper_model not in self.whisper_inference_locks:
+                self.whisper_inference_locks[whisper_model] = Lock()
+
+            return self.whisper_inference_locks[whisper_model]
+
+    def _prepare_and_transcribe_audio_segment_batch(self, whisper_model, audio_segment_batch,
+                                                    transcribe_options, other_options, previous_progress=0):
+        """
+        This pre processes and transcribes a batch of audio segments using the passed whisper model
+        (used when transcribing on multiple devices at the same time)
+        and returns the pre processed audio segments together with the results
+        """
+
+        audio_segment_batch, whisper_audio_batch, _ = \
+            self._prepare_audio_segment_batch(audio_segment_batch, **other_options)
+
+        batch_results = self._transcribe_audio_segment_batch(
+            whisper_model, audio_segment_batch, whisper_audio_batch,
+            previous_progress=previous_progress, **transcribe_options)
+
+        return audio_segment_batch, batch_results
+
+    def _prepare_audio_segment_batch(self, audio_segment_batch, prefetch_stream=None, **other_options):
+        """
+        This pre processes a batch of audio segments and returns them together with the audio that we pass to whisper.
+        If a CUDA prefetch_stream is passed, the audio is also copied to the GPU on that stream (from pinned memory),
+        so that the copy can run while the previous batch is decoded.
+        In that case, it also returns the CUDA event that marks the end of the copy (otherwise None).
+        """
+
+        audio_segment_batch = [self.pre_process_audio_segment(audio_segment, **other_options)
+                               for audio_segment in audio_segment_batch]
+
+        whisper_audio_batch = [audio_segment[2] for audio_segment in audio_segment_batch]
+
+        if prefetch_stream is None:
+            return audio_segment_batch, whisper_audio_batch, None
+
+        with torch.cuda.stream(prefetch_stream):
+            whisper_audio_batch = [
+                torch.from_numpy(np.ascontiguousarray(whisper_audio, dtype=np.float32)).pin_memory()
+                .to(prefetch_stream.device, non_blocking=True)
+                for whisper_audio in whisper_audio_batch
+            ]
+
+            copy_event = torch.cuda.Event()
+            copy_event.record(prefetch_stream)
+
+        return audio_segment_batch, whisper_audio_batch, copy_event
+
+    @staticmethod
+    def _offset_transcript_times(items: list, offset: float, max_time: float):
+        """
+        This adds the offset to the start and end times of the passed transcript segments (or words), in place,
+        without letting the start times go below the offset or the end times go above max_time
+        """
+
+        if not items:
+            return
+
+        times = np.fromiter((time_value for item in items for time_value in (item['start'], item['end'])),
+                            dtype=np.float64, count=len(items) * 2).reshape(-1, 2) + offset
+
+        starts = np.maximum(times[:, 0], offset).tolist()
+        ends = np.minimum(times[:, 1], max_time).tolist()
+
+        for item, start, end in zip(items, starts, ends):
+            item['start'] = start
+            item['end'] = end
+
     def exclude_segments_by_intervals(self, audio_array, time_intervals, excluded_time_intervals, sr):
         """
         Excludes certain audio segments from audio_array according to the excluded_time_intervals
@@ -1752,42 +2419,28 @@ class ToolkitOps:
             audio_segments, new_time_intervals = self.split_audio_by_intervals(audio_array, time_intervals, sr)
             return audio_segments, new_time_intervals
 
-        # sort the time intervals by start time
-        excluded_time_intervals.sort(key=lambda x: x[0])
-
-        # use this to keep track of the new time intervals
-        new_time_intervals = []
-
-        # for each time interval, check if it overlaps with any of the excluded time intervals
-        for interval in time_intervals:
-            temp_intervals = [interval]
+        time_intervals = np.asarray(time_intervals, dtype=np.float64).reshape(-1, 2)
+        excluded_time_intervals = np.asarray(excluded_time_intervals, dtype=np.float64).reshape(-1, 2)
 
-            # for each excluded time interval, split the temp_intervals
-            for excluded_interval in excluded_time_intervals:
-                new_temp_intervals = []
+        # all the start and end times split the timeline into elementary intervals
+        boundaries = np.unique(np.concatenate((time_intervals.ravel(), excluded_time_intervals.ravel())))
+        interval_starts = boundaries[:-1]
 
-                # for each temp_interval, check if it overlaps with the excluded time interval
-                for temp_interval in temp_intervals:
+        # count how many time intervals and how many excluded time intervals cover each elementary interval
+        # (the intervals that started minus the intervals that ended before or at its start)
+        def count_covering(intervals):
+            return np.searchsorted(np.sort(intervals[:, 0]), interval_starts, side='right') \
+                - np.searchsorted(np.sort(intervals[:, 1]), interval_starts, side='right')
 
-                    # if the excluded interval is completely before or after the temp interval, do nothing
-                    if excluded_interval[1] <= temp_interval[0] or excluded_interval[0] >= temp_interval[1]:
-                        new_temp_intervals.append(temp_interval)
+        # keep the elementary intervals that are in a time interval, but not in any excluded time interval
+        keep = (count_covering(time_intervals) > 0) & (count_covering(excluded_time_intervals) == 0)
 
-                    # if the excluded interval is completely inside the temp interval, split the temp interval
-                    else:
-                        # if the start of the excluded interval is inside the temp interval
-                        if temp_interval[0] < excluded_interval[0]:
-                            new_temp_intervals.append([temp_interval[0], excluded_interval[0]])
-
-                        # if the end of the excluded interval is inside the temp interval
-                        if temp_interval[1] > excluded_interval[1]:
-                            new_temp_intervals.append([excluded_interval[1], temp_interval[1]])
-
-                # replace the temp intervals with the new temp intervals
-                temp_intervals = new_temp_intervals
-
-            # add the temp intervals to the new time intervals
-            new_time_intervals.extend(temp_intervals)
+        # and merge the consecutive ones that we keep back into intervals
+        keep_edges = np.diff(np.concatenate(([0], keep.astype(np.int8), [0])))
+        new_time_intervals = np.column_stack((
+            boundaries[np.flatnonzero(keep_edges == 1)],
+            boundaries[np.flatnonzero(keep_edges == -1)]
+        )).tolist()
 
         # split the audio array by the new time intervals
         audio_segments, new_time_intervals = self.split_audio_by_intervals(audio_array, new_time_intervals, sr)
@@ -1797,21 +2450,128 @@ class ToolkitOps:
     def _initialize_whisper_transcribe(self, queue_id=None, **other_options):
         """
         This initializes everything that is needed for whisper
+        and marks the whisper model as used, until _release_whisper_model is called
+        """
+
+        # the transcriptions that run at the same time share one whisper model,
+        # so make sure that only one of them loads it
+        with self.whisper_model_lock:
+
+            if not self._prepare_whisper_model(queue_id=queue_id, **other_options):
+                return None
+
+            self.whisper_model_users += 1
+
+            # don't unload the model while we're using it
+            if self.whisper_model_unload_timer is not None:
+                self.whisper_model_unload_timer.cancel()
+                self.whisper_model_unload_timer = None
+
+        return True
+
+    def _release_whisper_model(self):
+        """
+        This marks that a transcription doesn't use the whisper model anymore
+        and, if no other transcription uses it, unloads the model after whisper_model_idle_unload_minutes
+        (if the setting is 0 or not set, the model stays loaded)
+        """
+
+        with self.whisper_model_lock:
+
+            self.whisper_model_users = max(0, self.whisper_model_users - 1)
+
+            if self.whisper_model_users > 0:
+                return
+
+            idle_unload_minutes = self.stAI.get_app_setting('whisper_model_idle_unload_minutes', default_if_none=0)
+
+            if not idle_unload_minutes:
+                return
+
+            if self.whisper_model_unload_timer is not None:
+                self.whisper_model_unload_timer.cancel()
+
+            self.whisper_model_unload_timer = Timer(float(idle_unload_minutes) * 60, self._unload_idle_whisper_model)
+            self.whisper_model_unload_timer.daemon = True
+            self.whisper_model_unload_timer.start()
+
+    def _unload_idle_whisper_model(self):
+        """
+        This unloads the whisper model(s), unless a transcription started using them in the meantime
+        """
+
+        with self.whisper_model_lock:
+
+            self.whisper_model_unload_timer = None
+
+            if self.whisper_model_users > 0 or self.whisper_model is None:
+                return
+
+            logger.info('Unloading Whisper {} model since it was not used for a while.'
+                        .format(self.whisper_model_name))
+
+            self.whisper_model = None
+            self.whisper_multi_gpu_models.clear()
+
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def _prepare_whisper_model(self, queue_id=None, **other_options):
+        """
+        This (re)loads the whisper model if needed for the passed options
+        (use _initialize_whisper_transcribe instead of calling this directly)
         """
 
+        # if the model is being preloaded in the background, wait for it instead of loading it again
+        if self.whisper_model_future is not None:
+
+            # (the queue passes the device as a string, but self.torch_device is a torch.device,
+            # so we compare their types)
+            requested_model_key = (other_options.get('model_name', None) or self.whisper_model_name,
+                                   self.get_torch_device_type(other_options.get('device', None) or self.torch_device))
+
+            # only use the preloaded model if it's the same model on the same device that we need now
+            if requested_model_key == self.whisper_model_future_key:
+
+                if not self.whisper_model_future.done():
+                    self.processing_queue.update_queue_item(queue_id=queue_id, status='loading {} model'
+                                                            .format(self.whisper_model_name))
+
+                preloaded_whisper_model = self.whisper_model_future.result()
+
+                if preloaded_whisper_model is not None and self.whisper_model is None:
+                    self.whisper_model = preloaded_whisper_model
+
+            # otherwise, we don't need it anymore, so cancel the preload if it didn't start yet
+            # or wait for it to finish, so that we don't load two models in memory at the same time
+            elif not self.whisper_model_future.cancel():
+                self.whisper_model_future.result()
+
+            self.whisper_model_future = None
+            self.whisper_model_future_key = None
+
         torch_device_changed = False
         # change the torch device if it was passed and it's different from the current one
-        if other_options.get('device', None) and self.torch_device != other_options.get('device'):
+        if other_options.get('device', None) \
+                and self.get_torch_device_type(self.torch_device) \
+                != self.get_torch_device_type(other_options.get('device')):
             # select the new whisper device but take it through the torch device selection to make sure it's valid
             self.torch_device = self.torch_device_type_select(other_options.get('device', None))
 
             torch_device_changed = True
 
-        # load OpenAI Whisper model
-        # if it wasn't loaded before, if the model name changed (via other_options) or if the torch device changed
+        # the user might have switched between the OpenAI whisper and the faster-whisper (int8) backends
+        # since the model was loaded
+        whisper_backend = self.stAI.get_app_setting(setting_name='whisper_backend', default_if_none='openai')
+        whisper_backend_changed = whisper_backend != self.whisper_backend
+        self.whisper_backend = whisper_backend
+
+        # load the Whisper model
+        # if it wasn't loaded before, if the model name changed (via other_options),
+        # if the torch device changed or if the backend changed
         if self.whisper_model is None \
                 or ('model_name' in other_options and self.whisper_model_name != other_options['model_name']) \
-                or torch_device_changed:
+                or torch_device_changed or whisper_backend_changed:
 
             # use the model name that was passed in the call or the one that's already set
             self.whisper_model_name = other_options.get('model_name', self.whisper_model_name)
@@ -1846,7 +2606,7 @@ class ToolkitOps:
 
             logger.info('Loading Whisper {} model.'.format(self.whisper_model_name))
             try:
-                self.whisper_model = whisper.load_model(self.whisper_model_name, device=self.torch_device)
+                self.whisper_model = self._load_whisper_model()
             except Exception as e:
                 fail_error = 'Error loading Whisper {} model: {}'.format(self.whisper_model_name, e)
                 logger.error(fail_error)
@@ -1873,16 +2633,338 @@ class ToolkitOps:
 
         return True
 
+    def _preload_whisper_model(self):
+        """
+        This loads the whisper model in the background (see __init__) and returns it,
+        so that _initialize_whisper_transcribe can decide whether to use it or not
+        """
+
+        try:
+            logger.debug('Preloading Whisper {} model.'.format(self.whisper_model_name))
+
+            whisper_model = self._load_whisper_model()
+
+            logger.debug('Whisper {} model preloaded.'.format(self.whisper_model_name))
+
+            return whisper_model
+
+        except Exception:
+            logger.warning('Could not preload Whisper {} model.'.format(self.whisper_model_name), exc_info=True)
+            return None
+
+    def get_whisper_multi_gpu_count(self) -> int:
+        """
+        This returns on how many CUDA devices we should transcribe at the same time
+        (1 if we're not on CUDA, if there's only one CUDA device or if the transcription_multi_gpu setting is off)
+        """
+
+        if torch.device(self.torch_device).type != 'cuda' \
+                or not self.stAI.get_app_setting('transcription_multi_gpu', default_if_none=True):
+            return 1
+
+        return max(1, torch.cuda.device_count())
+
+    def get_multi_gpu_whisper_models(self) -> list:
+        """
+        This returns a whisper model for each CUDA device that we should transcribe on (see get_whisper_multi_gpu_count)
+        - the first one is always the current whisper model
+        - for faster-whisper, the same model is returned for each device, since it runs on all of them by itself
+        - for OpenAI whisper, the models for the other devices are loaded the first time we need them
+        """
+
+        import storytoolkitai.integrations.mots_whisper as whisper
+
+        multi_gpu_count = self.get_whisper_multi_gpu_count()
+
+        if multi_gpu_count < 2 or self.whisper_model is None:
+            return [self.whisper_model]
+
+        if not isinstance(self.whisper_model, whisper.Whisper):
+            return [self.whisper_model] * min(multi_gpu_count, getattr(self.whisper_model, 'num_workers', 1))
+
+        # forget the models that were loaded for another whisper model name
+        if any(model_name != self.whisper_model_name for model_name, _ in self.whisper_multi_gpu_models):
+            self.whisper_multi_gpu_models.clear()
+
+        whisper_models = [self.whisper_model]
+        for device_index in range(multi_gpu_count):
+
+            # the current whisper model is already on one of the devices
+            if device_index == (self.whisper_model.device.index or 0):
+                continue
+
+            if (self.whisper_model_name, device_index) not in self.whisper_multi_gpu_models:
+
+                logger.info('Loading Whisper {} model on cuda:{}.'.format(self.whisper_model_name, device_index))
+
+                try:
+                    self.whisper_multi_gpu_models[(self.whisper_model_name, device_index)] = \
+                        self._load_whisper_model(device=torch.device('cuda', device_index))
+
+                except Exception:
+                    logger.warning('Could not load Whisper {} model on cuda:{}.'
+                                   .format(self.whisper_model_name, device_index), exc_info=True)
+                    continue
+
+            whisper_models.append(self.whisper_multi_gpu_models[(self.whisper_model_name, device_index)])
+
+        return whisper_models
+
+    def _load_whisper_model(self, device=None):
+        """
+        This loads the whisper model using the backend selected in the app settings
+        :param device: the torch device to load the model on (if None, we use the current torch device)
+        """
+
+        import storytoolkitai.integrations.mots_whisper as whisper
+
+        device = device if device is not None else self.torch_device
+
+        # use the CTranslate2 backend if the user selected it and it's available
+        if self.whisper_backend == 'faster_whisper':
+
+            try:
+                from storytoolkitai.integrations.mots_faster_whisper import FasterWhisperModel
+
+                # faster-whisper can load the model on multiple GPUs by itself
+                # and then runs the transcribe calls from different threads on different GPUs
+                multi_gpu_options = {}
+                if self.get_whisper_multi_gpu_count() > 1:
+                    multi_gpu_options = {'device_index': list(range(self.get_whisper_multi_gpu_count())),
+                                         'num_workers': self.get_whisper_multi_gpu_count()}
+
+                return FasterWhisperModel(
+                    self.whisper_model_name, device=device,
+                    compute_type=self.faster_whisper_compute_type
+                    if self.faster_whisper_compute_type not in [None, '', 'auto'] else None,
+                    cpu_threads=int(self.faster_whisper_cpu_threads or 0),
+                    batch_size=self.get_whisper_batch_size_setting(),
+                    **multi_gpu_options
+                )
+
+            except ImportError:
+                logger.warning('The faster_whisper package is not installed. '
+                               'Falling back to the OpenAI Whisper backend.')
+
+        # quantization only makes sense for the OpenAI backend when running on CPU
+        if self.whisper_quantization in ['int8_dynamic', 'int4_hqq'] \
+                and torch.device(device).type == 'cpu':
+            return self._load_quantized_whisper_model(quantization=self.whisper_quantization)
+
+        whisper_model = whisper.load_model(self.whisper_model_name, device=device)
+
+        # on CUDA, whisper decodes in fp16 by default, but its layers cast their fp32 weights to fp16 on each call,
+        # so we store the weights in fp16 from the start
+        if torch.device(device).type == 'cuda':
+            self._convert_whisper_model_to_half(whisper_model)
+
+        # on CPU, use bfloat16 via IPEX if the user selected it
+        if torch.device(device).type == 'cpu' and self.whisper_cpu_backend == 'ipex_bf16':
+            whisper_model = self._optimize_whisper_model_with_ipex(whisper_model)
+
+        # compile the model only on CUDA, where the compilation time pays off
+        if self.use_torch_compile and torch.device(device).type == 'cuda':
+            self._compile_whisper_model(whisper_model)
+
+        return whisper_model
+
+    @staticmethod
+    def _convert_whisper_model_to_half(whisper_model):
+        """
+        This converts the weights of the whisper Linear, Conv1d and Embedding layers to fp16.
+        The LayerNorm layers stay in fp32, since whisper runs them in fp32 anyway.
+        """
+
+        for module in whisper_model.modules():
+            if isinstance(module, (torch.nn.Linear, torch.nn.Conv1d, torch.nn.Embedding)):
+                module.half()
+
+        return whisper_model
+
+    @staticmethod
+    def _optimize_whisper_model_with_ipex(whisper_model):
+        """
+        This optimizes the whisper model for bfloat16 inference on CPUs that support AMX
+        using the Intel Extension for PyTorch.
+        The model is then marked with an autocast_dtype, so that we run it in bfloat16 autocast
+        (see get_whisper_autocast_context)
+        """
+
+        # bfloat16 is only faster than float32 on CPUs that have AMX tiles
+        if not hasattr(torch.cpu, '_is_amx_tile_supported') or not torch.cpu._is_amx_tile_supported():
+            logger.info('This CPU does not support AMX. Not using bfloat16 for Whisper.')
+            return whisper_model
+
+        try:
+            import intel_extension_for_pytorch as ipex
+
+        except ImportError:
+            logger.warning('The intel_extension_for_pytorch package is not installed. '
+                           'Not using bfloat16 for Whisper.')
+            return whisper_model
+
+        whisper_model = ipex.optimize(whisper_model.eval(), dtype=torch.bfloat16, inplace=True)
+        whisper_model.autocast_dtype = torch.bfloat16
+
+        logger.debug('Optimized Whisper model for bfloat16 inference with IPEX.')
+
+        return whisper_model
+
+    def get_whisper_autocast_context(self, whisper_model=None):
+        """
+        This returns the autocast context for the passed whisper model (or the currently loaded one),
+        or a context that does nothing if the model doesn't need to run in autocast
+        """
+
+        autocast_dtype = getattr(whisper_model if whisper_model is not None else self.whisper_model,
+                                 'autocast_dtype', None)
+
+        if autocast_dtype is None:
+            return contextlib.nullcontext()
+
+        return torch.autocast(device_type='cpu', dtype=autocast_dtype)
+
+    def _compile_whisper_model(self, whisper_model):
+        """
+        This compiles the encoder of the whisper model with torch.compile
+        and warms it up in the background, so that the first transcription doesn't have to wait for the compilation
+        """
+
+        import storytoolkitai.integrations.mots_whisper as whisper
+
+        if not hasattr(torch, 'compile'):
+            logger.warning('torch.compile is not available in this version of PyTorch. Not compiling Whisper model.')
+            return
+
+        # the encoder always receives 30-second mel windows, so it compiles into a single static graph
+        # - the decoder is left as it is, since its token sequence grows on each step
+        # and its kv-cache is populated using forward hooks, which would lead to constant re-compilations
+        whisper_model.encoder = torch.compile(whisper_model.encoder, mode='reduce-overhead', fullgraph=True)
+
+        def warm_up():
+
+            try:
+                logger.debug('Warming up compiled Whisper {} encoder.'.format(self.whisper_model_name))
+
+                # use the same dtype and grad mode as our transcriptions on CUDA (fp16, inference mode)
+                # and the batch sizes we'll use, so that the first batches don't trigger a re-compilation
+                with torch.inference_mode():
+                    for warm_up_batch_size in sorted({1, self.get_whisper_batch_size_setting()}):
+                        dummy_mel = torch.zeros((warm_up_batch_size, whisper_model.dims.n_mels, whisper.N_FRAMES),
+                                                dtype=torch.float16, device=whisper_model.device)
+                        whisper_model.encoder(dummy_mel)
+
+                logger.debug('Compiled Whisper {} encoder is ready.'.format(self.whisper_model_name))
+
+            except Exception:
+                logger.warning('Could not warm up compiled Whisper model.', exc_info=True)
+
+        self.submit_task(warm_up)
+
+    def _load_quantized_whisper_model(self, quantization):
+        """
+        This loads the whisper model and quantizes its linear layers for faster CPU inference.
+        The state_dict of the quantized model is cached on disk, so we don't have to load the full model
+        and quantize it again on the next load.
+        """
+
+        import dataclasses
+        import storytoolkitai.integrations.mots_whisper as whisper
+
+        # check if we can quantize to int4 before touching the model
+        if quantization == 'int4_hqq':
+
+            try:
+                from hqq.core.quantize import BaseQuantizeConfig, HQQLinear
+
+            except ImportError:
+                logger.warning('The hqq package is not installed. Using the non-quantized Whisper model.')
+                return whisper.load_model(self.whisper_model_name, device='cpu')
+
+        def quantize_linear_layers(model):
+            """
+            This replaces the linear layers of the passed whisper model with their quantized counterparts
+            """
+
+            # whisper uses its own subclass of nn.Linear (which only casts the weights to the input dtype),
+            # but the quantization functions only recognize nn.Linear, so we turn those into plain nn.Linear modules
+            for module in model.modules():
+                if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+                    module.__class__ = torch.nn.Linear
+
+            if quantization == 'int8_dynamic':
+                return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+            # replace each linear layer with its 4-bit HQQ counterpart
+            quant_config = BaseQuantizeConfig(nbits=4, group_size=64)
+            for parent_module in list(model.modules()):
+                for child_name, child_module in list(parent_module.named_children()):
+                    if type(child_module) is torch.nn.Linear:
+                        setattr(parent_module, child_name,
+                                HQQLinear(child_module, quant_config, compute_dtype=torch.float32, device='cpu'))
+
+            return model
+
+        # the quantized modules are internal to torch (and hqq), so their state_dict depends on the torch version too
+        quantized_model_path = os.path.join(
+            WHISPER_QUANTIZED_MODELS_PATH,
+            '{}-{}-{}-torch{}.pt'.format(self.whisper_model_name, quantization, whisper.__version__,
+                                         torch.__version__.replace('+', '_'))
+        )
+
+        # use the cached quantized state_dict if we have one
+        if os.path.exists(quantized_model_path):
+            try:
+                logger.debug('Loading quantized Whisper model from {}'.format(quantized_model_path))
+
+                # only load the tensors (and not any pickled objects) from the cache
+                checkpoint = torch.load(quantized_model_path, map_location='cpu', weights_only=True)
+
+                # rebuild the quantized model from the model dimensions and then load the quantized weights
+                whisper_model = quantize_linear_layers(whisper.Whisper(whisper.ModelDimensions(**checkpoint['dims'])))
+                whisper_model.load_state_dict(checkpoint['model_state_dict'])
+
+                # the alignment heads are not part of the state_dict
+                if self.whisper_model_name in whisper._ALIGNMENT_HEADS:
+                    whisper_model.set_alignment_heads(whisper._ALIGNMENT_HEADS[self.whisper_model_name])
+
+                return whisper_model
+
+            except Exception:
+                logger.warning('Could not load quantized Whisper model from {}. Quantizing again.'
+                               .format(quantized_model_path), exc_info=True)
+
+        whisper_model = whisper.load_model(self.whisper_model_name, device='cpu')
+
+        logger.info('Quantizing Whisper {} model ({}).'.format(self.whisper_model_name, quantization))
+
+        whisper_model = quantize_linear_layers(whisper_model)
+
+        # cache the quantized state_dict for the next time (in the same format as the whisper checkpoints)
+        try:
+            os.makedirs(WHISPER_QUANTIZED_MODELS_PATH, exist_ok=True)
+            torch.save({'dims': dataclasses.asdict(whisper_model.dims),
+                        'model_state_dict': whisper_model.state_dict()},
+                       quantized_model_path)
+
+        except Exception:
+            logger.warning('Could not cache quantized Whisper model to {}.'.format(quantized_model_path),
+                           exc_info=True)
+
+        return whisper_model
+
     def _split_audio_into_segments(self, audio_file_path, queue_id=None, **kwargs):
         """
         This splits the audio into segments that are suitable for Whisper
         It also takes into consideration any inclusion or exclusion intervals
         """
 
-        # load audio file as array using librosa
+        import librosa
+
+        # load audio file as array, decoding it only once
         # this should work for most audio formats
         try:
-            audio_array, sr = librosa.load(audio_file_path, sr=16_000)
+            audio_array, sr = MediaUtils.load_audio_array(audio_file_path, sr=16_000)
 
         # if the above fails, try this:
         except:
@@ -1908,8 +2990,9 @@ class ToolkitOps:
             audio_array = librosa.core.resample(np.asfortranarray(raw_audio_array.T), orig_sr=raw_sr, target_sr=sr)
             audio_array = librosa.core.to_mono(audio_array)
 
-            # change to float32
-            audio_array = np.asarray(audio_array, dtype=np.float32)
+        # make sure that the audio is a contiguous float32 array (this doesn't copy it if it already is)
+        # so that the segments we slice from it can be passed to VAD and whisper without any further copies
+        audio_array = np.ascontiguousarray(audio_array, dtype=np.float32)
 
         # cancel transcription if user requested it
         if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
@@ -1977,14 +3060,62 @@ class ToolkitOps:
         if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
             return None, None
 
-        if len(audio_segments) > 1:
+        # (only build the list of intervals if it's actually logged, since there could be thousands of them)
+        if len(audio_segments) > 1 and logger.isEnabledFor(logging.DEBUG):
             logger.debug('Split audio {} into {} segments: {}'.format(
                 kwargs.get('name', 'from file'),
                 len(audio_segments),
-                ', '.join([str(float(x[0]))+'-'+str(float(x[1])) for x in time_intervals])))
+                ', '.join('{}-{}'.format(float(start), float(end)) for start, end in time_intervals)))
 
         return audio_segments, time_intervals
 
+    def get_transcription_cache_key(self, audio_file_path, task, other_options) -> str or None:
+        """
+        This returns the key under which we cache the transcription result of an audio file,
+        according to the contents of the audio file, the whisper model and all the options that change the result
+        (or None if the audio file can't be read)
+        """
+
+        try:
+            audio_file_hash = TranscriptionUtils.get_file_hash(audio_file_path)
+
+        except OSError:
+            logger.debug('Cannot hash {} for the transcription cache.'.format(audio_file_path), exc_info=True)
+            return None
+
+        # the queue id is different for each transcription, so don't include it in the key
+        whisper_options = self.whisper_options(**other_options.get('whisper_options', {}))
+        whisper_options.pop('queue_id', None)
+
+        cache_parameters = {
+            'audio_file_hash': audio_file_hash,
+
+            # a different app version might process the results differently
+            'app_version': getattr(self.stAI, 'version', None),
+
+            'task': task,
+            'model_name': other_options.get('model_name', self.whisper_model_name),
+            'device': str(other_options.get('device', None) or self.torch_device),
+
+            # the backend is read from the settings, since the key is calculated before we (re)load the model
+            # with the backend that the user selected (see _prepare_whisper_model)
+            # (the quantization and the compute type are only read from the settings when the app starts)
+            'whisper_backend': self.stAI.get_app_setting(setting_name='whisper_backend', default_if_none='openai'),
+            'whisper_quantization': self.whisper_quantization,
+            'faster_whisper_compute_type': self.faster_whisper_compute_type,
+
+            # the batch size changes how the audio segments are split into windows
+            'whisper_batch_size': self.get_whisper_batch_size_setting(),
+
+            'whisper_options': whisper_options,
+            'punctuation_marks': self.stAI.get_app_setting('transcription_custom_punctuation_marks',
+                                                           default_if_none=DEFAULT_PUNCTUATION_MARKS),
+        }
+
+        cache_parameters.update({option: other_options.get(option, None) for option in TRANSCRIPTION_CACHE_OPTIONS})
+
+        return hashlib.sha256(json.dumps(cache_parameters, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
     def whisper_transcribe(self, name: str = None, audio_file_path: str = None, task=None,
                            target_dir=None, queue_id=None, return_path=False, **other_options) -> bool or str:
         """
@@ -1999,8 +3130,13 @@ class ToolkitOps:
         :return:
         """
 
+        # read the options that we use more than once here
+        # (the other_options dict itself is still passed along, since the other methods take their options from it)
+        source_file_path = other_options.get('source_file_path', None)
+        retranscribe = other_options.get('retranscribe', False)
+
         # if no audio file path was passed, try to use the source file path if it was passed
-        audio_file_path = audio_file_path or other_options.get('source_file_path')
+        audio_file_path = audio_file_path or source_file_path
 
         # don't continue if we don't have an audio file path
         if audio_file_path is None or not audio_file_path:
@@ -2024,7 +3160,7 @@ class ToolkitOps:
         # if we're currently not retranscribing or not supposed to overwrite an existing transcription file
         if os.path.exists(transcription_file_path) \
                 and other_options.get('overwrite', False) is False \
-                and other_options.get('retranscribe', False) is False:
+                and retranscribe is False:
 
             # use the the next available transcription file path
             transcription_file_path = TranscriptionUtils.add_count_to_transcription_path(transcription_file_path)
@@ -2051,65 +3187,87 @@ class ToolkitOps:
         transcription.set('task', task)
         transcription.set('whisper_model', self.whisper_model_name)
 
-        # initialize whisper and get the audio array and sample rate
-        if not self._initialize_whisper_transcribe(queue_id=queue_id, **other_options):
-            return None
-
-        # split the audio into segments according to the time intervals and pre-detect speech if requested
-        audio_segments, time_intervals = self._split_audio_into_segments(
-            audio_file_path=audio_file_path, queue_id=queue_id, **other_options)
+        # if we transcribed the same audio with the same options before, use the cached result
+        # (but only for new transcriptions, since we don't want to mix cached results with existing segments)
+        transcription_cache_key = None
+        if self.stAI.get_app_setting('transcription_cache', default_if_none=True) and not transcription.has_segments:
+            transcription_cache_key = self.get_transcription_cache_key(
+                audio_file_path=audio_file_path, task=task, other_options=other_options)
 
-        if not audio_segments:
-            return None
-
-        # update the correct status depending if this is a retranscribe operation or not
-        # and if the transcription file already exists
-        if transcription.exists and other_options.get('retranscribe', False):
-            self.processing_queue.update_queue_item(queue_id=queue_id, status='re-transcribing')
-        else:
-            self.processing_queue.update_queue_item(queue_id=queue_id, status='transcribing')
+        result = TranscriptionUtils.get_cached_transcription_result(transcription_cache_key) \
+            if transcription_cache_key else None
 
         # technically the transcription process starts here, so start a timer for statistics
         transcription_start_time = time.time()
 
-        # let the user know the transcription process has started
-        if isinstance(time_intervals, list):
-            time_intervals_str = ", ".join([f"{start}-{end}" for start, end in time_intervals])
-            debug_message = "Transcribing {} between: {}.".format(name, time_intervals_str)
+        transcription_cache_hit = result is not None
+
+        if transcription_cache_hit:
+            logger.info('Using cached transcription result for {}.'.format(name))
+
+            transcription.add_segments(result['segments'])
+
         else:
-            debug_message = "Transcribing {}.".format(name)
-        # logger.info(debug_message)
+            # initialize whisper and get the audio array and sample rate
+            if not self._initialize_whisper_transcribe(queue_id=queue_id, **other_options):
+                return None
 
-        if self.toolkit_UI_obj:
-            self.toolkit_UI_obj.notify_via_os("Starting Transcription",
-                                              text="Transcribing {}".format(name),
-                                              debug_message=debug_message)
+            # let the other transcriptions know when we're done with the whisper model
+            try:
+                # split the audio into segments according to the time intervals and pre-detect speech if requested
+                audio_segments, time_intervals = self._split_audio_into_segments(
+                    audio_file_path=audio_file_path, queue_id=queue_id, **other_options)
 
-        # initialize empty result
-        result = None
+                if not audio_segments:
+                    return None
 
-        # transcribe the audio segments
-        # (or just one audio segment with the whole audio if no time intervals were passed)
-        try:
-            result = self.whisper_transcribe_segments(audio_segments=audio_segments,
-                                                      task=task,
-                                                      other_options=other_options,
-                                                      queue_id=queue_id
-                                                      )
-        except Exception as e:
-            import traceback
-            exc_info = traceback.format_exc()
+                # update the correct status depending if this is a retranscribe operation or not
+                # and if the transcription file already exists
+                if transcription.exists and retranscribe:
+                    self.processing_queue.update_queue_item(queue_id=queue_id, status='re-transcribing')
+                else:
+                    self.processing_queue.update_queue_item(queue_id=queue_id, status='transcribing')
 
-            # format your message
-            fail_error = ('Error transcribing audio {} using Whisper.\n'
-                          '{}\n {}').format(name, e, exc_info)
+                # let the user know the transcription process has started
+                # (the debug message is only used by the UI notification, so only build it if we have a UI)
+                if self.toolkit_UI_obj:
 
-            # log the message
-            logger.error(fail_error)
+                    if isinstance(time_intervals, list):
+                        time_intervals_str = ", ".join(f"{start}-{end}" for start, end in time_intervals)
+                        debug_message = "Transcribing {} between: {}.".format(name, time_intervals_str)
+                    else:
+                        debug_message = "Transcribing {}.".format(name)
+                    # logger.info(debug_message)
 
-            # update the status of the item in the transcription log
-            self.processing_queue.update_queue_item(
-                queue_id=queue_id, status='failed', progress='', fail_error=fail_error)
+                    self.toolkit_UI_obj.notify_via_os("Starting Transcription",
+                                                      text="Transcribing {}".format(name),
+                                                      debug_message=debug_message)
+
+                # transcribe the audio segments
+                # (or just one audio segment with the whole audio if no time intervals were passed)
+                try:
+                    result = self.whisper_transcribe_segments(audio_segments=audio_segments,
+                                                              task=task,
+                                                              other_options=other_options,
+                                                              queue_id=queue_id
+                                                              )
+                except Exception as e:
+                    import traceback
+                    exc_info = traceback.format_exc()
+
+                    # format your message
+                    fail_error = ('Error transcribing audio {} using Whisper.\n'
+                                  '{}\n {}').format(name, e, exc_info)
+
+                    # log the message
+                    logger.error(fail_error)
+
+                    # update the status of the item in the transcription log
+                    self.processing_queue.update_queue_item(
+                        queue_id=queue_id, status='failed', progress='', fail_error=fail_error)
+
+            finally:
+                self._release_whisper_model()
 
         # was the transcription canceled or failed?
         # if whisper returned None or a dict with status failed or canceled
@@ -2141,19 +3299,25 @@ class ToolkitOps:
         # update the status of the item in the transcription log
         self.processing_queue.update_queue_item(queue_id=queue_id, status='saving files', progress='')
 
+        # cache the result, so that we don't have to transcribe the same audio with the same options again
+        if transcription_cache_key and not transcription_cache_hit:
+            TranscriptionUtils.cache_transcription_result(
+                transcription_cache_key, result,
+                max_cache_size_mb=self.stAI.get_app_setting('transcription_cache_max_size_mb', default_if_none=1024))
+
         # if we made it here, it means that the transcription is complete
         transcription.set('incomplete', False)
 
-        # save the transcription file once here
-        transcription.save_soon(sec=0)
+        # schedule the save of the transcription file here,
+        # process_transcription_metadata saves it right after with all the metadata in a single write
+        transcription.save_soon(sec=1)
 
         # take care of the metadata and project related stuff
         self.process_transcription_metadata(other_options=other_options, transcription=transcription)
 
         # delete the render.json file if it exists
-        if other_options.get('source_file_path', None) and other_options.get('ingest_delete_render_info_file', False):
+        if source_file_path and other_options.get('ingest_delete_render_info_file', False):
 
-            source_file_path = other_options.get('source_file_path', None)
             render_json_file_path = "{}.json".format(source_file_path)
 
             # delete the render.json file if it exists
@@ -2188,16 +3352,21 @@ class ToolkitOps:
 
         return True if not return_path else transcription.transcription_file_path
 
-    def process_transcription_metadata(self, other_options, transcription: Transcription | str):
+    def process_transcription_metadata(self, other_options, transcription: Transcription | str,
+                                       notify_project_changed=True):
         """
         We use this usually at the end of whisper_transcribe() and index_video()
         to set any metadata or project related stuff.
         This also deletes the render.json file if requested.
+
+        :param notify_project_changed: if False, the caller should notify the project_changed observers
+                                       (useful when processing more transcriptions at once)
+        :return: True if the transcription was linked to a project, False otherwise
         """
 
         # if the transcription is none, return
         if transcription is None:
-            return
+            return False
 
         # if the transcription is a string, then it's a file path
         if isinstance(transcription, str):
@@ -2216,47 +3385,141 @@ class ToolkitOps:
             # if a project_name was sent, remember it for later
             project_name = other_options.get('project_name', None)
 
-            # add the project name to the transcription data, if there is one
-            if project_name is not None:
-                transcription.set('project_name', project_name)
+            # add the project name to the transcription data, if there is one
+            if project_name is not None:
+                transcription.set('project_name', project_name)
+
+        # update other stuff, like metadata and project and timeline names
+        # but only use them if they're not empty
+        if 'timeline_fps' in other_options and other_options['timeline_fps']:
+            transcription.set('timeline_fps', other_options['timeline_fps'])
+
+        if 'timeline_start_tc' in other_options and other_options['timeline_start_tc']:
+            transcription.set('timeline_start_tc', other_options['timeline_start_tc'])
+
+        # if there's a project_name and a timeline_name in the transcription
+        # link the transcription to the project and timeline
+        if isinstance(transcription, Transcription) \
+                and transcription.project_name is not None and transcription.timeline_name is not None:
+            project = Project(project_name=transcription.project_name)
+
+            project.link_transcription_to_timeline(
+                transcription_file_path=transcription.transcription_file_path,
+                timeline_name=transcription.timeline_name
+            )
+
+            project_changed = True
+
+        # if a timeline_name wasn't set, but a project_name was set,
+        # just link the transcription to the project
+        elif isinstance(transcription, Transcription) \
+                and transcription.project_name is not None and transcription.timeline_name is None:
+            project = Project(project_name=transcription.project_name)
+
+            project.link_to_project(object_type='transcription', file_path=transcription.transcription_file_path)
+
+            project_changed = True
+
+        else:
+            project_changed = False
+
+        # notify the observers that the project has changed
+        if project_changed and notify_project_changed:
+            self.notify_observers('project_changed')
+
+        # save the transcription to file with all the added data
+        transcription.save_soon(sec=0)
+
+        return project_changed
+
+    # SEARCH/CLASSIFICATION PROCESS METHODS
+
+    def _load_text_classifier(self, model_name, batch_size=1):
+        """
+        This returns the zero-shot-classification pipeline for the text classifier model.
+        On CPU, we use an int8 quantized ONNX version of the model (if optimum is installed),
+        since it's a few times faster than the full precision PyTorch model.
+        """
+
+        from transformers import pipeline
+
+        text_classifier_key = (model_name, str(self.torch_device), batch_size)
+
+        # use the pipeline that we already loaded (if any)
+        if text_classifier_key in self.text_classifiers:
+            return self.text_classifiers[text_classifier_key]
+
+        text_classifier = None
+
+        if torch.device(self.torch_device).type == 'cpu' \
+                and self.stAI.get_app_setting('text_classifier_onnx_int8', default_if_none=True):
+
+            try:
+                text_classifier = self._load_quantized_text_classifier(model_name, batch_size=batch_size)
+
+            except ImportError:
+                logger.debug('Optimum is not installed, using the full precision text classifier model.')
+
+            except Exception:
+                logger.warning('Could not load the quantized text classifier model {}. '
+                               'Using the full precision model.'.format(model_name), exc_info=True)
+
+        if text_classifier is None:
+            text_classifier = pipeline('zero-shot-classification',
+                                       model=model_name, device=self.torch_device, batch_size=batch_size)
+
+        self.text_classifiers[text_classifier_key] = text_classifier
+
+        return text_classifier
+
+    def unload_text_classifiers(self):
+        """
+        This removes all the loaded text classifier pipelines, to free up memory
+        """
+
+        self.text_classifiers.clear()
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    @staticmethod
+    def _load_quantized_text_classifier(model_name, batch_size=1):
+        """
+        This exports the text classifier model to ONNX and quantizes its weights to int8 using optimum,
+        then returns a zero-shot-classification pipeline that runs it with ONNX Runtime.
+        The quantized model is cached on disk, so we don't have to export and quantize it again on the next load.
+        """
 
-        # update other stuff, like metadata and project and timeline names
-        # but only use them if they're not empty
-        if 'timeline_fps' in other_options and other_options['timeline_fps']:
-            transcription.set('timeline_fps', other_options['timeline_fps'])
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer, pipeline
 
-        if 'timeline_start_tc' in other_options and other_options['timeline_start_tc']:
-            transcription.set('timeline_start_tc', other_options['timeline_start_tc'])
+        quantized_model_path = os.path.join(TEXT_CLASSIFIER_QUANTIZED_MODELS_PATH, model_name.replace('/', '--'))
 
-        # if there's a project_name and a timeline_name in the transcription
-        # link the transcription to the project and timeline
-        if isinstance(transcription, Transcription) \
-                and transcription.project_name is not None and transcription.timeline_name is not None:
-            project = Project(project_name=transcription.project_name)
+        if not os.path.isfile(os.path.join(quantized_model_path, TEXT_CLASSIFIER_QUANTIZED_MODEL_FILE)):
 
-            project.link_transcription_to_timeline(
-                transcription_file_path=transcription.transcription_file_path,
-                timeline_name=transcription.timeline_name
-            )
+            logger.info('Quantizing text classifier model {}.'.format(model_name))
 
-            # notify the observers that the project has changed
-            self.notify_observers('project_changed')
+            onnx_model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
 
-        # if a timeline_name wasn't set, but a project_name was set,
-        # just link the transcription to the project
-        elif isinstance(transcription, Transcription) \
-                and transcription.project_name is not None and transcription.timeline_name is None:
-            project = Project(project_name=transcription.project_name)
+            # the int8 matrix multiplications use VNNI on x86 CPUs that have it, and the dot product extension on arm64
+            if platform.machine().lower() in ['arm64', 'aarch64']:
+                quantization_config = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+            else:
+                quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
 
-            project.link_to_project(object_type='transcription', file_path=transcription.transcription_file_path)
+            ORTQuantizer.from_pretrained(onnx_model).quantize(save_dir=quantized_model_path,
+                                                               quantization_config=quantization_config)
 
-            # notify the observers that the project has changed
-            self.notify_observers('project_changed')
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(quantized_model_path)
 
-        # save the transcription to file with all the added data
-        transcription.save_soon(sec=0)
+        logger.debug('Loading quantized text classifier model from {}'.format(quantized_model_path))
 
-    # SEARCH/CLASSIFICATION PROCESS METHODS
+        return pipeline('zero-shot-classification',
+                        model=ORTModelForSequenceClassification.from_pretrained(
+                            quantized_model_path, file_name=TEXT_CLASSIFIER_QUANTIZED_MODEL_FILE),
+                        tokenizer=AutoTokenizer.from_pretrained(quantized_model_path),
+                        batch_size=batch_size)
 
     def classify_segments(self, segments: list, labels: list,
                           min_confidence: int or list = 0.55, multi_label_pass: list = None, **kwargs):
@@ -2301,126 +3564,126 @@ class ToolkitOps:
         model_name = self.stAI.get_app_setting('text_classifier_model', default_if_none='facebook/bart-large-mnli')
 
         logger.debug('Loading text classifier model: {}'.format(model_name))
+
+        # how many segments we classify at once
+        # (the pipeline pads and stacks them, so that they go through the model together)
+        try:
+            batch_size = max(1, int(self.stAI.get_app_setting('text_classifier_batch_size', default_if_none=16)))
+        except (ValueError, TypeError):
+            batch_size = 16
+
         # get the zero-shot-classification pipeline
-        classifier = pipeline('zero-shot-classification',
-                              model=model_name,
-                              )
+        classifier = self._load_text_classifier(model_name, batch_size=batch_size)
 
         logger.debug('Classifying segments using the following labels: {}'.format(labels))
 
-        # go through each segment and classify it
-        classified_segments = {}
+        # if labels is a list of strings, do a normal classification (as a single label group)
+        if isinstance(labels, list) and isinstance(labels[0], str):
+            label_groups = [labels]
+            min_confidences = [min_confidence]
 
-        # use tqdm to show a progress bar while classifying segments
-        with tqdm.tqdm(segments, desc='Classifying segments', total=len(segments)) as pbar:
+        # if labels is a list of lists, do a multi-label classification
+        elif isinstance(labels, list) and isinstance(labels[0], list):
+            label_groups = labels
+
+            # if the min_confidence is a list, each label group has its own min_confidence value
+            min_confidences = min_confidence if isinstance(min_confidence, list) else [min_confidence] * len(labels)
 
-            for i, segment in enumerate(segments):
+        else:
+            logger.error('Invalid labels for classification: {}'.format(labels))
+            return None
 
-                # if this is a transcription segment, get the text and words,
-                # or assume it's a dict and get them from there
-                segment_text = segment.text \
-                    if isinstance(segment, TranscriptionSegment) else segment.get('text', None)
-                segment_words = segment.words \
-                    if isinstance(segment, TranscriptionSegment) else segment.get('words', None)
+        # first get the text of all the segments that we can classify
+        classifiable_segments = []
+        classifiable_texts = []
+        for segment in segments:
 
-                # skip segments that don't have any text or words
-                if not segment_text and not segment_words:
-                    logger.debug("Skipping segment classification because it doesn't have any text or words: {}"
-                                 .format(segment))
-                    continue
+            # if this is a transcription segment, get the text and words,
+            # or assume it's a dict and get them from there
+            segment_text = segment.text \
+                if isinstance(segment, TranscriptionSegment) else segment.get('text', None)
+            segment_words = segment.words \
+                if isinstance(segment, TranscriptionSegment) else segment.get('words', None)
+
+            # skip segments that don't have any text or words
+            if not segment_text and not segment_words:
+                logger.debug("Skipping segment classification because it doesn't have any text or words: {}"
+                             .format(segment))
+                continue
 
-                # if the text is empty, try to get the text from the words
-                if not segment_text or segment_text.strip() == '':
-                    segment_text = ' '.join([word['word'] for word in segment_words])
+            # if the text is empty, try to get the text from the words
+            if not segment_text or segment_text.strip() == '':
+                segment_text = ' '.join([word['word'] for word in segment_words])
 
-                # if the text is still empty, skip the segment
-                if not segment_text or segment_text.strip() == '':
-                    logger.debug("Skipping segment classification because it doesn't have any text: {}"
-                                 .format(segment))
-                    continue
+            # if the text is still empty, skip the segment
+            if not segment_text or segment_text.strip() == '':
+                logger.debug("Skipping segment classification because it doesn't have any text: {}"
+                             .format(segment))
+                continue
 
-                # classify the segment
+            classifiable_segments.append(segment)
+            classifiable_texts.append(segment_text)
 
-                # if labels is a list of strings, do a normal classification
-                if isinstance(labels, list) and isinstance(labels[0], str):
-                    classification = classifier(segment_text, labels)
+        # go through each label group and classify all the segments that passed the previous label groups
+        classified_segments = defaultdict(list)
 
-                    # if the classification confidence is too low, skip the segment
-                    if min_confidence and classification['scores'][0] < min_confidence:
-                        logger.debug('Skipping segment classification because the confidence is too low {}: {}'
-                                     .format(classification['scores'][0], segment))
-                        continue
+        # use tqdm to show a progress bar while classifying segments
+        with tqdm.tqdm(desc='Classifying segments', total=len(classifiable_segments) * len(label_groups)) as pbar:
 
-                    # add it to the corresponding list, but first make sure the label exists
-                    if classification['labels'][0] not in classified_segments:
-                        classified_segments[classification['labels'][0]] = []
+            for group_index, (sub_labels, group_min_confidence) in enumerate(zip(label_groups, min_confidences)):
 
-                    classified_segments[classification['labels'][0]].append(segment)
+                # the segments that pass this label group are the only ones classified using the next label group
+                # (for a multi-label classification, the confidence needs to be high enough for each label group)
+                passed_segments = []
+                passed_texts = []
 
-                    # clear classification to free up memory
-                    del classification
+                # classify the segments in batches
+                for batch_start in range(0, len(classifiable_segments), batch_size):
 
-                # if labels is a list of lists, do a multi-label classification
-                elif isinstance(labels, list) and isinstance(labels[0], list):
+                    batch_segments = classifiable_segments[batch_start:batch_start + batch_size]
+                    batch_texts = classifiable_texts[batch_start:batch_start + batch_size]
 
-                    # reset the current_segment_passed_classification to True,
-                    # until we find a label that doesn't pass
-                    current_segment_passed_classification = True
+                    classifications = classifier(batch_texts, sub_labels)
 
-                    # take each label groups, one by one and use them to classify the segment
-                    for sub_labels in labels:
+                    # the pipeline returns a single dict if there's only one text
+                    if isinstance(classifications, dict):
+                        classifications = [classifications]
 
-                        # if the segment didn't pass the classification for the previous label check, skip it
-                        if not current_segment_passed_classification:
-                            continue
+                    for segment, segment_text, classification in zip(batch_segments, batch_texts, classifications):
 
-                        # classify the segment using this label
-                        classification = classifier(segment_text, sub_labels)
-
-                        # if the min_confidence is a list, use the index of the current label group
-                        # to get the corresponding min_confidence value
-                        if isinstance(min_confidence, list):
-                            min_confidence = min_confidence[labels.index(sub_labels)]
-
-                        # for a multi-label classification,
-                        # we need to check if the confidence is high enough for each label
-                        # so if it isn't, we skip the segment - which means that all other remaining labels
-                        # will be skipped as well
-                        if classification['scores'][0] < min_confidence:
-                            current_segment_passed_classification = False
-                            logger.debug('Skipping segment classification for the following segment '
-                                         'because a confidence of {}'
+                        # if the classification confidence is too low, skip the segment
+                        if group_min_confidence and classification['scores'][0] < group_min_confidence:
+                            logger.debug('Skipping segment classification because a confidence of {} '
                                          'is too low to classify it in any of the labels {}: \n{}\n\n'
                                          .format(classification['scores'][0], sub_labels, segment_text))
                             continue
 
-                        # add it to the corresponding list, but first make sure the label exists
-                        if classification['labels'][0] not in classified_segments:
-                            classified_segments[classification['labels'][0]] = []
-
+                        # add it to the list of its label
                         classified_segments[classification['labels'][0]].append(segment)
 
-                        # clear classification to free up memory
-                        del classification
+                        passed_segments.append(segment)
+                        passed_texts.append(segment_text)
 
-                else:
-                    logger.error('Invalid labels for classification: {}'.format(labels))
-                    continue
+                    # update progress bar
+                    pbar.update(len(batch_segments))
 
-                # update progress bar - this should be done after each segment is classified
-                # because the progress bar is based on the number of segments
-                pbar.update(1)
+                    # if there's a queue_id, update the queue item with the progress
+                    if kwargs.get('queue_id'):
 
-                # get the percentage of progress
-                progress = int(((i + 1) / len(segments)) * 100)
+                        progress = int((group_index + (batch_start + len(batch_segments)) / len(classifiable_segments))
+                                       * 100 / len(label_groups))
 
-                # if there's a queue_id, update the queue item with the progress and some output
-                if kwargs.get('queue_id'):
-                    self.processing_queue.update_queue_item(kwargs['queue_id'], progress=progress, save_to_file=False)
+                        self.processing_queue.update_queue_item(kwargs['queue_id'], progress=progress,
+                                                                save_to_file=False)
 
-                    # cancel process if user requested it via queue
-                    if self.processing_queue.cancel_if_canceled(queue_id=kwargs.get('queue_id')):
-                        return None
+                        # cancel process if user requested it via queue
+                        if self.processing_queue.cancel_if_canceled(queue_id=kwargs.get('queue_id')):
+                            return None
+
+                # only the segments that passed this label group move on to the next one
+                pbar.update((len(classifiable_segments) - len(passed_segments)) * (len(label_groups) - group_index - 1))
+                classifiable_segments = passed_segments
+                classifiable_texts = passed_texts
 
         # if there are no segments to classify, return
         if not classified_segments:
@@ -2451,12 +3714,14 @@ class ToolkitOps:
                     continue
 
                 # intersect the classified_segments['_multi_label_pass_'] with the current label
+                # (we compare the segment object ids, so that we don't scan the label's list for each segment)
+                label_segment_ids = {id(item) for item in classified_segments[label]}
                 classified_segments['_multi_label_pass_'] = [item for item in classified_segments['_multi_label_pass_']
-                                                             if item in classified_segments[label]]
+                                                             if id(item) in label_segment_ids]
 
         logger.debug('Classification complete.')
 
-        return classified_segments
+        return dict(classified_segments)
 
     def group_questions(self, transcription_file_path: str = None, group_name: str = "Questions",
                         **kwargs):
@@ -2486,6 +3751,27 @@ class ToolkitOps:
         # but at least we're not processing them
         segments = TranscriptionUtils.filter_segments(transcription.segments, filter_meta=True)
 
+        # only the segments that look like questions need to go through the classifier
+        # (unless the group_questions_prefilter setting is off)
+        # but since the prefilter only knows English question words, we only use it for English transcriptions
+        # or, if we don't know the language, for transcriptions that contain question marks
+        if self.stAI.get_app_setting('group_questions_prefilter', default_if_none=True):
+
+            transcription_language = str(transcription.language or '').strip().lower()
+
+            if transcription_language in ('en', 'english') \
+                    or (not transcription_language and any('?' in (segment.text or '') for segment in segments)):
+                segments = [segment for segment in segments if QUESTION_CANDIDATE_REGEX.search(segment.text or '')]
+
+        # if there's nothing to classify, don't even load the classifier model
+        if not segments or not any((segment.text or '').strip() for segment in segments):
+            logger.info('No possible questions found in {}.'.format(transcription_file_path))
+
+            if kwargs.get('queue_id', None):
+                self.processing_queue.update_status(queue_id=kwargs.get('queue_id', None), status='done')
+
+            return None
+
         # classify the segments as questions or statements
         # but use the existing transcription data if we have it
         classified_question_segments = self.classify_segments(
@@ -2543,12 +3829,11 @@ class ToolkitOps:
         if kwargs.get('queue_id', None):
             self.processing_queue.update_status(queue_id=kwargs.get('queue_id', None), status='done')
 
-        # update all the observers that are listening for this transcription
-        self.notify_observers('update_transcription_{}'.format(transcription.transcription_path_id))
-
-        # update all the observers that are listening for this transcription's groups
-        self.notify_observers('update_transcription_groups_{}'
-                              .format(transcription.transcription_path_id))
+        # update all the observers that are listening for this transcription and for its groups
+        self.notify_observers_bulk([
+            'update_transcription_{}'.format(transcription.transcription_path_id),
+            'update_transcription_groups_{}'.format(transcription.transcription_path_id)
+        ])
 
         return questions_group
 
@@ -2587,8 +3872,10 @@ class ToolkitOps:
         This takes the search_file_paths through the TextSearch embedder and saves their cached embeddings to disk
         """
 
-        if kwargs.get('queue_id', None):
-            self.processing_queue.update_status(queue_id=kwargs.get('queue_id', None), status='reading files')
+        queue_id = kwargs.get('queue_id', None)
+
+        if queue_id:
+            self.processing_queue.update_status(queue_id=queue_id, status='reading files')
 
         search_item = TextSearch(
             toolkit_ops_obj=self, search_file_paths=search_file_paths, search_type='semantic',
@@ -2599,27 +3886,31 @@ class ToolkitOps:
         search_item.prepare_search_corpus()
 
         # cancel indexing if user requested it
-        if self.processing_queue.cancel_if_canceled(queue_id=kwargs.get('queue_id', None)):
+        if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
             return None
 
+        # bind the queue methods that the batch callback below uses
+        cancel_if_canceled = self.processing_queue.cancel_if_canceled
+        update_queue_item = self.processing_queue.update_queue_item
+
         def batch_progress_callback(current_index, total_indexes):
             """
             This is sent to the encoder to be called after each batch is processed
             and track the progress so we can update the queue item and cancel mid-encoding if requested
             """
 
-            if kwargs.get('queue_id', None) is not None:
+            if queue_id is not None:
 
                 # cancel indexing if user requested it
-                if self.processing_queue.cancel_if_canceled(queue_id=kwargs.get('queue_id', None)):
+                if cancel_if_canceled(queue_id=queue_id):
                     return None
 
                 # calculate the current progress in percent
-                current_progress = round((current_index / total_indexes) * 100)
+                current_progress = round((current_index / (total_indexes or 1)) * 100)
 
                 # update the queue item progress
-                self.processing_queue.update_queue_item(
-                    queue_id=kwargs.get('queue_id', None),
+                update_queue_item(
+                    queue_id=queue_id,
                     status='indexing',
                     progress=current_progress,
                 )
@@ -2627,12 +3918,18 @@ class ToolkitOps:
             # keep going
             return True
 
-        # embed the search corpus
-        if not search_item.embed_corpus(batch_process_callback=batch_progress_callback):
+        # if the embeddings of this exact corpus were already saved to the file cache
+        # (the cache file name contains the hash of the corpus phrases, search type and model),
+        # there's nothing left to index, so we don't even need to load the search model
+        if search_item.corpus_size > 0 and search_item.cache_exists:
+            logger.debug('Search corpus already indexed in {}.'.format(search_item.corpus_cache_file_path))
+
+        # otherwise, embed the search corpus
+        elif not search_item.embed_corpus(batch_process_callback=batch_progress_callback):
             return None
 
-        if kwargs.get('queue_id', None):
-            self.processing_queue.update_status(queue_id=kwargs.get('queue_id', None), status='done')
+        if queue_id:
+            self.processing_queue.update_status(queue_id=queue_id, status='done')
 
         # search_item.search_file_path_id
         # notify all observers that are listening for this search_file_path_id
@@ -2664,104 +3961,127 @@ class ToolkitOps:
 
     def index_video(self, video_file_path, **kwargs):
 
+        queue_id = kwargs.get('queue_id', None)
+
         indexing_options = kwargs.get('indexing_options', dict())
         detection_options = kwargs.get('detection_options', dict())
 
-        # the target dir is either something that was sent via other_options
-        # or it's the directory of the video_file_path
-        target_dir = kwargs.get('target_dir', None) or os.path.dirname(video_file_path)
-
-        # the transcription_file_path is either something that was sent via other_options
-        # or it's the video_file_path, but with the extension changed to .transcription.json
-        transcription_file_path = kwargs.get('transcription_file_path', None) \
-            or os.path.join(target_dir, '{}.transcription.json'.format(os.path.basename(video_file_path)))
-
         # if a transcription_file_path was passed use it,
         # but only if we don't have other transcription file paths
         if kwargs.get('transcription_file_paths', None) is None:
+
+            # the transcription_file_path is either something that was sent via other_options
+            # or it's the video_file_path, but with the extension changed to .transcription.json
+            transcription_file_path = kwargs.get('transcription_file_path', None)
+
+            if not transcription_file_path:
+
+                # the target dir is either something that was sent via other_options
+                # or it's the directory of the video_file_path
+                target_dir = kwargs.get('target_dir', None) or os.path.dirname(video_file_path)
+
+                transcription_file_path = \
+                    os.path.join(target_dir, '{}.transcription.json'.format(os.path.basename(video_file_path)))
+
             transcription = Transcription(transcription_file_path)
 
         # if we have more transcription_file_paths in kwargs, we'll deal with them later
         else:
+            transcription_file_path = None
             transcription = None
 
+        # the progress callbacks below are called for each frame,
+        # so we only update the queue item when the status or the progress changes (and at most 10 times per second)
+        progress_update_state = {'status': None, 'progress': None, 'time': 0}
+
+        # bind the queue methods that the per-frame callbacks below use
+        cancel_if_canceled = self.processing_queue.cancel_if_canceled
+        update_queue_item = self.processing_queue.update_queue_item
+
+        def update_indexing_progress(status, progress):
+            """
+            This updates the queue item status and progress, but skips the updates that wouldn't change anything
+            """
+
+            current_time = time.monotonic()
+
+            if status != progress_update_state['status'] \
+                    or (progress != progress_update_state['progress']
+                        and current_time - progress_update_state['time'] > 0.1):
+
+                update_queue_item(queue_id=queue_id, status=status, progress=progress)
+
+                progress_update_state['status'] = status
+                progress_update_state['progress'] = progress
+                progress_update_state['time'] = current_time
+
         def frame_progress_callback(current_frame, total_frames):
             """
             This is sent to the encoder to be called after each frame was processed
             and track the progress so we can update the queue item and cancel mid-encoding if requested
             """
 
-            if kwargs.get('queue_id', None) is not None:
+            if queue_id is not None:
 
                 # cancel indexing if user requested it
-                if self.processing_queue.cancel_if_canceled(queue_id=kwargs.get('queue_id', None)):
+                if cancel_if_canceled(queue_id=queue_id):
                     return None
 
                 # calculate the current progress in percent
-                current_progress = round((current_frame / total_frames) * 100)
+                current_progress = round((current_frame / (total_frames or 1)) * 100)
 
                 # update the queue item progress
-                self.processing_queue.update_queue_item(
-                    queue_id=kwargs.get('queue_id', None),
-                    status='indexing',
-                    progress=current_progress,
-                )
+                update_indexing_progress(status='indexing', progress=current_progress)
 
             # keep going
             return True
 
-        self.processing_queue.update_status(queue_id=kwargs.get('queue_id', None), status='loading')
+        self.processing_queue.update_status(queue_id=queue_id, status='loading')
 
         # initialize the encoder
         index = ClipIndex(
             path=video_file_path, device=self.torch_device, patch_divider=indexing_options.get('patch_divider', 1.9)
         )
 
-        queue_id = kwargs.get('queue_id', None)
-
-        def detect_progress(**progress_kwargs):
-
-            # calculate the current progress in percent based on where we are in the total number of frames
-            # but also divide by 3 because even if STAGE 1 is fully done, we're only 33% done
-            progress = int(
-                int(progress_kwargs.get('current_frame_index', 1)) / int(progress_kwargs.get('total_frames', 1))
-                * 100 // 3)
-
-            # cancel indexing if user requested it
-            if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
-                return None
+        # the CLIP model is only needed for STAGE 3,
+        # so we load it in the background while the scenes are detected and analyzed
+        load_model_future = self.submit_task(index.load_model)
 
-            # update status+progress
-            self.processing_queue.update_queue_item(
-                queue_id=queue_id, status='detecting scenes', progress=progress)
+        def get_stage_progress_callback(status, progress_offset):
+            """
+            This returns the progress callback for one of the 3 indexing stages,
+            each of them taking a third of the total progress, starting from progress_offset
+            """
 
-            return True
+            def stage_progress(**progress_kwargs):
 
-        # STAGE 1 - detect scenes
-        shot_indexes = \
-            index.get_scene_changes(frame_progress_callback=detect_progress, **detection_options)
+                # calculate the current progress in percent based on where we are in the total number of frames
+                # but also divide by 3 because even if the stage is fully done, we're only a third further
+                # (integer math only, since this is called for each frame)
+                # (a missing or zero total_frames counts as 1, so we never divide by zero)
+                current_frame_index = int(progress_kwargs.get('current_frame_index') or 0)
+                total_frames = int(progress_kwargs.get('total_frames') or 0) or 1
+                progress = current_frame_index * 100 // (total_frames * 3) + progress_offset
 
-        def analyze_progress(**progress_kwargs):
+                # cancel indexing if user requested it
+                if cancel_if_canceled(queue_id=queue_id):
+                    return None
 
-            # calculate the current progress in percent based on where we are in the total number of frames
-            # but also divide by 3 and add 33% because even if STAGE 2 is fully done, we're only 66% done
-            progress = int(
-                int(progress_kwargs.get('current_frame_index', 1)) / int(progress_kwargs.get('total_frames', 1))
-                * 100 // 3) + 33
+                # update status+progress
+                update_indexing_progress(status=status, progress=progress)
 
-            # cancel indexing if user requested it
-            if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
-                return None
+                return True
 
-            # update status+progress
-            self.processing_queue.update_queue_item(
-                queue_id=queue_id, status='analyzing scenes', progress=progress)
+            return stage_progress
 
-            return True
+        # STAGE 1 - detect scenes
+        shot_indexes = index.get_scene_changes(
+            frame_progress_callback=get_stage_progress_callback('detecting scenes', 0), **detection_options)
 
         # STAGE 2 - analyze and filter scenes
-        detected_shots = \
-            index.analyze_neighbor_shots(shot_indexes, path=video_file_path, frame_progress_callback=analyze_progress)
+        detected_shots = index.analyze_neighbor_shots(
+            shot_indexes, path=video_file_path,
+            frame_progress_callback=get_stage_progress_callback('analyzing scenes', 33))
 
         # unpack the detected_shots if it's a tuple
         if isinstance(detected_shots, tuple) and len(detected_shots) == 2:
@@ -2772,38 +4092,25 @@ class ToolkitOps:
             self.processing_queue.cancel_item(queue_id=queue_id)
             return None
 
-        def index_progress(**progress_kwargs):
-
-            # calculate the current progress in percent based on where we are in the total number of frames
-            # but also divide by 3 and add 33% because even if STAGE 2 is fully done, we're only 66% done
-            progress = int(
-                int(progress_kwargs.get('current_frame_index', 1)) / int(progress_kwargs.get('total_frames', 1))
-                * 100 // 3) + 66
-
-            # cancel indexing if user requested it
-            if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
-                return None
-
-            # update status+progress
-            self.processing_queue.update_queue_item(
-                queue_id=queue_id, status='indexing', progress=progress)
-
-            return True
+        # make sure the CLIP model finished loading before STAGE 3
+        # (this also raises any exception that occurred while loading it)
+        load_model_future.result()
 
         # STAGE 3 - index the video
         # index the video and return None if something went wrong
         # if not index.index_video(path=video_file_path, frame_progress_callback=frame_progress_callback,  **kwargs):
         if not index.index_video(
                 path=video_file_path, detected_shots=detected_shots,
-                skip_empty=2, frame_progress_callback=index_progress, **indexing_options):
+                skip_empty=2, frame_progress_callback=get_stage_progress_callback('indexing', 66),
+                **indexing_options):
             return None
 
         # cancel indexing if user requested it
-        if self.processing_queue.cancel_if_canceled(queue_id=kwargs.get('queue_id', None)):
+        if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
             return None
 
         # update status
-        self.processing_queue.update_status(queue_id=kwargs.get('queue_id', None), status='saving index')
+        self.processing_queue.update_status(queue_id=queue_id, status='saving index')
 
         # save the embeddings to disk
         embedding_paths = index.save_embeddings()
@@ -2812,7 +4119,7 @@ class ToolkitOps:
         if not embedding_paths or not isinstance(embedding_paths, tuple) or len(embedding_paths) != 2:
             logger.error('Indexing failed - embedding paths not received.')
             self.processing_queue.update_status(
-                queue_id=kwargs.get('queue_id', None),
+                queue_id=queue_id,
                 status='failed',
                 fail_error='Embedding paths not received. See app.log for possible details.'
             )
@@ -2825,21 +4132,34 @@ class ToolkitOps:
         # this should be the case if the user transcribed and translated the video before indexing it
         # therefore creating more than one transcription file
         if kwargs.get('transcription_file_paths', None):
+
+            # we notify the project observers only once, after all the transcriptions were processed
+            project_changed = False
+
             for transcription_file_path in kwargs.get('transcription_file_paths', []):
 
                 # add the video index paths to the transcription and get the transcription object
+                # (no need to save it right away, since the metadata processing below saves it immediately)
                 self.add_video_index_paths_to_transcription(
-                    transcription_file_path=transcription_file_path, video_index_path=numpy_file_path
+                    transcription_file_path=transcription_file_path, video_index_path=numpy_file_path,
+                    save_sec=1
                 )
 
                 # add metadata, but use the path instead of the transcription object
-                self.process_transcription_metadata(other_options=kwargs, transcription=transcription_file_path)
+                project_changed = self.process_transcription_metadata(
+                    other_options=kwargs, transcription=transcription_file_path, notify_project_changed=False
+                ) or project_changed
+
+            if project_changed:
+                self.notify_observers('project_changed')
 
         # otherwise, if 'transcription_file_path' exists in the transcription object,
         # add the metadata path to that transcription
         elif transcription is not None and transcription.transcription_file_path is not None:
+            # (no need to save it right away, since the metadata processing below saves it immediately)
             transcription = self.add_video_index_paths_to_transcription(
-                transcription_file_path=transcription_file_path, video_index_path=numpy_file_path
+                transcription_file_path=transcription_file_path, video_index_path=numpy_file_path,
+                save_sec=1
             )
 
             # add metadata
@@ -2855,16 +4175,17 @@ class ToolkitOps:
             TranscriptionUtils.delete_render_json(render_json_file_path=render_json_file_path)
 
         # update status
-        self.processing_queue.update_status(queue_id=kwargs.get('queue_id', None), status='done')
+        self.processing_queue.update_status(queue_id=queue_id, status='done')
 
         return True
 
     @staticmethod
-    def add_video_index_paths_to_transcription(transcription_file_path, video_index_path):
+    def add_video_index_paths_to_transcription(transcription_file_path, video_index_path, save_sec=0):
         """
         This adds the video index path (numpy_file_path) to said transcription file
         :param transcription_file_path: the path to the transcription file
         :param video_index_path: the path to the video index file
+        :param save_sec: how soon to save the transcription (see Transcription.save_soon)
         :return: the transcription object
         """
 
@@ -2874,7 +4195,7 @@ class ToolkitOps:
         transcription.set('video_index_path', os.path.basename(video_index_path))
 
         # save the transcription
-        transcription.save_soon(sec=0)
+        transcription.save_soon(sec=save_sec)
 
         return transcription
 
@@ -2936,6 +4257,12 @@ class ToolkitOps:
         NLE.resolve = None
         NLE.reset_all()
 
+        # and make sure that the next poll updates the NLE data again
+        self.resolve_data_last_polled = None
+
+        # wake up the polling thread, so that it stops right away
+        self.wake_resolve_polling()
+
         # notify observers that the NLE has been reset
         self.notify_observers('update_NLE_status')
 
@@ -2957,26 +4284,54 @@ class ToolkitOps:
             # with this, resolve should be constantly polled for data
             self.poll_resolve_thread()
 
-    def calculate_sec_to_resolve_timecode(self, seconds=0):
+        # if the polling thread is waiting, make it poll right away
+        else:
+            self.wake_resolve_polling()
 
-        if NLE.resolve:
+    def wake_resolve_polling(self):
+        """
+        This makes the polling thread poll Resolve right away, if it's waiting for the next poll
+        (for e.g. after we changed something in Resolve, so that the NLE data gets updated without delay)
+        """
 
-            # poll resolve for some info
-            # @todo avoid polling resolve for this info and use the existing current_timeline_fps
-            #   and current_timeline_startTC
-            resolve_data = self.resolve_api.get_resolve_data()
+        self.resolve_poll_wakeup.set()
 
-            # get the framerate of the current timeline
-            timeline_fps = resolve_data['currentTimelineFPS']
+    def get_resolve_timeline_timecode_data(self):
+        """
+        Returns the framerate and start timecode of the current Resolve timeline.
+        These are kept up to date by the polling thread, so we only poll Resolve directly if we don't have them yet.
+        :return: (timeline_fps, timeline_start_tc) - any of them can be None
+        """
+
+        timeline_fps = NLE.current_timeline_fps
+        timeline_start_tc = NLE.current_start_tc
+
+        # only ask Resolve if the polling thread hasn't stored the data yet
+        if timeline_fps is None or timeline_start_tc is None:
+
+            resolve_data = self.resolve_api.get_resolve_data(with_bin_clips=False, with_render_presets=False) or {}
 
             if timeline_fps is None:
-                return False
+                timeline_fps = resolve_data.get('currentTimelineFPS', None)
 
-            # get the start timecode of the current timeline
-            timeline_start_tc = resolve_data['currentTimeline']['startTC']
+            if timeline_start_tc is None and isinstance(resolve_data.get('currentTimeline', None), dict):
+                timeline_start_tc = resolve_data['currentTimeline'].get('startTC', None)
+
+        return timeline_fps, timeline_start_tc
+
+    def calculate_sec_to_resolve_timecode(self, seconds=0):
+
+        if NLE.resolve:
+
+            # get the framerate and the start timecode of the current timeline
+            timeline_fps, timeline_start_tc = self.get_resolve_timeline_timecode_data()
+
+            if timeline_fps is None or timeline_start_tc is None:
+                return False
 
-            # initialize the timecode object for the start tc
-            timeline_start_tc = Timecode(timeline_fps, start_timecode=timeline_start_tc)
+            # get the timecode object for the start tc
+            # (cached, since the start tc of the timeline rarely changes)
+            timeline_start_tc = get_cached_timecode(timeline_fps, start_timecode=timeline_start_tc)
 
             # only do timecode math if seconds > 0
             if seconds > 0:
@@ -3009,15 +4364,13 @@ class ToolkitOps:
 
         if NLE.resolve:
 
-            # poll resolve for some info
-            # @todo avoid polling resolve for this info and use the existing current_timeline_fps
-            #   and current_timeline_startTC
-            resolve_data = self.resolve_api.get_resolve_data()
+            # get the framerate and the start timecode of the current timeline
+            resolve_timeline_fps, resolve_timeline_start_tc = self.get_resolve_timeline_timecode_data()
 
             # get the framerate of the current timeline
             # either from Resolve...
-            if 'currentTimelineFPS' in resolve_data:
-                timeline_fps = resolve_data['currentTimelineFPS']
+            if resolve_timeline_fps is not None:
+                timeline_fps = resolve_timeline_fps
             # ...from the passed framerate
             elif framerate is not None:
                 timeline_fps = framerate
@@ -3027,15 +4380,16 @@ class ToolkitOps:
                 return None
 
             # get the start timecode of the current timeline
-            if 'currentTimeline' in resolve_data and 'startTC' in resolve_data['currentTimeline']:
-                timeline_start_tc = resolve_data['currentTimeline']['startTC']
+            if resolve_timeline_start_tc is not None:
+                timeline_start_tc = resolve_timeline_start_tc
             elif start_tc is not None:
                 timeline_start_tc = start_tc
             else:
                 timeline_start_tc = '00:00:00:00'
 
-            # initialize the timecode object for the start tc
-            timeline_start_tc = Timecode(timeline_fps, timeline_start_tc)
+            # get the timecode object for the start tc
+            # (cached, since the start tc of the timeline rarely changes)
+            timeline_start_tc = get_cached_timecode(timeline_fps, start_timecode=timeline_start_tc)
 
             # if no timecode was passed, try to get it from the NLE object
             if timecode is None and frames is None:
@@ -3043,7 +4397,7 @@ class ToolkitOps:
 
             # calculate the timecode from the passed frames
             if frames is not None:
-                timecode = Timecode(framerate=timeline_fps, frames=frames)
+                timecode = get_cached_timecode(timeline_fps, frames=frames)
 
             # if we still don't have a timecode, abort and return None
             if timecode is None:
@@ -3051,7 +4405,11 @@ class ToolkitOps:
                 return None
 
             # initialize the timecode object for the passed timecode
-            tc = Timecode(timeline_fps, timecode)
+            # (timecode strings, like the playhead timecode, usually repeat, so we use the cached objects for them)
+            if isinstance(timecode, str):
+                tc = get_cached_timecode(timeline_fps, start_timecode=timecode)
+            else:
+                tc = Timecode(timeline_fps, timecode)
 
             # calculate the difference between the start tc and the passed tc
             tc_diff = tc - timeline_start_tc
@@ -3073,6 +4431,17 @@ class ToolkitOps:
             # move playhead in resolve
             self.resolve_api.set_resolve_tc(str(new_timeline_tc))
 
+            # and get the new playhead position from Resolve right away
+            self.wake_resolve_polling()
+
+    @staticmethod
+    def submit_task(fn, *args, **kwargs):
+        '''
+        This runs a short-lived function in the shared thread pool and returns its future
+        '''
+
+        return TOOLKIT_OPS_EXECUTOR.submit(fn, *args, **kwargs)
+
     def poll_resolve_thread(self):
         '''
         This keeps resolve polling in a separate thread
@@ -3084,6 +4453,8 @@ class ToolkitOps:
             return
 
         # wrap poll_resolve_data into a thread
+        # (this one doesn't go into the shared thread pool since it polls for as long as the app is running,
+        # and the pool's workers would keep the app from exiting)
         poll_resolve_thread = Thread(target=self.poll_resolve_data)
 
         # stop the thread when the main thread stops
@@ -3103,9 +4474,20 @@ class ToolkitOps:
             logger.debug('Resolve polling thread already running')
             return
 
+        # how long to wait until the next poll (in seconds)
+        polling_wait = 0
+
         # do this continuously
         while True:
 
+            # wait until it's time to poll again, or until something wakes us up (see resolve_enable/resolve_disable)
+            # (all the paths through the loop below set the polling_wait for the next poll)
+            if self.resolve_poll_wakeup.wait(timeout=polling_wait):
+                self.resolve_poll_wakeup.clear()
+
+            # if a check below fails and skips the rest of the loop, don't retry it right away
+            polling_wait = 0.5
+
             # keep updating the resolve_poll_num
             NLE.resolve_poll_num += 1
 
@@ -3139,185 +4521,24 @@ class ToolkitOps:
                         return None
 
                     # actual polling happens here
-                    resolve_data = self.resolve_api.get_resolve_data(silent=True)
-
-                    # for all the NLE variables related with resolve data,
-                    #  check if the data has changed and if so, update the NLE variable
-                    #  but if the polled data does not contain the key, also set the NLE variable to None
-                    #  also, if the global variable is not None and the polled data doesn't contain the key,
-                    #  set the global variable to None
-                    # also, make sure you notify the relevant observers that the data has changed
-
-                    # RESOLVE OBJECT CHANGE
-                    # if the resolve object has changed (for eg. from None to an object)
-                    try:
-                        if type(NLE.resolve) != type(resolve_data['resolve']):
-
-                            logger.debug('Resolve object changed from {} to {}.'
-                                         .format(type(NLE.resolve), type(resolve_data['resolve'])))
-
-                            # set the resolve object to whatever it is now
-                            NLE.resolve = resolve_data['resolve']
-
-                            # notify the observers that the resolve object has changed
-                            self.notify_observers('update_NLE_status')
-                            self.notify_observers('update_all_transcriptions')
-
-                            # if the resolve object is now None,
-                            # reset all and skip the rest of the polling
-                            if NLE.resolve is None:
-                                self.notify_observers('NLE_project_changed')
-                                self.notify_observers('NLE_timeline_changed')
-
-                                NLE.reset_all()
-                    except:
-                        import traceback
-                        logger.debug('Fail detected in resolve object change check.')
-                        logger.debug(traceback.format_exc())
-                        continue
-
-                    # RESOLVE TIMELINE NAME CHANGE
-                    # if the current project was already set and now it's no longer set in the polled data
-                    # or if the current project has changed
-                    try:
-                        if (NLE.current_project is not None and 'currentProject' not in resolve_data) \
-                                or NLE.current_project != resolve_data['currentProject']:
-                            # logger.debug('Current project changed from {} to {}.'
-                            #             .format(NLE.current_project, resolve_data['currentProject']))
-
-                            # set the current project to whatever it is now
-                            # but if the polled data doesn't contain the currentProject key, set it to None
-                            NLE.current_project = resolve_data[
-                                'currentProject'] if 'currentProject' in resolve_data else None
-
-                            # notify the observers that the project has changed
-                            self.notify_observers('NLE_project_changed')
-                            self.notify_observers('update_all_transcriptions')
-
-                    except Exception as e:
-                        logger.debug(e)
-                        logger.debug('Fail detected in resolve project change check.', exc_info=True)
-                        continue
-
-                    # if the current timeline was already set and now it's no longer set in the polled data
-                    # or if the current timeline has changed
-                    try:
-                        if (NLE.current_timeline is not None and 'currentTimeline' not in resolve_data) \
-                                or NLE.current_timeline != resolve_data['currentTimeline']:
-
-                            # logger.debug('Current timeline changed from {} to {}.'
-                            #             .format(NLE.current_timeline, resolve_data['currentTimeline']))
-
-                            # because we only want to trigger the timeline_changed event
-                            # if the name of the timeline has changed
-                            # but resolve_data['currentTimeline'] contains the entire timeline object,
-                            # including markers and other data that may have changed,
-                            # we need to focus on the name of the timeline
-
-                            # but first, if the polled data doesn't contain the currentTimeline key
-                            # yet the NLE.current_timeline was set before
-                            if NLE.current_timeline is not None and 'currentTimeline' not in resolve_data:
-
-                                # logger.debug('Current timeline changed from {} to None.'.format(NLE.current_timeline))
-
-                                # set the current timeline to None
-                                NLE.current_timeline = None
-
-                                self.notify_observers('NLE_timeline_changed')
-
-                            # if the polled data contains the currentTimeline key
-                            elif 'currentTimeline' in resolve_data \
-                                    and (type(NLE.current_timeline) != type(resolve_data['currentTimeline']) \
-                                         or ('name' in NLE.current_timeline and not 'name' in resolve_data[
-                                        'currentTimeline']) \
-                                         or ('name' in resolve_data[
-                                        'currentTimeline'] and not 'name' in NLE.current_timeline) \
-                                         or (NLE.current_timeline['name'] != resolve_data['currentTimeline']['name'])):
-
-                                # logger.debug('Current timeline changed from {} to {}.'
-                                #             .format(NLE.current_timeline, resolve_data['currentTimeline']))
-
-                                # set the current timeline to whatever it is now
-                                NLE.current_timeline = resolve_data['currentTimeline'] \
-                                    if 'currentTimeline' in resolve_data else None
-
-                                # and notify the observers that the timeline has changed
-                                self.notify_observers('NLE_timeline_changed')
-                                self.notify_observers('NLE_timecode_data_changed')
-
-                            # if the polled data contains the currentTimeline key,
-                            # but the name of the timeline hasn't changed
-                            else:
-                                # set the current timeline to whatever it is now
-                                # but don't trigger the timeline_changed event
-                                NLE.current_timeline = resolve_data['currentTimeline'] \
-                                    if 'currentTimeline' in resolve_data else None
-
-                    except Exception as e:
-                        logger.debug(e)
-                        logger.debug('Fail detected in resolve timeline change check.', exc_info=True)
-                        continue
-
-                    # did the markers change?
-                    # (this only matters if the current timeline is not None
-                    # and if the current timeline has markers)
-                    if resolve_data is not None and type(resolve_data) is dict \
-                            and 'currentTimeline' in resolve_data \
-                            and type(resolve_data['currentTimeline']) is dict \
-                            and 'markers' in resolve_data['currentTimeline']:
-
-                        # first compare the types
-                        if type(NLE.current_timeline_markers) != type(resolve_data['currentTimeline']['markers']):
-                            # if the types are different, then the markers have changed
-                            self.notify_observers('NLE_markers_changed')
-
-                            NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
-
-                        # also do a key compare only for speed
-                        elif set(NLE.current_timeline_markers.keys()) != set(
-                                resolve_data['currentTimeline']['markers'].keys()):
-                            # if the keys are different, then the markers have changed
-                            self.notify_observers('NLE_markers_changed')
-
-                            NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
-
-                        # but if the marker keys are the same do a deeper compare
-                        elif NLE.current_timeline_markers != resolve_data['currentTimeline']['markers']:
-                            # if the keys are the same, but the values are different, then the markers have changed
-                            self.notify_observers('NLE_markers_changed')
-
-                            NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
-
+                    # (without the bin clips and the render presets, which we don't need here,
+                    # and which would take a few more Resolve API calls for each clip in the bin)
+                    resolve_data = self.resolve_api.get_resolve_data(
+                        silent=True, with_bin_clips=False, with_render_presets=False)
+
+                    # the polled data is usually the same as the last time (for e.g. while nothing happens in Resolve),
+                    # so we compare it field by field to the NLE data only if something changed
+                    # (comparing the whole dict once is much cheaper than all the separate comparisons)
+                    if self._resolve_data_changed(resolve_data, self.resolve_data_last_polled):
+                        self._update_NLE_from_resolve_data(resolve_data)
+                        self.resolve_data_last_polled = resolve_data
+
+                        # poll again soon, since something changed since the last poll
+                        self.resolve_poll_interval = RESOLVE_POLL_MIN_INTERVAL
+
+                    # otherwise wait longer and longer until the next poll
                     else:
-                        NLE.current_timeline_markers = None
-
-                    #  updates the currentBin
-                    if (NLE.current_bin is not None and NLE.current_bin != '' and 'currentBin' not in resolve_data) \
-                            or NLE.current_bin != resolve_data['currentBin']:
-                        NLE.current_bin = resolve_data['currentBin'] if 'currentBin' in resolve_data else ''
-                        self.notify_observers('NLE_bin_changed')
-
-                    # update current playhead timecode
-                    if (NLE.current_tc is not None and 'currentTC' not in resolve_data) \
-                            or NLE.current_tc != resolve_data['currentTC']:
-                        NLE.current_tc = resolve_data['currentTC']
-                        self.notify_observers('NLE_tc_changed')
-
-                    # update current playhead timecode
-                    if (NLE.current_timeline_fps is not None and 'currentTimelineFPS' not in resolve_data) \
-                            or NLE.current_timeline_fps != resolve_data['currentTimelineFPS']:
-                        NLE.current_timeline_fps = resolve_data['currentTimelineFPS']
-                        self.notify_observers('NLE_timecode_data_changed')
-
-                    # update start_tc timecode
-                    if (NLE.current_start_tc is not None
-                        and 'currentTimeline' not in resolve_data
-                        and 'startTC' not in resolve_data['currentTimeline']) \
-                            or (resolve_data['currentTimeline'] is not None \
-                            and NLE.current_start_tc != resolve_data['currentTimeline']['startTC']):
-                        NLE.current_start_tc = \
-                            resolve_data['currentTimeline']['startTC'] if isinstance(resolve_data, dict) else None
-                        self.notify_observers('NLE_timecode_data_changed')
+                        self.resolve_poll_interval = min(self.resolve_poll_interval * 2, RESOLVE_POLL_MAX_INTERVAL)
 
                     # was there a previous error?
                     if NLE.resolve is not None and NLE.resolve_error > 0:
@@ -3340,7 +4561,7 @@ class ToolkitOps:
                     NLE.resolve_error += 1
 
                 # how often do we poll resolve?
-                polling_interval = 500
+                polling_interval = self.resolve_poll_interval * 1000
 
                 # if any errors occurred
                 if NLE.resolve_error:
@@ -3394,11 +4615,164 @@ class ToolkitOps:
                     return False
 
                 # take a short break before continuing the loop
-                time.sleep(polling_interval / 1000)
+                polling_wait = polling_interval / 1000
+
+            # if polling was suspended with NLE.set_suspend_polling(), sleep until it's resumed and poll right away
+            elif not NLE.polling_resumed.is_set():
+                NLE.polling_resumed.wait()
+                polling_wait = 0
 
             else:
                 # take a 0.5-second break before trying this again
-                time.sleep(0.5)
+                polling_wait = 0.5
+
+    @staticmethod
+    def _resolve_data_changed(resolve_data, last_resolve_data) -> bool:
+        """
+        This checks if the polled resolve data changed since the last poll
+        (the resolve object is a new API wrapper on each poll, so we only check if it exists or not)
+        """
+
+        # if the API returned the very same object, we don't even need to compare it
+        if resolve_data is last_resolve_data:
+            return False
+
+        if not isinstance(resolve_data, dict) or not isinstance(last_resolve_data, dict):
+            return resolve_data != last_resolve_data
+
+        if resolve_data.keys() != last_resolve_data.keys():
+            return True
+
+        if (resolve_data.get('resolve', None) is None) != (last_resolve_data.get('resolve', None) is None):
+            return True
+
+        return any(value != last_resolve_data[key] for key, value in resolve_data.items() if key != 'resolve')
+
+    def _update_NLE_from_resolve_data(self, resolve_data):
+        """
+        This updates the NLE data using the data polled from Resolve and notifies the observers about the changes
+        """
+
+        # for all the NLE variables related with resolve data,
+        #  check if the data has changed and if so, update the NLE variable
+        #  but if the polled data does not contain the key, also set the NLE variable to None
+        # also, make sure you notify the relevant observers that the data has changed
+        # (we read the polled data only once here, and the polling loop catches any unexpected data shape)
+        resolve_data = resolve_data if isinstance(resolve_data, dict) else {}
+
+        polled_resolve = resolve_data.get('resolve', None)
+        polled_project = resolve_data.get('currentProject', None)
+        polled_timeline = resolve_data.get('currentTimeline', None)
+        polled_bin = resolve_data.get('currentBin', '')
+        polled_tc = resolve_data.get('currentTC', None)
+        polled_timeline_fps = resolve_data.get('currentTimelineFPS', None)
+
+        polled_timeline_is_dict = isinstance(polled_timeline, dict)
+        polled_timeline_name = polled_timeline.get('name', None) if polled_timeline_is_dict else None
+        polled_start_tc = polled_timeline.get('startTC', None) if polled_timeline_is_dict else None
+
+        # we collect the actions to notify the observers about and notify them only once at the end,
+        # so that, for e.g., a timeline, fps and start_tc change in the same poll
+        # only triggers the NLE_timecode_data_changed observers once
+        # (the dict keeps the actions in the order they were added)
+        actions_to_notify = {}
+
+        # RESOLVE OBJECT CHANGE
+        # if the resolve object has changed (for eg. from None to an object)
+        if (NLE.resolve is None) != (polled_resolve is None):
+
+            logger.debug('Resolve object changed from {} to {}.'
+                         .format(type(NLE.resolve), type(polled_resolve)))
+
+            # set the resolve object to whatever it is now
+            NLE.resolve = polled_resolve
+
+            # notify the observers that the resolve object has changed
+            actions_to_notify['update_NLE_status'] = True
+            actions_to_notify['update_all_transcriptions'] = True
+
+            # if the resolve object is now None, reset all
+            if NLE.resolve is None:
+                actions_to_notify['NLE_project_changed'] = True
+                actions_to_notify['NLE_timeline_changed'] = True
+
+                NLE.reset_all()
+
+        # RESOLVE PROJECT CHANGE
+        if NLE.current_project != polled_project:
+
+            # set the current project to whatever it is now
+            NLE.current_project = polled_project
+
+            # notify the observers that the project has changed
+            actions_to_notify['NLE_project_changed'] = True
+            actions_to_notify['update_all_transcriptions'] = True
+
+        # RESOLVE TIMELINE CHANGE
+        # because we only want to trigger the timeline_changed event
+        # if the name of the timeline has changed
+        # but the polled timeline contains the entire timeline object,
+        # including markers and other data that may have changed,
+        # we need to focus on the name of the timeline
+        # (so we don't deep-compare the whole timeline object, including all its markers, on each poll)
+        current_timeline_is_dict = isinstance(NLE.current_timeline, dict)
+        current_timeline_name = NLE.current_timeline.get('name', None) if current_timeline_is_dict else None
+
+        timeline_changed = current_timeline_is_dict != polled_timeline_is_dict \
+            or current_timeline_name != polled_timeline_name
+
+        # set the current timeline to whatever it is now
+        # (the markers and the other timeline data are checked separately below)
+        NLE.current_timeline = polled_timeline
+
+        # and notify the observers if the timeline has changed
+        if timeline_changed:
+            actions_to_notify['NLE_timeline_changed'] = True
+
+            if 'currentTimeline' in resolve_data:
+                actions_to_notify['NLE_timecode_data_changed'] = True
+
+        # did the markers change?
+        # (this only matters if the current timeline is not None
+        # and if the current timeline has markers)
+        if polled_timeline_is_dict and 'markers' in polled_timeline:
+
+            polled_markers = polled_timeline['markers']
+
+            # (the identity check skips the deep compare of all the markers if it's the same object)
+            if NLE.current_timeline_markers is not polled_markers \
+                    and NLE.current_timeline_markers != polled_markers:
+                actions_to_notify['NLE_markers_changed'] = True
+
+                NLE.current_timeline_markers = polled_markers
+
+        else:
+            NLE.current_timeline_markers = None
+
+        #  updates the currentBin
+        if NLE.current_bin != polled_bin:
+            NLE.current_bin = polled_bin
+            actions_to_notify['NLE_bin_changed'] = True
+
+        # update current playhead timecode
+        if NLE.current_tc != polled_tc:
+            NLE.current_tc = polled_tc
+            actions_to_notify['NLE_tc_changed'] = True
+
+        # update the timeline fps
+        if NLE.current_timeline_fps != polled_timeline_fps:
+            NLE.current_timeline_fps = polled_timeline_fps
+            actions_to_notify['NLE_timecode_data_changed'] = True
+
+        # update start_tc timecode
+        if NLE.current_start_tc != polled_start_tc:
+            NLE.current_start_tc = polled_start_tc
+            actions_to_notify['NLE_timecode_data_changed'] = True
+
+        # now notify the observers about all the changes at once
+        # (each observer is notified only once, even if it observes more than one of the changed actions)
+        if actions_to_notify:
+            self.notify_observers_bulk(actions_to_notify)
 
     def resolve_check_timeline(self, resolve_data, toolkit_UI_obj):
         '''
@@ -3420,8 +4794,23 @@ class ToolkitOps:
     def are_files_in_dir(self, dir, files_present):
         """
         This looks for a list of files in a directory and returns True if they're all present
+
+        If files_present is a set, the files that are found are also removed from it,
+        so that they're not checked again when calling this repeatedly (for e.g. from a Monitor)
         """
-        return all(os.path.exists(os.path.join(dir, file)) for file in files_present)
+
+        if not isinstance(files_present, set):
+            return all(os.path.exists(os.path.join(dir, file)) for file in files_present)
+
+        # stop at the first file that is still missing
+        for file in list(files_present):
+
+            if not os.path.exists(os.path.join(dir, file)):
+                return False
+
+            files_present.discard(file)
+
+        return True
 
     def start_resolve_render_and_monitor(self, monitor_callback: callable = None, **kwargs):
         """
@@ -3477,12 +4866,16 @@ class ToolkitOps:
             logger.error('Cannot monitor render - no files to monitor.')
             return False
 
+        # the files we're still waiting for
+        # (are_files_in_dir removes the files from this set as they appear, so they're not checked again)
+        pending_monitor_file_paths = set(monitor_file_paths)
+
         # add a monitor to check if the render is done
         # don't forget to add the "done" callback outside this function
         # if we haven't added it via monitor_callback already!!
         monitor = Monitor(
             done=monitor_callback,
-            condition=lambda: self.are_files_in_dir(kwargs['target_dir'], monitor_file_paths)
+            condition=lambda: self.are_files_in_dir(kwargs['target_dir'], pending_monitor_file_paths)
         )
 
         # return the files list so we can use them further down the line
@@ -3516,70 +4909,58 @@ class ToolkitOps:
 
             logger.debug("Sending resolve_render command via CLI")
 
-            # instead of py, use the python executable that is running this code to make sure we're in the same env
-            python_executable = sys.executable
-
-            # get the path to the script that is running this code
-            main_script_path = os.path.realpath(sys.argv[0])
-
-            command = [python_executable, main_script_path, '--mode', 'cli',
-                      '--output-dir', '"{}"'.format(target_dir),
-                      '--resolve-render-job', render_job_id,
-                      '--resolve-render-data', '"{}"'.format(json.dumps(render_job_render_data))]
-
             # if we're on Windows and this is a standalone build, we don't need the python executable
             if sys.platform == 'win32' and self.stAI.standalone:
-
-                # remove the python executable from the command
-                command.pop(0)
+                command = [MAIN_SCRIPT_PATH]
 
             elif sys.platform == 'darwin' and self.stAI.standalone:
 
-                # remove the python executable from the command
-                command.pop(0)
-
-                # and replace the main script path with the app bundle path
+                # use the app bundle path instead of the main script path
                 # since sys.argv[0] normally points to the script path (for e.g. __main__.py),
                 # we need to use the ARGVZERO that was hopefully packed in the environment variables while freezing
-                bundle_exec = os.environ.get('ARGVZERO', None)
-                if bundle_exec is None:
+                if ARGVZERO is None:
                     logger.error('Cannot render timeline via CLI - ARGVZERO not available.')
                     return False
 
-                # and then we can get the path to the main script
-                command[0] = bundle_exec
+                command = [ARGVZERO]
+
+            # instead of py, use the python executable that is running this code to make sure we're in the same env
+            else:
+                command = [sys.executable, MAIN_SCRIPT_PATH]
+
+            # Popen passes each argument as it is (without a shell), so they don't need any extra quotes
+            # (the render data is encoded with orjson if it's installed, which also gives us a compact json string)
+            command += ['--mode', 'cli',
+                        '--output-dir', target_dir,
+                        '--resolve-render-job', render_job_id,
+                        '--resolve-render-data',
+                        TranscriptionUtils.encode_json(render_job_render_data).decode('utf-8')]
 
             logger.debug('Executing CLI command {}'.format(' '.join(command)))
 
             # start the render process via CLI
             process = subprocess.Popen(command)
 
-            def check_process(wait_time=2):
+            def check_process(max_wait_time=22):
                 """
                 This function checks if the render command was successful
                 """
-                # wait a bit before checking if the process is still running
-                time.sleep(wait_time)
 
-                check_times = 0
-
-                # if the process is still running, check again after a bit
-                while process.poll() is None and check_times < 10:
-                    time.sleep(wait_time)
-                    check_times += 1
+                # wait for the process to exit (without polling it),
+                # but only for a while, since the render might take much longer
+                try:
+                    exit_code = process.wait(timeout=max_wait_time)
 
-                if check_times >= 10:
+                except subprocess.TimeoutExpired:
                     logger.info("CLI subprocess is still running after {} seconds. Assuming render is running. "
-                                "Aborting check function to save resources.".format(wait_time * check_times))
+                                "Aborting check function to save resources.".format(max_wait_time))
+                    return
 
-                # check one more time if the process is still running
-                exit_code = process.poll()
-                if exit_code != 0 and exit_code is not None:
+                if exit_code != 0:
                     logger.error(f"CLI subprocess exited with error code {exit_code}")
 
-            # Start the subprocess check in a separate thread
-            thread = Thread(target=check_process)
-            thread.start()
+            # run the subprocess check in the shared thread pool
+            self.submit_task(check_process)
 
             # return the render job info
             return render_job_info
@@ -3632,10 +5013,15 @@ class ToolkitOps:
             # execute operation without asking for any prompts
             # this will delete the existing clip/timeline destination markers,
             # but the user can undo the operation from Resolve
-            return self.resolve_api.copy_markers(source, destination,
-                                                 resolve_data['currentTimeline']['name'],
-                                                 resolve_data['currentTimeline']['name'],
-                                                 True)
+            copy_result = self.resolve_api.copy_markers(source, destination,
+                                                        resolve_data['currentTimeline']['name'],
+                                                        resolve_data['currentTimeline']['name'],
+                                                        True)
+
+            # poll Resolve right away to get the new markers
+            self.wake_resolve_polling()
+
+            return copy_result
 
         # render marker operation
         elif operation == 'render_markers_to_stills' or operation == 'render_markers_to_clips':
@@ -3650,8 +5036,7 @@ class ToolkitOps:
                 # take each marker from timeline and get its color
                 # but also add a an empty string to the list to allow the user to render all markers
                 current_timeline_marker_colors = [' '] + sorted(
-                    list(set([NLE.current_timeline['markers'][marker]['color']
-                              for marker in NLE.current_timeline['markers']])))
+                    {marker['color'] for marker in NLE.current_timeline['markers'].values()})
 
             # if no markers exist, cancel operation and let the user know that there are no markers to render
             marker_color = None
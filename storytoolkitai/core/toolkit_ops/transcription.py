@@ -1,4 +1,5 @@
 import copy
+import itertools
 import os
 import codecs
 import json
@@ -10,8 +11,10 @@ import time
 from datetime import datetime
 import re
 import yaml
-from threading import Timer
+from threading import Timer, get_ident
+from operator import itemgetter, attrgetter
 
+import numpy as np
 from timecode import Timecode
 
 from storytoolkitai.core.logger import logger
@@ -19,6 +22,12 @@ from storytoolkitai.core.toolkit_ops.timecode import sec_to_tc
 
 from storytoolkitai import USER_DATA_PATH
 
+# orjson is much faster than the json module when encoding the transcription files, so we use it if it's installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Transcription:
 
@@ -68,6 +77,10 @@ class Transcription:
         self._segments = []
         self._segment_ids = {}
 
+        # the start and end times of the segments as numpy arrays (see get_segment_time_arrays)
+        self._segment_time_arrays = None
+        self._segment_starts_sorted = False
+
         self._text = None
 
         # the transcript groups are used to group segments together by time intervals
@@ -279,6 +292,9 @@ class Transcription:
     def set_dirty(self, value=True):
         self._dirty = value
 
+        # the segments might have changed, so the segment time arrays need to be re-calculated
+        self._segment_time_arrays = None
+
     def set(self, key: str or dict, value=None):
         """
         We use this to set some of the attributes of the transcription.
@@ -408,6 +424,12 @@ class Transcription:
 
     @staticmethod
     def get_transcription_path_id(transcription_file_path):
+        """
+        This returns the id that we use for the transcription file path,
+        which is the same for all the ways of writing the same path (relative, absolute etc.),
+        so that all of them get the same Transcription instance (see __new__)
+        """
+        transcription_file_path = os.path.normcase(os.path.abspath(transcription_file_path))
         return hashlib.md5(transcription_file_path.encode('utf-8')).hexdigest()
 
     def generate_id(self):
@@ -440,12 +462,9 @@ class Transcription:
 
                 logger.debug("Loading transcription file {}".format(self.__transcription_file_path))
 
-                with codecs.open(self.__transcription_file_path, 'r', 'utf-8-sig') as json_file:
-                    self._data = json.load(json_file)
-
-                    # let's make a deep copy of the data
-                    # so that we can manipulate it without changing the original data
-                    self._data = copy.deepcopy(self._data)
+                # (the freshly decoded data isn't shared with anything, so we don't need to copy it)
+                with open(self.__transcription_file_path, 'rb') as json_file:
+                    self._data = TranscriptionUtils.decode_json(json_file.read())
 
             # in case we get JSONDecodeError, we assume that the file is not a valid JSON file
             except json.decoder.JSONDecodeError:
@@ -597,6 +616,9 @@ class Transcription:
         if segments is not None:
             self._segments = segments
 
+        # the segment time arrays will need to be re-calculated
+        self._segment_time_arrays = None
+
         # if we have segments, make sure that they're all objects
         for index, segment in enumerate(self._segments):
 
@@ -623,6 +645,28 @@ class Transcription:
         # re-calculate if it's valid
         self._is_valid_transcription_data()
 
+    def get_segment_time_arrays(self):
+        """
+        This returns the start and end times of the segments as two numpy arrays (in the same order as the segments)
+        so that we can search segments by time without looping through all the segment objects.
+        The arrays are cached until the segments change.
+        """
+
+        if self._segment_time_arrays is None:
+            self._segment_time_arrays = (
+                np.fromiter((float(segment.start) for segment in self._segments),
+                            dtype=np.float64, count=len(self._segments)),
+                np.fromiter((float(segment.end) for segment in self._segments),
+                            dtype=np.float64, count=len(self._segments))
+            )
+
+            # the segments are usually sorted by start time (see _set_segments),
+            # but not if they were added without re-setting them, so we need to check before using binary searches
+            self._segment_starts_sorted = bool(np.all(self._segment_time_arrays[0][1:]
+                                                      >= self._segment_time_arrays[0][:-1]))
+
+        return self._segment_time_arrays
+
     def get_segments(self):
         """
         This returns the segments in the transcription
@@ -753,18 +797,52 @@ class Transcription:
                     # and therefore it will be deleted
                     return True
 
-        # create new segments list that doesn't contain
-        # the segments that start or end between the specified interval
-        self._segments = \
-            [segment for segment in self._segments
-             if not ((start <= segment.start <= end or start <= segment.end <= end) and additional_condition(segment))]
+        # find the segments that start or end between the specified interval
+        segment_starts, segment_ends = self.get_segment_time_arrays()
+
+        # if the segments are sorted by start time,
+        # the ones that start within the interval are found with a binary search,
+        # and only the segments that start before the interval need to be checked for their end time
+        if self._segment_starts_sorted:
+            first_index = int(np.searchsorted(segment_starts, start, side='left'))
+            last_index = int(np.searchsorted(segment_starts, end, side='right'))
+
+            in_interval_indexes = itertools.chain(
+                np.flatnonzero((segment_ends[:first_index] >= start) & (segment_ends[:first_index] <= end)).tolist(),
+                range(first_index, last_index)
+            )
+
+        else:
+            in_interval_indexes = np.flatnonzero(
+                ((segment_starts >= start) & (segment_starts <= end))
+                | ((segment_ends >= start) & (segment_ends <= end))
+            ).tolist()
+
+        # and only check the additional condition for those
+        segment_indexes_to_delete = [index for index in in_interval_indexes
+                                     if additional_condition(self._segments[index])]
+
+        # set the dirty flag anyway
+        self.set_dirty()
+
+        # if there's nothing to delete, the segments (and their time arrays) stay as they are
+        if not segment_indexes_to_delete:
+            self._segment_time_arrays = (segment_starts, segment_ends)
+            return True
+
+        # create new segments list that doesn't contain the segments we need to delete
+        keep_segments = np.ones(len(self._segments), dtype=bool)
+        keep_segments[segment_indexes_to_delete] = False
+
+        self._segments = list(itertools.compress(self._segments, keep_segments))
 
         # reset the segments if not mentioned otherwise
         if reset_segments:
             self._set_segments()
 
-        # set the dirty flag anyway
-        self.set_dirty()
+        # otherwise, the order of the remaining segments didn't change, so we can keep their time arrays
+        else:
+            self._segment_time_arrays = (segment_starts[keep_segments], segment_ends[keep_segments])
 
         return True
 
@@ -1050,7 +1128,8 @@ class Transcription:
         transcription_dict = self.to_dict()
 
         # calculate the hash (also sort the keys to make sure the hash is consistent)
-        self._last_hash = hashlib.md5(json.dumps(transcription_dict, sort_keys=True).encode('utf-8')).hexdigest()
+        self._last_hash = hashlib.md5(
+            TranscriptionUtils.encode_json(transcription_dict, sort_keys=True)).hexdigest()
 
         return self._last_hash
 
@@ -1093,35 +1172,36 @@ class Transcription:
         if len(time_intervals) == 0:
             return []
 
-        # take all time intervals and check if they overlap with any of the segments
+        # take all time intervals and check if they contain any of the segments
         # if they do, add the segment to the list of segments to return
         segments_to_return = []
 
         # first sort the time intervals by start time
-        time_intervals = sorted(time_intervals, key=lambda x: x['start'])
+        time_intervals = sorted(time_intervals, key=itemgetter('start'))
 
-        # then sort the segments by start time
-        segments = sorted(self._segments, key=lambda x: x.start)
+        # then sort the segment times by start time (stable, so segments with the same start keep their order)
+        segment_starts, segment_ends = self.get_segment_time_arrays()
+        sorted_segment_indexes = np.argsort(segment_starts, kind='stable')
+        sorted_segment_starts = segment_starts[sorted_segment_indexes]
 
-        # now take all the time intervals and check if they overlap with any of the segments
+        # now take all the time intervals and check which segments they contain
         for current_time_interval in time_intervals:
 
             current_time_interval['start'] = float(current_time_interval['start'])
             current_time_interval['end'] = float(current_time_interval['end'])
 
-            # test this time interval against all segments
-            for current_segment in segments:
-
-                # if the current time interval overlaps with the current segment, add it to the list of segments
-                if current_segment.start >= current_time_interval['start'] \
-                        and current_segment.end <= current_time_interval['end']:
-
-                    segments_to_return.append(current_segment)
-
-                # otherwise, if the current segment is after the current time interval, break
-                # this only works if the segments and time intervals have been sorted
-                elif current_segment.end > current_time_interval['end']:
-                    break
+            # the segments that start within this time interval
+            # (we can use a binary search, since the segment starts are sorted)
+            candidate_indexes = sorted_segment_indexes[
+                np.searchsorted(sorted_segment_starts, current_time_interval['start'], side='left'):
+                np.searchsorted(sorted_segment_starts, current_time_interval['end'], side='right')
+            ]
+
+            # but only add the ones that also end within this time interval
+            segments_to_return.extend(
+                self._segments[index]
+                for index in candidate_indexes[segment_ends[candidate_indexes] <= current_time_interval['end']]
+            )
 
         return segments_to_return
 
@@ -1156,7 +1236,7 @@ class Transcription:
         segments = segments_unique
 
         # sort the segments by start time
-        segments = sorted(segments, key=lambda x: x.start)
+        segments = sorted(segments, key=attrgetter('start'))
 
         # loop through the segments
         for current_segment in segments:
@@ -1877,6 +1957,9 @@ if not os.path.exists(example_template_path):
     logger.debug('Copied example transcription export template to {}'
                  .format(example_template_path))
 
+# this is where we cache the transcription results, so that we don't transcribe the same audio twice
+TRANSCRIPTION_CACHE_PATH = os.path.join(USER_DATA_PATH, 'cache', 'transcriptions')
+
 
 class TranscriptionUtils:
 
@@ -2063,16 +2146,79 @@ class TranscriptionUtils:
                 logger.debug('Copied transcription file to backup: {}'.format(backup_transcription_file_path))
 
         # encode the transcription json (do this before writing to the file, to make sure it's valid)
-        transcription_json_encoded = json.dumps(transcription_data, indent=4)
+        transcription_json_encoded = TranscriptionUtils.encode_json(transcription_data, indent=True)
+
+        # write the transcription json to a temporary file next to the transcription file and then replace it,
+        # so that the transcription file is never left half-written
+        # (for e.g. if a delayed save and an immediate save run at the same time, or if the app crashes while saving)
+        # (the temporary file name is unique for each thread, so two saves never write to the same one)
+        temp_file_path = '{}.{}.tmp'.format(transcription_file_path, get_ident())
+
+        try:
+            with open(temp_file_path, 'wb') as outfile:
+                outfile.write(transcription_json_encoded)
+
+            os.replace(temp_file_path, transcription_file_path)
+
+        except OSError:
+            logger.error('Cannot save transcription to file: {}'.format(transcription_file_path), exc_info=True)
 
-        # write the transcription json to the file
-        with open(transcription_file_path, 'w', encoding='utf-8') as outfile:
-            outfile.write(transcription_json_encoded)
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+            return False
 
         logger.debug('Saved transcription to file: {}'.format(transcription_file_path))
 
         return transcription_file_path
 
+    @staticmethod
+    def encode_json(data, indent=False, sort_keys=False) -> bytes:
+        """
+        This encodes the data to UTF-8 json bytes using orjson if it's installed, or the json module otherwise.
+        """
+
+        if orjson is not None:
+
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+
+            try:
+                return orjson.dumps(data, option=option)
+
+            # orjson is stricter than the json module (for e.g. with integers over 64 bits),
+            # so let the json module handle whatever orjson can't
+            except orjson.JSONEncodeError:
+                logger.debug('orjson cannot encode the data, falling back to the json module.', exc_info=True)
+
+        return json.dumps(data, indent=4 if indent else None, sort_keys=sort_keys).encode('utf-8')
+
+    @staticmethod
+    def decode_json(data: bytes):
+        """
+        This decodes UTF-8 json bytes (with or without a BOM) using orjson if it's installed,
+        or the json module otherwise.
+        Both raise a json.JSONDecodeError if the data isn't valid json.
+        """
+
+        # remove the BOM, if any (orjson doesn't accept it)
+        if data.startswith(codecs.BOM_UTF8):
+            data = data[len(codecs.BOM_UTF8):]
+
+        if orjson is not None:
+            try:
+                return orjson.loads(data)
+
+            # orjson is stricter than the json module (for e.g. it doesn't accept the NaN and Infinity values
+            # that json.dumps writes by default), so let the json module try whatever orjson can't decode
+            except orjson.JSONDecodeError:
+                logger.debug('orjson cannot decode the data, falling back to the json module.', exc_info=True)
+
+        return json.loads(data)
+
     @staticmethod
     def add_count_to_transcription_path(transcription_file_path, target_dir=None):
         """
@@ -2784,3 +2930,91 @@ class TranscriptionUtils:
         export_templates_list = [f for f in os.listdir(export_templates_path) if f.endswith('.yaml')]
 
         return export_templates_list
+
+    @staticmethod
+    def get_file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Returns the SHA-256 hash of the contents of a file (read in chunks, to keep the memory usage low)
+        """
+
+        file_hash = hashlib.sha256()
+
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                file_hash.update(chunk)
+
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def get_cached_transcription_result(cache_key: str) -> dict or None:
+        """
+        Returns the cached transcription result for the cache key, or None if it's not in the cache
+        """
+
+        cache_file_path = os.path.join(TRANSCRIPTION_CACHE_PATH, '{}.json'.format(cache_key))
+
+        if not os.path.isfile(cache_file_path):
+            return None
+
+        try:
+            with open(cache_file_path, 'rb') as cache_file:
+                result = TranscriptionUtils.decode_json(cache_file.read())
+
+        except (OSError, ValueError):
+            logger.debug('Cannot read cached transcription result {}.'.format(cache_file_path), exc_info=True)
+            return None
+
+        if not isinstance(result, dict) or not isinstance(result.get('segments', None), list):
+            return None
+
+        # mark the result as recently used, so that it's the last one to be removed when the cache is full
+        try:
+            os.utime(cache_file_path)
+        except OSError:
+            pass
+
+        return result
+
+    @staticmethod
+    def cache_transcription_result(cache_key: str, result: dict, max_cache_size_mb: float = 1024) -> bool:
+        """
+        Saves the transcription result in the cache
+        and removes the least recently used results if the cache is larger than max_cache_size_mb
+        """
+
+        cache_file_path = os.path.join(TRANSCRIPTION_CACHE_PATH, '{}.json'.format(cache_key))
+
+        try:
+            os.makedirs(TRANSCRIPTION_CACHE_PATH, exist_ok=True)
+
+            # write to a temporary file first, so that we never leave a partially written result in the cache
+            with open(cache_file_path + '.tmp', 'wb') as cache_file:
+                cache_file.write(TranscriptionUtils.encode_json(result))
+
+            os.replace(cache_file_path + '.tmp', cache_file_path)
+
+        except (OSError, TypeError, ValueError):
+            logger.debug('Cannot cache transcription result to {}.'.format(cache_file_path), exc_info=True)
+            return False
+
+        # remove the least recently used results until the cache fits in max_cache_size_mb
+        try:
+            cache_entries = sorted(
+                [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                 for entry in os.scandir(TRANSCRIPTION_CACHE_PATH) if entry.name.endswith('.json')]
+            )
+
+            cache_size = sum(entry_size for _, entry_size, _ in cache_entries)
+
+            for _, entry_size, entry_path in cache_entries:
+
+                if cache_size <= max_cache_size_mb * 1024 * 1024:
+                    break
+
+                os.remove(entry_path)
+                cache_size -= entry_size
+
+        except OSError:
+            logger.debug('Cannot clean up the transcription cache.', exc_info=True)
+
+        return True
@@ -0,0 +1,300 @@
+# this module wraps the faster-whisper (CTranslate2) backend for StoryToolkitAI
+# so that it can be used as a drop-in replacement for the (mots_)whisper model
+
+from typing import Optional
+import inspect
+
+import numpy as np
+
+# faster-whisper works with 16kHz audio, just like whisper
+SAMPLE_RATE = 16000
+
+import logging
+logger = logging.getLogger('StAI')
+
+# the whisper decoding options that faster-whisper understands, and their faster-whisper names
+DECODE_OPTIONS_MAP = {
+    'language': 'language',
+    'initial_prompt': 'initial_prompt',
+    'beam_size': 'beam_size',
+    'best_of': 'best_of',
+    'patience': 'patience',
+    'temperature': 'temperature',
+    'compression_ratio_threshold': 'compression_ratio_threshold',
+    'logprob_threshold': 'log_prob_threshold',
+    'no_speech_threshold': 'no_speech_threshold',
+    'condition_on_previous_text': 'condition_on_previous_text',
+    'word_timestamps': 'word_timestamps',
+    'prepend_punctuations': 'prepend_punctuations',
+    'append_punctuations': 'append_punctuations',
+}
+
+
+class FasterWhisperModel:
+    """
+    This wraps a faster_whisper.WhisperModel
+    and returns transcription results in the same format as mots_whisper's transcribe()
+    """
+
+    def __init__(self, model_name: str, device='cpu', compute_type: str = None, batch_size: int = 1, **kwargs):
+
+        # import this here, so that faster-whisper remains an optional dependency
+        from faster_whisper import WhisperModel
+
+        # faster-whisper needs the device as a string (cpu or cuda), not as a torch.device object
+        self.device = getattr(device, 'type', str(device))
+
+        # use int8 weights on CPU and int8 weights with float16 activations on CUDA, unless we're told otherwise
+        if compute_type is None:
+            compute_type = 'int8_float16' if self.device == 'cuda' else 'int8'
+
+        self.model_name = model_name
+        self.compute_type = compute_type
+
+        self.model = WhisperModel(model_name, device=self.device, compute_type=compute_type, **kwargs)
+
+        # on how many devices (or with how many workers) CTranslate2 can run transcriptions at the same time
+        # (the transcribe calls need to come from different threads for that)
+        self.num_workers = max(1, kwargs.get('num_workers', 1) or 1)
+
+        # how many chunks of each audio we decode at once
+        self.batch_size = max(1, batch_size or 1)
+
+        # if we're decoding in batches, use the batched pipeline of faster-whisper (if this version has it)
+        # - this splits the audio into speech chunks using its own VAD and decodes the chunks in batches
+        self.batched_model = None
+        if self.batch_size > 1:
+
+            try:
+                from faster_whisper import BatchedInferencePipeline
+
+                self.batched_model = BatchedInferencePipeline(model=self.model)
+
+                # the batched pipeline doesn't accept all the options of the regular one
+                self.batched_model_parameters = inspect.signature(self.batched_model.transcribe).parameters
+
+            except ImportError:
+                logger.warning('This faster-whisper version cannot decode in batches. '
+                               'Please update faster-whisper to use the Whisper batch size setting.')
+
+    @property
+    def can_transcribe_batch(self):
+        """
+        Whether this faster-whisper version can decode chunks from multiple audio arrays at once
+        (only the batched pipelines that accept clip timestamps can do that)
+        """
+        return self.batched_model is not None and 'clip_timestamps' in self.batched_model_parameters
+
+    @staticmethod
+    def _segment_to_dict(segment, segment_id: int, time_offset: float = 0.0):
+        """
+        This re-maps a faster-whisper segment to the whisper segment format
+        and subtracts the time_offset from its start and end times (and from the ones of its words)
+        """
+
+        return {
+            'id': segment_id,
+            'seek': segment.seek,
+            'start': segment.start - time_offset,
+            'end': segment.end - time_offset,
+            'text': segment.text,
+            'tokens': list(segment.tokens),
+            'temperature': getattr(segment, 'temperature', None),
+            'avg_logprob': segment.avg_logprob,
+            'compression_ratio': segment.compression_ratio,
+            'no_speech_prob': segment.no_speech_prob,
+            'words': [
+                {'word': word.word, 'start': word.start - time_offset, 'end': word.end - time_offset,
+                 'probability': word.probability}
+                for word in segment.words
+            ] if segment.words else []
+        }
+
+    @property
+    def is_multilingual(self):
+        return self.model.model.is_multilingual
+
+    def _get_options(self, decode_options: dict, batched=False):
+        """
+        This returns the decoding options in the format that faster-whisper understands
+        """
+
+        # only pass the options that faster-whisper knows
+        options = {DECODE_OPTIONS_MAP[key]: value for key, value in decode_options.items()
+                   if key in DECODE_OPTIONS_MAP and value is not None}
+
+        # faster-whisper expects a list of temperatures for the fallback
+        if isinstance(options.get('temperature', None), (int, float)):
+            options['temperature'] = [options['temperature']]
+
+        # the batched pipeline doesn't accept all the options of the regular one
+        if batched:
+            options = {key: value for key, value in options.items() if key in self.batched_model_parameters}
+
+        return options
+
+    def transcribe(
+            self,
+            audio: np.ndarray,
+            *,
+            task: str = 'transcribe',
+            verbose: Optional[bool] = None,
+
+            # StoryToolkitAI additions
+            queue_id: Optional[str] = None,
+            toolkit_ops_obj: object = None,
+            audio_segment_duration: int = None,
+            total_duration: int = None,
+            previous_progress: int = 0,
+            # end StoryToolkitAI additions
+
+            **decode_options
+    ):
+        """
+        Transcribe an audio array using faster-whisper
+
+        This accepts the same StoryToolkitAI additions as mots_whisper's transcribe()
+        and returns a dict with the resulting "text", "segments" and "language"
+        """
+
+        options = self._get_options(decode_options, batched=self.batched_model is not None)
+
+        # decode the speech chunks of the audio in batches, if we can
+        if self.batched_model is not None:
+            segments_generator, info = self.batched_model.transcribe(
+                audio, task=task, batch_size=self.batch_size, vad_filter=True, **options)
+
+        else:
+            segments_generator, info = self.model.transcribe(audio, task=task, **options)
+
+        if verbose is not None:
+            logger.info('Detected language: {}'.format(info.language))
+
+        all_segments = []
+
+        # the segments are decoded lazily, as we iterate through the generator
+        for segment in segments_generator:
+
+            # gracefully cancel if the queue item has been canceled
+            if queue_id is not None \
+                    and toolkit_ops_obj.processing_queue.get_status(queue_id=queue_id) \
+                    in [None, False, 'canceling', 'canceled']:
+                return dict(
+                    text=''.join([s['text'] for s in all_segments]),
+                    segments=all_segments,
+                    language=info.language,
+                    status='canceled'
+                )
+
+            # re-map the faster-whisper segment to the whisper segment format
+            all_segments.append(self._segment_to_dict(segment, segment_id=len(all_segments)))
+
+            if verbose:
+                print('[{} --> {}] {}'.format(segment.start, segment.end, segment.text))
+
+                # add the text to the queue item variable (to make it available in the UI)
+                if queue_id is not None:
+                    toolkit_ops_obj.processing_queue.update_output(queue_id=queue_id, output=segment.text)
+
+            # calculate the progress
+            progress = min(100, int((segment.end / info.duration) * 100)) if info.duration else 0
+
+            # but if a total duration and an audio segment duration were passed
+            # take that into account
+            if total_duration and audio_segment_duration:
+                progress = previous_progress + int(progress * (audio_segment_duration / total_duration))
+
+            # update the progress in the app
+            if queue_id is not None:
+                toolkit_ops_obj.processing_queue.update_queue_item(queue_id=queue_id,
+                                                                   save_to_file=False, progress=progress)
+
+        return dict(
+            text=''.join([segment['text'] for segment in all_segments]),
+            segments=all_segments,
+            language=info.language,
+        )
+
+    def transcribe_batch(
+            self,
+            audios: list,
+            *,
+            batch_size: int = None,
+            task: str = 'transcribe',
+            verbose: Optional[bool] = None,
+            queue_id: Optional[str] = None,
+            toolkit_ops_obj: object = None,
+            **decode_options
+    ):
+        """
+        Transcribe multiple audio arrays (each up to 30 seconds long) in one batched pipeline call,
+        so that their chunks are decoded together instead of one audio array after the other.
+
+        This returns a list with one result per audio array, in the same format as transcribe()
+        (or None for the audio arrays that weren't transcribed because the queue item was canceled)
+        """
+
+        # if the batched pipeline can't take our own chunks, transcribe the audio arrays one by one
+        if not self.can_transcribe_batch:
+            return [self.transcribe(audio, task=task, verbose=verbose, queue_id=queue_id,
+                                    toolkit_ops_obj=toolkit_ops_obj, **decode_options)
+                    for audio in audios]
+
+        results = [dict(text='', segments=[], language=None) for _ in audios]
+
+        # put all the audio arrays one after the other and use each of them as a clip
+        # (we skip the empty ones, since the pipeline can't decode them)
+        audio_lengths = np.fromiter((len(audio) for audio in audios), dtype=np.int64, count=len(audios))
+        audio_offsets = np.concatenate(([0], np.cumsum(audio_lengths)[:-1])) / SAMPLE_RATE
+
+        clip_indexes = np.flatnonzero(audio_lengths > 0)
+
+        if len(clip_indexes) == 0:
+            return results
+
+        clip_starts = audio_offsets[clip_indexes]
+
+        segments_generator, info = self.batched_model.transcribe(
+            np.concatenate([audios[index] for index in clip_indexes]).astype(np.float32, copy=False),
+            task=task,
+            batch_size=batch_size or self.batch_size,
+            clip_timestamps=[{'start': float(audio_offsets[index]),
+                              'end': float(audio_offsets[index] + audio_lengths[index] / SAMPLE_RATE)}
+                             for index in clip_indexes],
+            **self._get_options(decode_options, batched=True)
+        )
+
+        if verbose is not None:
+            logger.info('Detected language: {}'.format(info.language))
+
+        for segment in segments_generator:
+
+            # gracefully cancel if the queue item has been canceled
+            if queue_id is not None \
+                    and toolkit_ops_obj.processing_queue.get_status(queue_id=queue_id) \
+                    in [None, False, 'canceling', 'canceled']:
+                return [None] * len(audios)
+
+            # find the audio array that this segment came from
+            # (the segment times are relative to the start of all the audio arrays put together)
+            audio_index = clip_indexes[max(0, int(np.searchsorted(clip_starts, segment.start, side='right')) - 1)]
+
+            result = results[audio_index]
+            result['segments'].append(
+                self._segment_to_dict(segment, segment_id=len(result['segments']),
+                                      time_offset=float(audio_offsets[audio_index]))
+            )
+
+            if verbose:
+                print('[{} --> {}] {}'.format(segment.start, segment.end, segment.text))
+
+                # add the text to the queue item variable (to make it available in the UI)
+                if queue_id is not None:
+                    toolkit_ops_obj.processing_queue.update_output(queue_id=queue_id, output=segment.text)
+
+        for result in results:
+            result['text'] = ''.join([segment['text'] for segment in result['segments']])
+            result['language'] = info.language
+
+        return results
+
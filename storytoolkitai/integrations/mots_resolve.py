@@ -359,10 +359,15 @@ class MotsResolve:
 
         return [self.resolve, self.project, self.mediaPool, self.projectManager, self.currentBin, self.currentTimeline]
 
-    def get_resolve_data(self, silent=False):
+    def get_resolve_data(self, silent=False, with_bin_clips=True, with_render_presets=True):
         """
         Returns resolve objects in a nicely formatted dict
 
+        :param silent: if True, don't log the missing Resolve objects
+        :param with_bin_clips: if False, skip getting the clips of the current bin
+                               (this needs a few API calls for each clip, so it's slow on large bins)
+        :param with_render_presets: if False, skip getting the render presets of the current project
+
         :return:
             resolve_data: dict
         """
@@ -390,7 +395,7 @@ class MotsResolve:
                 resolve_data['currentProject'] = project.GetName()
 
                 # add available render presets
-                resolve_data['renderPresets'] = project.GetRenderPresetList()
+                resolve_data['renderPresets'] = project.GetRenderPresetList() if with_render_presets else None
             else:
                 resolve_data['currentProject'] = resolve_data['renderPresets'] = None
 
@@ -404,7 +409,7 @@ class MotsResolve:
                 resolve_data['currentBin'] = currentBin.GetName()
 
                 #check bin clips
-                clips = currentBin.GetClipList()
+                clips = currentBin.GetClipList() if with_bin_clips else None
 
                 if clips:
                     binClips = {}
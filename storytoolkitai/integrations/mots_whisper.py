@@ -3,6 +3,7 @@
 import whisper
 
 import argparse
+import hashlib
 import os
 import traceback
 import warnings
@@ -37,7 +38,7 @@ from whisper.utils import (
 )
 from whisper.model import Whisper, ModelDimensions
 
-from whisper import load_model, available_models, _download, _MODELS
+from whisper import load_model, available_models, _download, _MODELS, _ALIGNMENT_HEADS
 from whisper import audio, decoding, model, normalizers, tokenizer, utils
 from whisper.transcribe import transcribe
 from whisper.version import __version__
@@ -59,6 +60,82 @@ if TYPE_CHECKING:
 import logging
 logger = logging.getLogger('StAI')
 
+
+def _get_checkpoint_file(name: str, download_root: str) -> str:
+    """
+    This returns the path of the model checkpoint and only calls whisper's _download if the file is missing
+    or if its checksum doesn't match.
+    Unlike _download, we hash the existing file in chunks, instead of reading all of it into memory first.
+    """
+
+    expected_sha256 = _MODELS[name].split("/")[-2]
+    checkpoint_file = os.path.join(download_root, os.path.basename(_MODELS[name]))
+
+    if os.path.isfile(checkpoint_file):
+
+        file_hash = hashlib.sha256()
+        with open(checkpoint_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                file_hash.update(chunk)
+
+        if file_hash.hexdigest() == expected_sha256:
+            return checkpoint_file
+
+    return _download(_MODELS[name], download_root, False)
+
+
+def load_model(
+    name: str,
+    device: Optional[Union[str, torch.device]] = None,
+    download_root: str = None,
+    in_memory: bool = False,
+) -> "Whisper":
+    """
+    This replaces whisper.load_model and memory-maps the checkpoint (on PyTorch 2.1+),
+    so that the weights are read straight from the page cache
+    instead of deserializing the whole file into memory before they're copied into the model.
+    """
+
+    # we can't memory-map a checkpoint that's in memory, so let whisper handle that
+    if in_memory:
+        return whisper.load_model(name, device=device, download_root=download_root, in_memory=True)
+
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    if download_root is None:
+        default = os.path.join(os.path.expanduser("~"), ".cache")
+        download_root = os.path.join(os.getenv("XDG_CACHE_HOME", default), "whisper")
+
+    if name in _MODELS:
+        checkpoint_file = _get_checkpoint_file(name, download_root)
+        alignment_heads = _ALIGNMENT_HEADS[name]
+    elif os.path.isfile(name):
+        checkpoint_file = name
+        alignment_heads = None
+    else:
+        raise RuntimeError(
+            f"Model {name} not found; available models = {available_models()}"
+        )
+
+    # the weights are loaded on the CPU and moved to the device together with the model below
+    try:
+        checkpoint = torch.load(checkpoint_file, map_location="cpu", mmap=True, weights_only=True)
+
+    # older PyTorch versions don't support mmap, and legacy (non-zip) checkpoints can't be memory-mapped
+    except (TypeError, RuntimeError):
+        logger.debug('Cannot memory-map {}, loading it the usual way.'.format(checkpoint_file))
+        checkpoint = torch.load(checkpoint_file, map_location="cpu")
+
+    dims = ModelDimensions(**checkpoint["dims"])
+    whisper_model = Whisper(dims)
+    whisper_model.load_state_dict(checkpoint["model_state_dict"])
+    del checkpoint
+
+    if alignment_heads is not None:
+        whisper_model.set_alignment_heads(alignment_heads)
+
+    return whisper_model.to(device)
+
 def transcribe(
     model: "Whisper",
     audio: Union[str, np.ndarray, torch.Tensor],
@@ -182,7 +259,8 @@ def transcribe(
         decode_options["fp16"] = False
 
     # Pad 30-seconds of silence to the input audio, for slicing
-    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    # (the STFT is computed directly on the model's device, so on CUDA we avoid copying each mel segment)
+    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES, device=model.device)
     content_frames = mel.shape[-1] - N_FRAMES
     content_duration = float(content_frames * HOP_LENGTH / SAMPLE_RATE)
 
@@ -303,6 +381,7 @@ def transcribe(
             total=content_frames, unit="frames", disable=verbose is not False
     ) as pbar:
         last_speech_timestamp = 0.0
+        last_progress = None
         # NOTE: This loop is obscurely flattened to make the diff readable.
         # A later commit should turn this into a simpler nested loop.
         # for seek_clip_start, seek_clip_end in seek_clips:
@@ -557,8 +636,8 @@ def transcribe(
             # update progress bar
             pbar.update(min(content_frames, seek) - previous_seek)
 
-            # calculate the progress
-            progress = min(100, int((seek / content_frames) * 100))
+            # calculate the progress (in integer math, since we only report whole percentages anyway)
+            progress = min(content_frames, seek) * 100 // content_frames
 
             # but if a total duration and an audio segment duration were passed
             # take that into account
@@ -571,11 +650,13 @@ def transcribe(
 
                 progress = total_progress
 
-            # update the progress in the app
-            if queue_id is not None:
+            # update the progress in the app (only if it changed)
+            if queue_id is not None and progress != last_progress:
                 toolkit_ops_obj.processing_queue.update_queue_item(queue_id=queue_id,
                                                                    save_to_file=False, progress=progress)
 
+                last_progress = progress
+
     return dict(
         text=tokenizer.decode(all_tokens[len(initial_prompt_tokens) :]),
         segments=all_segments,
@@ -583,4 +664,261 @@ def transcribe(
     )
 
 
+def transcribe_batch(
+    model: "Whisper",
+    audio_chunks: List[np.ndarray],
+    *,
+    batch_size: int = 8,
+    temperature: Union[float, Tuple[float, ...]] = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+    compression_ratio_threshold: Optional[float] = 2.4,
+    logprob_threshold: Optional[float] = -1.0,
+    no_speech_threshold: Optional[float] = 0.6,
+    initial_prompt: Optional[str] = None,
+    word_timestamps: bool = False,
+    prepend_punctuations: str = "\"'“¿([{-",
+    append_punctuations: str = "\"'.。,，!！?？:：”)]}、",
+
+    # StoryToolkitAI additions
+    queue_id: Optional[str] = None,
+    toolkit_ops_obj: object = None,
+    verbose: Optional[bool] = None,
+    # end StoryToolkitAI additions
+
+    **decode_options,
+) -> List[dict]:
+    """
+    Transcribe multiple audio chunks (each up to 30 seconds long) by decoding them in batches (WhisperX-style)
+
+    Unlike transcribe(), each chunk is decoded independently, without conditioning on the previous text,
+    which is what allows us to stack the chunks and send them through the model together.
+
+    Returns a list with a result dictionary for each chunk, in the same format as transcribe()
+    (or None for the chunks that weren't transcribed because the queue item was canceled)
+    """
+
+    dtype = torch.float16 if decode_options.get("fp16", True) else torch.float32
+    if model.device == torch.device("cpu") and dtype == torch.float16:
+        logger.debug("FP16 is not supported on CPU; using FP32 instead")
+        dtype = torch.float32
+
+    if dtype == torch.float32:
+        decode_options["fp16"] = False
+
+    # the chunks need to fit in a single whisper window
+    mels = []
+    num_frames = []
+    for audio_chunk in audio_chunks:
+        mel = log_mel_spectrogram(audio_chunk, model.dims.n_mels, device=model.device)
+        num_frames.append(min(N_FRAMES, mel.shape[-1]))
+        mels.append(pad_or_trim(mel, N_FRAMES))
+
+    results = [None] * len(audio_chunks)
+
+    if not mels:
+        return results
+
+    if decode_options.get("language", None) is None:
+        if not model.is_multilingual:
+            decode_options["language"] = "en"
+        else:
+            # detect the language only on the first chunk, just like transcribe() does for the first 30 seconds
+            _, probs = model.detect_language(mels[0].to(model.device).to(dtype))
+            decode_options["language"] = max(probs, key=probs.get)
+            if verbose is not None:
+                logger.info(f"Detected language: {LANGUAGES[decode_options['language']].title()}")
+
+    language: str = decode_options["language"]
+    task: str = decode_options.get("task", "transcribe")
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task=task,
+    )
+
+    # since there is no previous text, all the chunks get the initial prompt (if any)
+    if initial_prompt is not None:
+        decode_options["prompt"] = tokenizer.encode(" " + initial_prompt.strip())
+    else:
+        decode_options.pop("prompt", None)
+
+    time_precision = exact_div(N_FRAMES, model.dims.n_audio_ctx) * HOP_LENGTH / SAMPLE_RATE
+
+    def needs_fallback(decode_result: DecodingResult) -> bool:
+        if (
+            no_speech_threshold is not None
+            and decode_result.no_speech_prob > no_speech_threshold
+        ):
+            return False  # silence
+        if (
+            compression_ratio_threshold is not None
+            and decode_result.compression_ratio > compression_ratio_threshold
+        ):
+            return True  # too repetitive
+        if (
+            logprob_threshold is not None
+            and decode_result.avg_logprob < logprob_threshold
+        ):
+            return True  # average log probability is too low
+        return False
+
+    def decode_batch_with_fallback(mel_batch: torch.Tensor) -> List[DecodingResult]:
+        temperatures = (
+            [temperature] if isinstance(temperature, (int, float)) else temperature
+        )
+        decode_results = [None] * mel_batch.shape[0]
+
+        # only the chunks that failed are decoded again with the next temperature
+        pending = list(range(mel_batch.shape[0]))
+        for t in temperatures:
+            kwargs = {**decode_options}
+            if t > 0:
+                # disable beam_size and patience when t > 0
+                kwargs.pop("beam_size", None)
+                kwargs.pop("patience", None)
+            else:
+                # disable best_of when t == 0
+                kwargs.pop("best_of", None)
+
+            options = DecodingOptions(**kwargs, temperature=t)
+            still_pending = []
+            for idx, decode_result in zip(pending, model.decode(mel_batch[pending], options)):
+                decode_results[idx] = decode_result
+                if needs_fallback(decode_result):
+                    still_pending.append(idx)
+
+            pending = still_pending
+            if not pending:
+                break
+
+        return decode_results
+
+    def new_segment(*, start: float, end: float, tokens: torch.Tensor, result: DecodingResult):
+        tokens = tokens.tolist()
+        text_tokens = [token for token in tokens if token < tokenizer.eot]
+        return {
+            "seek": 0,
+            "start": start,
+            "end": end,
+            "text": tokenizer.decode(text_tokens),
+            "tokens": tokens,
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob,
+        }
+
+    for batch_start in range(0, len(mels), batch_size):
+
+        # gracefully cancel if the queue item has been canceled
+        if queue_id is not None \
+                and toolkit_ops_obj.processing_queue.get_status(queue_id=queue_id) \
+                in [None, False, 'canceling', 'canceled']:
+            return results
+
+        batch_indexes = list(range(batch_start, min(batch_start + batch_size, len(mels))))
+        mel_batch = torch.stack([mels[idx] for idx in batch_indexes]).to(model.device).to(dtype)
+
+        for idx, result in zip(batch_indexes, decode_batch_with_fallback(mel_batch)):
+
+            segment_duration = num_frames[idx] * HOP_LENGTH / SAMPLE_RATE
+            current_segments = []
+
+            should_skip = no_speech_threshold is not None and result.no_speech_prob > no_speech_threshold
+            if should_skip and logprob_threshold is not None and result.avg_logprob > logprob_threshold:
+                # don't skip if the logprob is high enough, despite the no_speech_prob
+                should_skip = False
+
+            tokens = torch.tensor(result.tokens)
+
+            if not should_skip and len(tokens) > 0:
+                timestamp_tokens: torch.Tensor = tokens.ge(tokenizer.timestamp_begin)
+                single_timestamp_ending = timestamp_tokens[-2:].tolist() == [False, True]
+
+                consecutive = torch.where(timestamp_tokens[:-1] & timestamp_tokens[1:])[0]
+                consecutive.add_(1)
+                if len(consecutive) > 0:
+                    # if the output contains two consecutive timestamp tokens
+                    slices = consecutive.tolist()
+                    if single_timestamp_ending:
+                        slices.append(len(tokens))
+
+                    last_slice = 0
+                    for current_slice in slices:
+                        sliced_tokens = tokens[last_slice:current_slice]
+                        start_timestamp_pos = sliced_tokens[0].item() - tokenizer.timestamp_begin
+                        end_timestamp_pos = sliced_tokens[-1].item() - tokenizer.timestamp_begin
+                        current_segments.append(
+                            new_segment(
+                                start=start_timestamp_pos * time_precision,
+                                end=min(segment_duration, end_timestamp_pos * time_precision),
+                                tokens=sliced_tokens,
+                                result=result,
+                            )
+                        )
+                        last_slice = current_slice
+
+                    # since we can't seek to the unfinished segment like transcribe() does,
+                    # keep it until the end of the chunk
+                    if not single_timestamp_ending and last_slice < len(tokens):
+                        sliced_tokens = tokens[last_slice:]
+                        start_timestamp_pos = sliced_tokens[0].item() - tokenizer.timestamp_begin
+                        current_segments.append(
+                            new_segment(
+                                start=start_timestamp_pos * time_precision,
+                                end=segment_duration,
+                                tokens=sliced_tokens,
+                                result=result,
+                            )
+                        )
+                else:
+                    duration = segment_duration
+                    timestamps = tokens[timestamp_tokens.nonzero().flatten()]
+                    if len(timestamps) > 0 and timestamps[-1].item() != tokenizer.timestamp_begin:
+                        # no consecutive timestamps but it has a timestamp; use the last one.
+                        duration = min(duration, (timestamps[-1].item() - tokenizer.timestamp_begin) * time_precision)
+
+                    current_segments.append(new_segment(start=0.0, end=duration, tokens=tokens, result=result))
+
+            if word_timestamps and current_segments:
+                add_word_timestamps(
+                    segments=current_segments,
+                    model=model,
+                    tokenizer=tokenizer,
+                    mel=mels[idx].to(model.device).to(dtype),
+                    num_frames=num_frames[idx],
+                    prepend_punctuations=prepend_punctuations,
+                    append_punctuations=append_punctuations,
+                    last_speech_timestamp=0.0,
+                )
+
+            # if a segment is instantaneous or does not contain text, clear it
+            for segment in current_segments:
+                if segment["start"] == segment["end"] or segment["text"].strip() == "":
+                    segment["text"] = ""
+                    segment["tokens"] = []
+                    segment["words"] = []
+
+            if verbose:
+                for segment in current_segments:
+                    if not segment["text"]:
+                        continue
+
+                    start, end, text = segment["start"], segment["end"], segment["text"]
+                    print(make_safe(f"[{format_timestamp(start)} --> {format_timestamp(end)}] {text}"))
+
+                    # add the text to the queue item variable (to make it available in the UI)
+                    if queue_id is not None:
+                        toolkit_ops_obj.processing_queue.update_output(queue_id=queue_id,
+                                                                       output=make_safe(segment["text"]))
+
+            results[idx] = dict(
+                text="".join([segment["text"] for segment in current_segments]),
+                segments=[{"id": i, **segment} for i, segment in enumerate(current_segments)],
+                language=language,
+            )
+
+    return results
+
+
 Whisper.transcribe = transcribe
\ No newline at end of file
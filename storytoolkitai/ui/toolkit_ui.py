@@ -15,6 +15,9 @@ import hashlib
 
 from typing import Union, List
 
+import numpy as np
+import cv2
+
 from timecode import Timecode
 
 import tkinter as tk
@@ -7642,7 +7645,7 @@ class toolkit_UI():
                     return
 
             # suspend NLE polling while we're rendering
-            NLE.suspend_polling = True
+            NLE.set_suspend_polling(True)
 
             # and wait for a second to make sure that the last poll was executed
             time.sleep(1)
@@ -7700,7 +7703,7 @@ class toolkit_UI():
             )
 
             # resume polling
-            NLE.suspend_polling = False
+            NLE.set_suspend_polling(False)
 
     def convert_text_to_time_intervals(self, text, **kwargs):
         """
@@ -9452,8 +9455,7 @@ class toolkit_UI():
                     .nametowidget('middle_frame.text_form_frame.transcript_text')
 
             # get the marker colors from all the markers in the current_timeline['markers'] dict
-            marker_colors = [' '] + sorted(list(set([NLE.current_timeline['markers'][marker]['color']
-                                                     for marker in NLE.current_timeline['markers']])))
+            marker_colors = [' '] + sorted({marker['color'] for marker in NLE.current_timeline['markers'].values()})
 
             # create a list of widgets for the input dialogue
             input_widgets = [
@@ -13523,48 +13525,29 @@ class toolkit_UI():
         transcript_sec = float(transcript_sec)
 
         # find out which segment matches the passed transcript_sec
-        for index, segment in enumerate(transcription.get_segments()):
-
-            # if the transcript timecode in seconds is between the start and the end of this line
-            if float(segment.start) <= transcript_sec < float(segment.end) - 0.001:
-                text_widget_line = index + 1
+        # - that's the first segment that ends after the transcript_sec
+        segment_starts, segment_ends = transcription.get_segment_time_arrays()
+        segments_ending_after = np.flatnonzero(segment_ends > transcript_sec)
 
-                # set the line as the active segment on the timeline
-                toolkit_UI_obj.t_edit_obj.set_active_segment(
-                    window_id=window_id, text_widget=text_widget, text_widget_line=text_widget_line)
-
-                # this gets into an endless loop if the transcript_sec is not precise
-                # so we keep them disabled - if it's needed, 
-                # we'll have to trigger go_to_time from caller function
-                # and move the NLE playhead (if any)
-                # toolkit_UI_obj.toolkit_ops_obj.go_to_time(seconds=transcript_sec)
-
-                break
+        if len(segments_ending_after) > 0:
+            index = int(segments_ending_after[0])
 
-            # if we passed all possible segments that could match the transcript_sec
-            # don't make any selection, but move the NLE playhead (if any)
-            elif float(segment.end) > transcript_sec:
-
-                # this gets into an endless loop if the transcript_sec is not precise
-                # so we keep them disabled - if it's needed, 
-                # we'll have to trigger go_to_time from caller function
-                # just move the NLE playhead (if any)
-                # toolkit_UI_obj.toolkit_ops_obj.go_to_time(seconds=transcript_sec)
-
-                # this notification might be annoying, so maybe remove it
-                # toolkit_UI_obj.notify_via_messagebox(
-                #     title="Not Found",
-                #     message="No segment found for the requested time. Selecting previous segment.",
-                #     parent=toolkit_UI_obj.get_window_by_id(window_id),
-                # )
+            # if the transcript timecode in seconds is between the start and the end of this line,
+            # select this line
+            if segment_starts[index] <= transcript_sec < segment_ends[index] - 0.001:
+                text_widget_line = index + 1
 
+            # otherwise, we passed all possible segments that could match the transcript_sec
+            # so select the previous segment
+            # (we don't move the NLE playhead here, since that gets into an endless loop
+            # if the transcript_sec is not precise - if it's needed, we'll have to trigger go_to_time
+            # from the caller function)
+            else:
                 text_widget_line = index
 
-                # set the line as the active segment on the timeline
-                toolkit_UI_obj.t_edit_obj.set_active_segment(
-                    window_id=window_id, text_widget=text_widget, text_widget_line=text_widget_line)
-
-                break
+            # set the line as the active segment on the timeline
+            toolkit_UI_obj.t_edit_obj.set_active_segment(
+                window_id=window_id, text_widget=text_widget, text_widget_line=text_widget_line)
 
         text_widget.tag_config('current_time', foreground=toolkit_UI.theme_colors['white'])
 
@@ -20767,28 +20750,29 @@ class toolkit_UI():
         except:
             logger.error("Cannot notify user via OS", exc_info=True)
 
+    # the messagebox and the logger function to use for each notification type
+    messagebox_notifiers = {
+        'error': (messagebox.showerror, logger.error),
+        'info': (messagebox.showinfo, logger.info),
+        'warning': (messagebox.showwarning, logger.warning),
+    }
+
     def notify_via_messagebox(self, type='info', message_log=None, message=None, **options):
 
         if message_log is None:
             message_log = message
 
+        # if no known type was passed, just log the message
+        if type not in self.messagebox_notifiers:
+            logger.debug(message_log)
+            return
+
         # alert the user using the messagebox according to the type
         # and log the message
-        if type == 'error':
-            messagebox.showerror(message=message, **options)
-            logger.error(message_log)
-
-        elif type == 'info':
-            messagebox.showinfo(message=message, **options)
-            logger.info(message_log)
-
-        elif type == 'warning':
-            messagebox.showwarning(message=message, **options)
-            logger.warning(message_log)
+        show_messagebox, log_message = self.messagebox_notifiers[type]
 
-        # if no type was passed, just log the message
-        else:
-            logger.debug(message_log)
+        show_messagebox(message=message, **options)
+        log_message(message_log)
 
     @staticmethod
     def sync_entry_with_slider(entry, slider, slider_from, slider_to, round_val=None):